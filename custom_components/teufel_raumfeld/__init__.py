@@ -1,44 +1,64 @@
 """The Teufel Raumfeld integration."""
 
 import asyncio
+import copy
 import inspect
+import itertools
 import logging
 import os
+import threading
+import time
 import urllib.parse
+from collections import Counter, OrderedDict
 
 import hassfeld
-import xmltodict
+from async_upnp_client.aiohttp import AiohttpSessionRequester
+from async_upnp_client.client_factory import UpnpFactory
+from hassfeld import upnp
 from hassfeld.constants import (
+    BROWSE_CHILDREN,
+    SERVICE_ID_SETUP_SERVICE,
+    TIMEOUT_UPNP,
     TRIGGER_UPDATE_DEVICES,
     TRIGGER_UPDATE_HOST_INFO,
     TRIGGER_UPDATE_SYSTEM_STATE,
     TRIGGER_UPDATE_ZONE_CONFIG,
+    USER_AGENT_RAUMFELD,
+    USER_AGENT_RAUMFELD_OIDS,
 )
 from homeassistant.components.media_player import BrowseMedia
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import aiohttp_client, entity_registry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import aiohttp_client
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.service import async_extract_config_entry_ids
+from homeassistant.helpers.storage import Store
+from homeassistant.util.dt import utcnow
 
 from .const import (
+    ATTR_EVENT_WSUPD_TOPOLOGY_VERSION,
     ATTR_EVENT_WSUPD_TYPE,
+    ATTR_EVENT_WSUPD_TYPES,
+    BROWSE_PAGE_SIZE,
+    BROWSE_PREFETCH_COUNT,
     DEFAULT_ANNOUNCEMENT_VOLUME,
     DEFAULT_CHANGE_STEP_VOLUME_DOWN,
     DEFAULT_CHANGE_STEP_VOLUME_UP,
+    DEFAULT_DEVICE_INFO_TTL,
     DEFAULT_VOLUME,
+    DELAY_EVENT_COALESCING,
+    DELAY_HOST_VALIDATION_MAX,
     DELAY_MODERATE_UPDATE_CHECKS,
-    DIDL_ATTR_ID,
-    DIDL_ELEM_ALBUM,
-    DIDL_ELEM_ART_URI,
-    DIDL_ELEM_ARTIST,
-    DIDL_ELEM_CLASS,
-    DIDL_ELEM_CONTAINER,
-    DIDL_ELEM_ITEM,
-    DIDL_ELEM_TITLE,
-    DIDL_ELEMENT,
-    DIDL_VALUE,
     DOMAIN,
     EVENT_WEBSERVICE_UPDATE,
+    MAX_BROWSE_ACCESS_COUNTS,
+    MAX_BROWSE_CACHE_SIZE,
+    MAX_BROWSE_LISTED_SIZE,
+    MAX_PARALLEL_BROWSE_PREFETCHES,
+    MAX_TRACK_METADATA_CACHE_SIZE,
+    MEDIA_CONTENT_ID_PAGE_SEP,
     MEDIA_CONTENT_ID_SEP,
     MESSAGE_PHASE_ALPHA,
     OBJECT_ID_LINE_IN,
@@ -46,6 +66,7 @@ from .const import (
     OPTION_CHANGE_STEP_VOLUME_DOWN,
     OPTION_CHANGE_STEP_VOLUME_UP,
     OPTION_DEFAULT_VOLUME,
+    OPTION_DEVICE_INFO_TTL,
     OPTION_FIXED_ANNOUNCEMENT_VOLUME,
     OPTION_USE_DEFAULT_VOLUME,
     PLATFORMS,
@@ -62,7 +83,9 @@ from .const import (
     SERVICE_PAR_ROOM,
     SERVICE_PAR_VOLUME,
     SERVICE_SET_ROOM_VOLUME,
-    TIMEOUT_HOST_VALIDATION,
+    STORAGE_VERSION,
+    TIMEOUT_BROWSE_CACHE,
+    TITLE_MORE,
     TITLE_UNKNOWN,
     TRACKINF_ALBUM,
     TRACKINF_ARTIST,
@@ -78,6 +101,7 @@ from .const import (
     UPNP_CLASS_TRACK,
     URN_CONTENT_DIRECTORY,
 )
+from .didl import iter_didl_objects
 
 type TeufelRaumfeldConfigEntry = ConfigEntry[HassRaumfeldHost]
 
@@ -85,6 +109,13 @@ _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
+WEBSERVICE_UPDATE_TYPES = (
+    TRIGGER_UPDATE_DEVICES,
+    TRIGGER_UPDATE_HOST_INFO,
+    TRIGGER_UPDATE_SYSTEM_STATE,
+    TRIGGER_UPDATE_ZONE_CONFIG,
+)
+
 
 def set_hassfeld_log_level(raumfeld):
     """Activates logging of hassfeld, if teufel_raumfeld is set to DEBUG"""
@@ -135,6 +166,13 @@ def timespan_secs(timespan):
     return sum(60 ** x[0] * int(x[1]) for x in enumerate(reversed(timespan.split(":"))))
 
 
+def split_media_content_id(media_content_id):
+    """Return object ID and index of the first child to browse of a media content ID."""
+    object_id = media_content_id.split(MEDIA_CONTENT_ID_SEP)[0]
+    object_id, _, starting_index = object_id.partition(MEDIA_CONTENT_ID_PAGE_SEP)
+    return object_id, int(starting_index or 0)
+
+
 def is_supported_oid(oid):
     """Returns True, if the passed object ID should be supported."""
     return bool(oid not in UNSUPPORTED_OBJECT_IDS)
@@ -144,152 +182,230 @@ async def async_setup(hass: HomeAssistant, config: dict):
     """Set up the Teufel Raumfeld component."""
     log_warn(MESSAGE_PHASE_ALPHA)
     log_debug(config)
+
+    async def async_handle_group(call):
+        room_lst = call.data.get("room_names")
+        raumfeld = await async_get_service_host(hass, call, room_lst)
+        if raumfeld is not None:
+            await raumfeld.async_create_group(room_lst)
+
+    async def async_handle_add_room(call):
+        room = call.data.get(SERVICE_PAR_ROOM)
+        room_of_group = call.data.get(SERVICE_PAR_MEMBER)
+        raumfeld = await async_get_service_host(hass, call, [room, room_of_group])
+        if raumfeld is None:
+            return
+        group = raumfeld.get_zone_of_room(room_of_group)
+        if group is not None:
+            await raumfeld.async_add_room_to_group(room, list(group))
+
+    async def async_handle_drop_room(call):
+        room = call.data.get(SERVICE_PAR_ROOM)
+        room_of_group = call.data.get(SERVICE_PAR_MEMBER)
+        if room_of_group is None:
+            raumfeld = await async_get_service_host(hass, call, [room])
+            if raumfeld is not None:
+                await raumfeld.async_drop_room_from_group(room)
+        else:
+            raumfeld = await async_get_service_host(hass, call, [room, room_of_group])
+            if raumfeld is None:
+                return
+            group = raumfeld.get_zone_of_room(room_of_group)
+            if group is not None:
+                await raumfeld.async_drop_room_from_group(room, list(group))
+
+    async def async_handle_set_room_volume(call):
+        room = call.data.get(SERVICE_PAR_ROOM)
+        volume = call.data.get(SERVICE_PAR_VOLUME)
+        raumfeld = await async_get_service_host(hass, call, [room])
+        if raumfeld is None:
+            return
+        group = raumfeld.get_zone_of_room(room)
+        if group is not None:
+            await raumfeld.async_set_group_room_volume(list(group), volume, [room])
+
+    hass.services.async_register(DOMAIN, SERVICE_GROUP, async_handle_group)
+    hass.services.async_register(DOMAIN, SERVICE_ADD_ROOM, async_handle_add_room)
+    hass.services.async_register(DOMAIN, SERVICE_DROP_ROOM, async_handle_drop_room)
+    hass.services.async_register(DOMAIN, SERVICE_SET_ROOM_VOLUME, async_handle_set_room_volume)
     return True
 
 
-def event_on_update(hass, update_type):
-    """fires events on Raumfeld web service updates."""
-    log_info(f"Update event triggered for type: {update_type}")
-    if update_type == TRIGGER_UPDATE_HOST_INFO:
-        hass.bus.fire(EVENT_WEBSERVICE_UPDATE, {ATTR_EVENT_WSUPD_TYPE: TRIGGER_UPDATE_HOST_INFO})
-    elif update_type == TRIGGER_UPDATE_ZONE_CONFIG:
-        hass.bus.fire(EVENT_WEBSERVICE_UPDATE, {ATTR_EVENT_WSUPD_TYPE: TRIGGER_UPDATE_ZONE_CONFIG})
-    elif update_type == TRIGGER_UPDATE_DEVICES:
-        hass.bus.fire(EVENT_WEBSERVICE_UPDATE, {ATTR_EVENT_WSUPD_TYPE: TRIGGER_UPDATE_DEVICES})
-    elif update_type == TRIGGER_UPDATE_SYSTEM_STATE:
-        hass.bus.fire(
+async def async_get_service_host(hass: HomeAssistant, call, room_lst):
+    """Return the host a domain service call is meant for or None if there is no single one.
+
+    With several Raumfeld systems set up, the call is routed to the system of
+    the targeted entities. Without a target, it goes to the only system that
+    knows all passed rooms.
+    """
+    entry_ids = await async_extract_config_entry_ids(call)
+    hosts = [
+        entry.runtime_data
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN)
+        if not entry_ids or entry.entry_id in entry_ids
+    ]
+    hosts = [raumfeld for raumfeld in hosts if raumfeld.rooms_are_valid(room_lst or ())]
+    if len(hosts) == 1:
+        return hosts[0]
+    if hosts:
+        log_error(f"Rooms {room_lst} exist in several Raumfeld systems, a target entity is needed to select one")
+    else:
+        log_error(f"No Raumfeld system knows the rooms {room_lst}")
+    return None
+
+
+class WebserviceUpdateEvents:
+    """Fires the web service update events of a Raumfeld host, one per burst of updates.
+
+    Regrouping rooms makes the web service report zone configuration, system
+    state and devices updates within a moment. Updates arriving within
+    DELAY_EVENT_COALESCING of the first one are merged into a single event
+    carrying all their types, so listeners and automations are woken once.
+    """
+
+    def __init__(self, hass: HomeAssistant, raumfeld):
+        """Initialize the update events of a Raumfeld host."""
+        self.hass = hass
+        self.raumfeld = raumfeld
+        self._update_types = set()
+        self._last_update_type = None
+        self._unsub_fire = None
+
+    @callback
+    def async_add(self, update_type):
+        """Add a web service update to the next event."""
+        if update_type not in WEBSERVICE_UPDATE_TYPES:
+            log_fatal(f"Unexpected update type: {update_type}")
+            return
+        log_info(f"Update event triggered for type: {update_type}")
+        self._update_types.add(update_type)
+        self._last_update_type = update_type
+        if self._unsub_fire is None:
+            self._unsub_fire = async_call_later(self.hass, DELAY_EVENT_COALESCING, self._async_fire)
+
+    @callback
+    def _async_fire(self, now=None):
+        """Fire one event for the updates collected."""
+        self._unsub_fire = None
+        update_types, self._update_types = self._update_types, set()
+        self.hass.bus.async_fire(
             EVENT_WEBSERVICE_UPDATE,
-            {ATTR_EVENT_WSUPD_TYPE: TRIGGER_UPDATE_SYSTEM_STATE},
+            {
+                # The most recent type, as carried by the single-update events of earlier versions.
+                ATTR_EVENT_WSUPD_TYPE: self._last_update_type,
+                ATTR_EVENT_WSUPD_TYPES: sorted(update_types),
+                ATTR_EVENT_WSUPD_TOPOLOGY_VERSION: self.raumfeld.topology_version,
+            },
         )
-    else:
-        log_fatal(f"Unexpected update type: {update_type}")
+
+    @callback
+    def async_stop(self):
+        """Drop updates not fired yet."""
+        if self._unsub_fire is not None:
+            self._unsub_fire()
+            self._unsub_fire = None
+        self._update_types = set()
+
+
+def get_options(entry: TeufelRaumfeldConfigEntry):
+    """Return the options of a config entry, completed by the defaults of unset ones."""
+    return {
+        OPTION_ANNOUNCEMENT_VOLUME: entry.options.get(OPTION_ANNOUNCEMENT_VOLUME, DEFAULT_ANNOUNCEMENT_VOLUME),
+        OPTION_FIXED_ANNOUNCEMENT_VOLUME: entry.options.get(OPTION_FIXED_ANNOUNCEMENT_VOLUME, False),
+        OPTION_DEFAULT_VOLUME: entry.options.get(OPTION_DEFAULT_VOLUME, DEFAULT_VOLUME),
+        OPTION_USE_DEFAULT_VOLUME: entry.options.get(OPTION_USE_DEFAULT_VOLUME, False),
+        OPTION_CHANGE_STEP_VOLUME_UP: entry.options.get(OPTION_CHANGE_STEP_VOLUME_UP, DEFAULT_CHANGE_STEP_VOLUME_UP),
+        OPTION_CHANGE_STEP_VOLUME_DOWN: entry.options.get(OPTION_CHANGE_STEP_VOLUME_DOWN, DEFAULT_CHANGE_STEP_VOLUME_DOWN),
+        OPTION_DEVICE_INFO_TTL: entry.options.get(OPTION_DEVICE_INFO_TTL, DEFAULT_DEVICE_INFO_TTL),
+    }
 
 
 async def update_listener(hass: HomeAssistant, entry: TeufelRaumfeldConfigEntry):
     """Handle options update."""
     raumfeld = entry.runtime_data
-    raumfeld.options = entry.options.copy()
+    raumfeld.options = get_options(entry)
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: TeufelRaumfeldConfigEntry):
     """Set up Teufel Raumfeld from a config entry."""
 
-    def cb_webservice_update(update_type, hass=hass):
-        event_on_update(hass, update_type)
+    from .coordinator import RaumfeldCoordinator
+    from .eventing import RaumfeldEventSubscriber
+
+    @callback
+    def async_handle_webservice_update(update_type):
+        raumfeld.record_update(update_type)
+        update_events.async_add(update_type)
+        raumfeld.coordinator.async_handle_update(update_type)
+
+    def cb_webservice_update(update_type):
+        if threading.get_ident() == hass.loop_thread_id:
+            async_handle_webservice_update(update_type)
+        else:
+            hass.loop.call_soon_threadsafe(async_handle_webservice_update, update_type)
 
     host = entry.data["host"]
     port = entry.data["port"]
     http_session = aiohttp_client.async_get_clientsession(hass)
     raumfeld = HassRaumfeldHost(host, port, session=http_session)
+    raumfeld.validation_stats = hass.data.setdefault(DOMAIN, {}).setdefault(entry.entry_id, raumfeld.validation_stats)
+    raumfeld.coordinator = RaumfeldCoordinator(hass, raumfeld, entry.entry_id)
     set_hassfeld_log_level(raumfeld)
-    raumfeld.options[OPTION_ANNOUNCEMENT_VOLUME] = entry.options.get(OPTION_ANNOUNCEMENT_VOLUME, DEFAULT_ANNOUNCEMENT_VOLUME)
-    raumfeld.options[OPTION_FIXED_ANNOUNCEMENT_VOLUME] = entry.options.get(OPTION_ANNOUNCEMENT_VOLUME, False)
-    raumfeld.options[OPTION_DEFAULT_VOLUME] = entry.options.get(OPTION_DEFAULT_VOLUME, DEFAULT_VOLUME)
-    raumfeld.options[OPTION_USE_DEFAULT_VOLUME] = entry.options.get(OPTION_USE_DEFAULT_VOLUME, False)
-    raumfeld.options[OPTION_CHANGE_STEP_VOLUME_UP] = entry.options.get(
-        OPTION_CHANGE_STEP_VOLUME_UP, DEFAULT_CHANGE_STEP_VOLUME_UP
-    )
-    raumfeld.options[OPTION_CHANGE_STEP_VOLUME_DOWN] = entry.options.get(
-        OPTION_CHANGE_STEP_VOLUME_DOWN, DEFAULT_CHANGE_STEP_VOLUME_DOWN
-    )
+    raumfeld.options = get_options(entry)
+    update_events = WebserviceUpdateEvents(hass, raumfeld)
+    entry.async_on_unload(update_events.async_stop)
+
+    async def async_connect(retry=False):
+        """Validate the host and start the web service updates, optionally retrying with backoff."""
+        delay = DELAY_MODERATE_UPDATE_CHECKS
+        unreachable = False
+        while not await raumfeld.async_host_is_valid():
+            if not retry:
+                return False
+            if not unreachable:
+                # Logged once, retries are only logged at debug level until the host answers.
+                log_warn(f"Raumfeld host {host}:{port} is not reachable, retrying with backoff")
+                unreachable = True
+            log_debug(f"Retrying to reach Raumfeld host {host}:{port} in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DELAY_HOST_VALIDATION_MAX)
+        if unreachable:
+            log_info(f"Raumfeld host {host}:{port} is reachable again")
+
+        raumfeld.callback = cb_webservice_update
+        log_info("Starting web service update coroutine")
+        entry.async_create_background_task(
+            hass, raumfeld.async_supervise_updates(http_session), "teufel_raumfeld web service updates"
+        )
+        return True
 
-    max_attempts = int(TIMEOUT_HOST_VALIDATION / DELAY_MODERATE_UPDATE_CHECKS)
-
-    for attempt in range(1, max_attempts):
-        host_is_not_valid = not await raumfeld.async_host_is_valid()
-        if host_is_not_valid:
-            await asyncio.sleep(DELAY_MODERATE_UPDATE_CHECKS)
-            log_info(f"Starting attempt '{attempt + 1}' out of '{max_attempts}' attempts to identify host as valid")
-            continue
-        break
-    if host_is_not_valid:
-        log_error(f"Invalid host: {host}:{port}")
-        return False
-
-    raumfeld.callback = cb_webservice_update
-    log_info("Starting web service update coroutine")
-    asyncio.create_task(raumfeld.async_update_all(http_session))
-    await raumfeld.async_wait_initial_update()
-    log_info("Web service update coroutine started")
-    log_debug(f"raumfeld.wsd={raumfeld.wsd}")
     entry.runtime_data = raumfeld
+    await raumfeld.coordinator.async_load()
+    topology = raumfeld.coordinator.stored_topology
+    if topology is None:
+        if not await async_connect():
+            raise ConfigEntryNotReady(f"Raumfeld host {host}:{port} is not reachable")
+        await raumfeld.async_wait_initial_update()
+        log_info("Web service update coroutine started")
+        log_debug(f"raumfeld.wsd={raumfeld.wsd}")
+    else:
+        # Entities are created from the stored topology right away and
+        # reconciled by the coordinator once the web service answers.
+        log_info("Setting up from stored topology, connecting to host in the background")
+        raumfeld.restore_topology(topology)
+        entry.async_create_background_task(hass, async_connect(retry=True), "teufel_raumfeld host connection")
+    raumfeld.coordinator.async_start()
+    entry.async_on_unload(raumfeld.coordinator.async_stop)
+    raumfeld.coordinator.eventing = RaumfeldEventSubscriber(hass, raumfeld.coordinator, http_session)
+    entry.async_create_background_task(
+        hass, raumfeld.coordinator.eventing.async_start(), "teufel_raumfeld event subscriptions"
+    )
+    entry.async_on_unload(raumfeld.coordinator.eventing.async_stop)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    async def async_handle_group(call):
-        room_lst = call.data.get("room_names")
-        await raumfeld.async_create_group(room_lst)
-
-    async def async_handle_add_room(call):
-        room = call.data.get(SERVICE_PAR_ROOM)
-        room_of_group = call.data.get(SERVICE_PAR_MEMBER)
-        room_groups = raumfeld.get_groups()
-        for group in room_groups:
-            if room_of_group in group:
-                await raumfeld.async_add_room_to_group(room, group)
-
-    async def async_handle_drop_room(call):
-        room = call.data.get(SERVICE_PAR_ROOM)
-        room_of_group = call.data.get(SERVICE_PAR_MEMBER)
-        if room_of_group is None:
-            await raumfeld.async_drop_room_from_group(room)
-        else:
-            room_groups = raumfeld.get_groups()
-            for group in room_groups:
-                if room_of_group in group:
-                    await raumfeld.async_drop_room_from_group(room, group)
-
-    async def async_handle_set_room_volume(call):
-        room = call.data.get(SERVICE_PAR_ROOM)
-        volume = call.data.get(SERVICE_PAR_VOLUME)
-        room_groups = raumfeld.get_groups()
-        for group in room_groups:
-            if room in group:
-                rooms = [room]
-                await raumfeld.async_set_group_room_volume(group, volume, rooms)
-
-    hass.services.async_register(DOMAIN, SERVICE_GROUP, async_handle_group)
-    hass.services.async_register(DOMAIN, SERVICE_ADD_ROOM, async_handle_add_room)
-    hass.services.async_register(DOMAIN, SERVICE_DROP_ROOM, async_handle_drop_room)
-    hass.services.async_register(DOMAIN, SERVICE_SET_ROOM_VOLUME, async_handle_set_room_volume)
-
     entry.async_on_unload(entry.add_update_listener(update_listener))
-
-    async def _async_cleanup_stale_entities():
-        """Remove entity entries for zones/rooms that no longer exist."""
-        await asyncio.sleep(5)  # Let all platforms finish setup
-        ent_reg = entity_registry.async_get(hass)
-        current_rooms = set(raumfeld.get_rooms())
-        current_zone_room_sets = [frozenset(z) for z in raumfeld.get_zones()]
-        valid_zone_uids = set()
-        # Single-room zones are just rooms
-        for zone in current_zone_room_sets:
-            from .media_player import obj_to_uid
-
-            valid_zone_uids.add(obj_to_uid(list(zone)))
-        for room in current_rooms:
-            from .media_player import obj_to_uid
-
-            valid_zone_uids.add(obj_to_uid([room]))
-
-        for entity_id, entity in list(ent_reg.entities.items()):
-            if entity.config_entry_id != entry.entry_id:
-                continue
-            if entity.platform in ("sensor", "select", "number"):
-                # Extract room name from unique_id: teufel_raumfeld.Room: <room> - <sensor>
-                parts = entity.unique_id.split(".", 2)
-                if len(parts) > 2:
-                    room_part = parts[2].split(" - ")[0]
-                    if room_part.startswith("Room: "):
-                        room_name = room_part[6:]
-                        if room_name not in current_rooms:
-                            ent_reg.async_remove(entity_id)
-                            log_info(f"Cleaned up stale entity: {entity_id}")
-            elif entity.platform == "media_player":
-                # Keep media_player entities — they survive zone deletion by design
-                pass
-
-    entry.async_create_task(hass, _async_cleanup_stale_entities())
+    entry.async_on_unload(raumfeld.clear_callback)
 
     return True
 
@@ -302,16 +418,272 @@ async def async_unload_entry(hass: HomeAssistant, entry: TeufelRaumfeldConfigEnt
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: TeufelRaumfeldConfigEntry):
+    """Remove the data stored for a config entry."""
+    hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}").async_remove()
+
+
 class HassRaumfeldHost(hassfeld.RaumfeldHost):
     """Raumfeld Host class adapted for Home Assistant."""
 
-    options = {}
-    eid_to_obj = {}
+    coordinator = None
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the Raumfeld host."""
+        super().__init__(*args, **kwargs)
+        self.options = {}
+        self.eid_to_obj = {}
+        self.track_metadata_cache = OrderedDict()
+        self.track_metadata_cache_stats = {"hits": 0, "misses": 0}
+        self.browse_cache = OrderedDict()
+        self.browse_cache_stats = {"hits": 0, "misses": 0, "invalidations": 0, "prefetches": 0}
+        self.browse_listed = OrderedDict()
+        self.browse_access_counts = Counter()
+        self._browse_fetches = {}
+        self._prefetch_semaphore = asyncio.Semaphore(MAX_PARALLEL_BROWSE_PREFETCHES)
+        self._prefetch_generation = 0
+        self._foreground_browses = 0
+        self.system_update_id = None
+        self._upnp_devices = {}
+        self._topology_version = 0
+        self._indexed_config = None
+        self._room_set = frozenset()
+        self._room_to_zone = {}
+        self._rooms_to_zone = {}
+        self._roomudns_to_zoneudn = {}
+        self.validation_stats = {"attempts": 0, "failures": 0, "last_valid": None, "last_latency": None, "max_latency": None}
+        self.update_stats = {"runs": 0, "errors": 0, "last_error": None, "last_update": None, "updates": {}}
+
+    def record_update(self, update_type):
+        """Count an update received from the web service."""
+        updates = self.update_stats["updates"]
+        updates[update_type] = updates.get(update_type, 0) + 1
+        self.update_stats["last_update"] = utcnow().isoformat()
+
+    def clear_callback(self):
+        """Stop passing web service updates on."""
+        self.callback = None
+
+    async def async_supervise_updates(self, session):
+        """Run the long-polling of the web service, restarting it with backoff whenever it ends.
+
+        A loop of hassfeld ends on a lost connection, e.g. on a reboot of the
+        host. The other loops are cancelled then, so a restart never adds to
+        loops still running. The backoff starts over once updates were received
+        again.
+        """
+        stats = self.update_stats
+        delay = DELAY_MODERATE_UPDATE_CHECKS
+        while True:
+            stats["runs"] += 1
+            last_update = stats["last_update"]
+            try:
+                await self._async_run_update_loops(session)
+                error = "long-polling ended"
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # noqa: BLE001
+                error = repr(err)
+            stats["errors"] += 1
+            stats["last_error"] = error
+            if stats["last_update"] != last_update:
+                delay = DELAY_MODERATE_UPDATE_CHECKS
+            log_warn(f"Web service updates stopped ({error}), restarting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DELAY_HOST_VALIDATION_MAX)
+
+    async def _async_run_update_loops(self, session):
+        """Run the long-polling loops of the web service until the first one ends."""
+        tasks = [
+            asyncio.create_task(loop(session))
+            for loop in (
+                self.async_update_gethostinfo,
+                self.async_update_getzones,
+                self.async_update_listdevices,
+                self.async_update_systemstatechannel,
+            )
+        ]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def async_host_is_valid(self):
+        """Check whether host is a valid raumfeld host, recording the attempt and its latency."""
+        started = time.monotonic()
+        valid = await super().async_host_is_valid()
+        latency = round(time.monotonic() - started, 3)
+        stats = self.validation_stats
+        stats["attempts"] += 1
+        if not valid:
+            stats["failures"] += 1
+        stats["last_valid"] = valid
+        stats["last_latency"] = latency
+        stats["max_latency"] = max(stats["max_latency"] or 0, latency)
+        log_debug(f"Host validation: valid={valid}, latency={latency}s")
+        return valid
+
+    @property
+    def topology_version(self):
+        """Return a counter increased on every change of the zone configuration."""
+        self._update_topology_index()
+        return self._topology_version
+
+    def _update_topology_index(self):
+        """Rebuild the lookup tables of rooms and zones after the zone configuration changed.
+
+        Each zone configuration update of the web service replaces the lists
+        and dicts holding rooms and zones, so updates are detected by identity.
+        The version is only increased if the rooms, zones or zone UDNs of the
+        update differ from the indexed ones, not for re-sent configurations.
+        """
+        config = (self.lists["rooms"], self.lists["zones"], self.resolve["zoneudn_to_roomudnlst"])
+        if self._indexed_config is not None and all(
+            current is indexed for current, indexed in zip(config, self._indexed_config, strict=True)
+        ):
+            return
+        self._indexed_config = config
+        rooms, zones, zoneudn_to_roomudnlst = config
+        room_set = frozenset(rooms)
+        sorted_zones = [tuple(sorted(zone)) for zone in zones]
+        roomudns_to_zoneudn = {frozenset(udns): zone_udn for zone_udn, udns in zoneudn_to_roomudnlst.items()}
+        if (
+            self._topology_version
+            and room_set == self._room_set
+            and frozenset(sorted_zones) == frozenset(self._rooms_to_zone.values())
+            and roomudns_to_zoneudn == self._roomudns_to_zoneudn
+        ):
+            return
+        self._room_set = room_set
+        self._room_to_zone = {}
+        self._rooms_to_zone = {}
+        for zone in sorted_zones:
+            self._rooms_to_zone[frozenset(zone)] = zone
+            for room in zone:
+                self._room_to_zone[room] = zone
+        self._roomudns_to_zoneudn = roomudns_to_zoneudn
+        self._topology_version += 1
+
+    def get_zone_of_room(self, room):
+        """Return the sorted rooms of the zone a room belongs to or None if it isn't part of a zone."""
+        self._update_topology_index()
+        return self._room_to_zone.get(room)
+
+    def zone_is_valid(self, room_lst):
+        """Check whether passed zone is valid."""
+        self._update_topology_index()
+        zone = self._rooms_to_zone.get(frozenset(room_lst))
+        return zone is not None and len(zone) == len(room_lst)
+
+    def room_is_valid(self, room):
+        """Check whether passed room is valid."""
+        self._update_topology_index()
+        return room in self._room_set
+
+    def rooms_are_valid(self, room_lst):
+        """Check whether passed rooms are valid."""
+        self._update_topology_index()
+        return self._room_set.issuperset(room_lst)
+
+    def roomudnlst_to_zoneudn(self, udn_lst):
+        """Convert list of room UDN to zone UDN."""
+        self._update_topology_index()
+        return self._roomudns_to_zoneudn.get(frozenset(udn_lst))
 
     def get_groups(self):
         """Get active speaker groups."""
         return self.get_zones()
 
+    def get_zone_location(self, room_lst):
+        """Return location of the virtual renderer of a zone or None if unknown."""
+        if not self.rooms_are_valid(room_lst):
+            return None
+        zone_udn = self.roomlst_to_zoneudn(list(room_lst))
+        return self.resolve["udn_to_devloc"].get(zone_udn)
+
+    def get_room_renderer_location(self, room):
+        """Return location of the renderer of a room or None if unknown."""
+        room_udn = self.resolve["room_to_udn"].get(room)
+        renderer_udn = self.resolve["roomudn_to_rendudn"].get(room_udn)
+        return self.resolve["udn_to_devloc"].get(renderer_udn)
+
+    def get_media_server_location(self):
+        """Return location of the media server or None if unknown."""
+        return self.resolve["udn_to_devloc"].get(self.media_server_udn)
+
+    def get_device_names(self):
+        """Return names of all devices of the topology, including renderers."""
+        return set(self.resolve["devudn_to_name"].values())
+
+    def room_udn_to_name(self, room_udn):
+        """Return name of the room with the passed UDN or None if unknown."""
+        return self.resolve["udn_to_room"].get(room_udn)
+
+    def get_topology(self):
+        """Return the data derived from the web service that describes rooms, zones and devices."""
+        return {"lists": self.lists, "resolve": self.resolve, "media_server_udn": self.media_server_udn}
+
+    def restore_topology(self, topology):
+        """Take over the topology of a previous run until the web service reports the current one."""
+        self.lists.update(topology["lists"])
+        self.resolve.update(topology["resolve"])
+        self.media_server_udn = topology["media_server_udn"]
+
+    async def async_get_upnp_device(self, udn):
+        """Return the UPnP device of a Raumfeld device, requesting and parsing its description once.
+
+        The device is kept until the location of the device changes, so the
+        description and the actions of the setup service share one parsed
+        description. Concurrent callers share the request.
+        """
+        location = self.device_udn_to_location(udn)
+        cached = self._upnp_devices.get(udn)
+        if cached is None or cached[0] != location:
+            requester = AiohttpSessionRequester(self._aiohttp_session, timeout=TIMEOUT_UPNP)
+            factory = UpnpFactory(requester, non_strict=True)
+            cached = (location, asyncio.ensure_future(factory.async_create_device(location)))
+            self._upnp_devices[udn] = cached
+        try:
+            return await asyncio.shield(cached[1])
+        except Exception:
+            # A failed request is retried by the next caller.
+            if self._upnp_devices.get(udn) is cached:
+                del self._upnp_devices[udn]
+            raise
+
+    async def _async_call_setup_service(self, udn, action_name, **kwargs):
+        """Call an action of the setup service of a device and return its response."""
+        device = await self.async_get_upnp_device(udn)
+        return await device.service(SERVICE_ID_SETUP_SERVICE).action(action_name).async_call(**kwargs)
+
+    async def async_get_device_description(self, udn):
+        """Return renderer, manufacturer and model of a device or None if it has no renderer.
+
+        The UDN of the renderer is asked for through the setup service of the
+        device.
+        """
+        device = await self.async_get_upnp_device(udn)
+        response = await self._async_call_setup_service(udn, "GetDevice", Service="renderer")
+        renderer_udn = response.get("UniqueDeviceName")
+        if not renderer_udn:
+            return None
+        return {"renderer_udn": renderer_udn, "manufacturer": device.manufacturer, "model": device.model_name}
+
+    async def async_get_device_sw_version(self, udn):
+        """Return the software version of a device."""
+        response = await self._async_call_setup_service(udn, "GetInfo")
+        return response.get("SoftwareVersion")
+
+    async def async_get_device_update_version(self, udn):
+        """Return the version of the software update available for a device or None."""
+        response = await self._async_call_setup_service(udn, "GetUpdateInfo")
+        return response.get("Version")
+
     def group_is_valid(self, room_lst):
         """Check whether a speaker group according to passed rooms exists."""
         return self.zone_is_valid(room_lst)
@@ -448,56 +820,198 @@ class HassRaumfeldHost(hassfeld.RaumfeldHost):
 
         return media_id
 
+    def set_system_update_id(self, system_update_id):
+        """Clear the browse cache once the content of the media server changed."""
+        if system_update_id == self.system_update_id:
+            return
+        log_debug(f"SystemUpdateID changed to {system_update_id}, dropping {len(self.browse_cache)} browse results")
+        self.system_update_id = system_update_id
+        self.browse_cache.clear()
+        self.browse_listed.clear()
+        self.browse_cache_stats["invalidations"] += 1
+
+    async def async_browse_media_server(self, object_id, browse_flag, starting_index=0, requested_count=0):
+        """Browse media on the media server, optionally a window of the children only."""
+        http_headers = None
+        if browse_flag == BROWSE_CHILDREN and object_id in USER_AGENT_RAUMFELD_OIDS:
+            http_headers = {"User-Agent": USER_AGENT_RAUMFELD}
+        return await upnp.async_browse(
+            self._aiohttp_session,
+            self.get_media_server_location(),
+            object_id,
+            browse_flag,
+            starting_index=starting_index,
+            requested_count=requested_count,
+            http_headers=http_headers,
+        )
+
     async def async_browse_media(self, object_id=0, browse_flag=None):
-        """Browse conent directory and return object as expected by webhook."""
-        browse_lst = []
-        media_entries = []
-        can_play = False
-        thumbnail = None
-        track_number = 0
-        browsable_oid = object_id.split(MEDIA_CONTENT_ID_SEP)[0]
-        media_xml = await self.async_browse_media_server(browsable_oid, browse_flag)
+        """Browse conent directory and return object as expected by webhook.
+
+        Children are browsed in pages of BROWSE_PAGE_SIZE, starting at the
+        index given by the media content ID. If more children follow, the page
+        ends with a container for the next one, so large containers are loaded
+        on demand and never held in memory at once.
+
+        Results are kept in a bounded LRU cache by page and browse flag for
+        TIMEOUT_BROWSE_CACHE. The children listed are remembered as well, so
+        the metadata of an object is known without a request once its parent
+        was browsed. Both are cleared when the SystemUpdateID of the media
+        server changes. Copies are returned, as callers attach children to the
+        objects.
+        """
+        browsable_oid, starting_index = split_media_content_id(object_id)
+        if browse_flag != BROWSE_CHILDREN:
+            starting_index = 0
+            cached = self.browse_listed.get(browsable_oid)
+            if cached is not None and cached[0] > time.monotonic():
+                self.browse_listed.move_to_end(browsable_oid)
+                self.browse_cache_stats["hits"] += 1
+                return [copy.copy(cached[1])]
+        key = (browsable_oid, browse_flag, starting_index)
+        cached = self._get_cached_browse_result(key)
+        if cached is not None:
+            self.browse_cache_stats["hits"] += 1
+            return [copy.copy(media) for media in cached]
+        self.browse_cache_stats["misses"] += 1
+        self._foreground_browses += 1
+        try:
+            browse_lst = await self._async_fetch_browse_result(key)
+        finally:
+            self._foreground_browses -= 1
+        return [copy.copy(media) for media in browse_lst]
+
+    def _get_cached_browse_result(self, key):
+        """Return a browse result from the cache or None if it isn't cached or expired."""
+        cached = self.browse_cache.get(key)
+        if cached is None or cached[0] <= time.monotonic():
+            return None
+        self.browse_cache.move_to_end(key)
+        return cached[1]
+
+    async def _async_fetch_browse_result(self, key):
+        """Browse the media server, sharing the request with concurrent ones for the same result."""
+        fetch = self._browse_fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._async_browse_media_server_cached(*key))
+            self._browse_fetches[key] = fetch
+            fetch.add_done_callback(lambda _: self._browse_fetches.pop(key, None))
+        return await asyncio.shield(fetch)
+
+    async def _async_browse_media_server_cached(self, browsable_oid, browse_flag, starting_index):
+        """Browse the media server and cache the converted result."""
+        key = (browsable_oid, browse_flag, starting_index)
+        system_update_id = self.system_update_id
+        if browse_flag == BROWSE_CHILDREN:
+            # One child more than shown tells whether another page follows.
+            media_xml = await self.async_browse_media_server(
+                browsable_oid, browse_flag, starting_index=starting_index, requested_count=BROWSE_PAGE_SIZE + 1
+            )
+        else:
+            media_xml = await self.async_browse_media_server(browsable_oid, browse_flag)
 
         if media_xml is None:
-            return browse_lst
+            return []
 
-        media = xmltodict.parse(media_xml, force_list=(DIDL_ELEM_CONTAINER, DIDL_ELEM_ITEM))
-
-        if DIDL_ELEM_CONTAINER in media[DIDL_ELEMENT]:
-            media_entries += media[DIDL_ELEMENT][DIDL_ELEM_CONTAINER]
+        media_entries = list(itertools.islice(iter_didl_objects(media_xml), BROWSE_PAGE_SIZE + 1))
+        browse_lst = self.media_entries_to_browse_media(media_entries[:BROWSE_PAGE_SIZE], starting_index)
+        listed_count = len(browse_lst)
+        if browse_flag == BROWSE_CHILDREN and len(media_entries) > BROWSE_PAGE_SIZE:
+            next_index = starting_index + BROWSE_PAGE_SIZE
+            browse_lst.append(
+                BrowseMedia(
+                    title=TITLE_MORE,
+                    media_class="directory",
+                    media_content_id=f"{browsable_oid}{MEDIA_CONTENT_ID_PAGE_SEP}{next_index}",
+                    media_content_type="object.container",
+                    can_play=False,
+                    can_expand=True,
+                )
+            )
+        # A result requested before the content changed is not cached.
+        if self.system_update_id == system_update_id:
+            expires_at = time.monotonic() + TIMEOUT_BROWSE_CACHE
+            self.browse_cache[key] = (expires_at, browse_lst)
+            self.browse_cache.move_to_end(key)
+            if len(self.browse_cache) > MAX_BROWSE_CACHE_SIZE:
+                self.browse_cache.popitem(last=False)
+            if browse_flag == BROWSE_CHILDREN:
+                self._remember_listed(browse_lst[:listed_count], expires_at)
+        return browse_lst
 
-        if DIDL_ELEM_ITEM in media[DIDL_ELEMENT]:
-            media_entries += media[DIDL_ELEMENT][DIDL_ELEM_ITEM]
+    def _remember_listed(self, browse_lst, expires_at):
+        """Keep the children of a browse result as metadata of their objects."""
+        for media in browse_lst:
+            listed_oid = split_media_content_id(media.media_content_id)[0]
+            self.browse_listed[listed_oid] = (expires_at, media)
+            self.browse_listed.move_to_end(listed_oid)
+        while len(self.browse_listed) > MAX_BROWSE_LISTED_SIZE:
+            self.browse_listed.popitem(last=False)
+
+    def record_browse_access(self, object_id):
+        """Count an opening of a container in the media browser."""
+        counts = self.browse_access_counts
+        counts[split_media_content_id(object_id)[0]] += 1
+        if len(counts) > MAX_BROWSE_ACCESS_COUNTS:
+            self.browse_access_counts = Counter(dict(counts.most_common(MAX_BROWSE_ACCESS_COUNTS // 2)))
+
+    def _get_prefetch_candidates(self, browse_lst):
+        """Return the object IDs of the containers of a listing most likely opened next."""
+        candidates = []
+        for media in browse_lst:
+            if not media.can_expand or MEDIA_CONTENT_ID_PAGE_SEP in media.media_content_id:
+                continue
+            object_id = split_media_content_id(media.media_content_id)[0]
+            if self._get_cached_browse_result((object_id, BROWSE_CHILDREN, 0)) is None:
+                candidates.append(object_id)
+        # Sorting is stable, so containers never opened keep the order of the listing.
+        candidates.sort(key=lambda object_id: self.browse_access_counts[object_id], reverse=True)
+        return candidates[:BROWSE_PREFETCH_COUNT]
+
+    async def async_prefetch_children(self, browse_lst):
+        """Browse the children of the containers of a listing likely opened next into the cache.
+
+        Containers opened most often before come first, followed by the first
+        containers of the listing. At most BROWSE_PREFETCH_COUNT are browsed,
+        MAX_PARALLEL_BROWSE_PREFETCHES at a time for all listings. Prefetches
+        give way to the browses of the user: those not started yet are dropped
+        once another listing is browsed or while a browse waits for the media
+        server.
+        """
+        self._prefetch_generation += 1
+        generation = self._prefetch_generation
+
+        async def async_prefetch(object_id):
+            async with self._prefetch_semaphore:
+                if generation != self._prefetch_generation or self._foreground_browses:
+                    return
+                self.browse_cache_stats["prefetches"] += 1
+                await self._async_fetch_browse_result((object_id, BROWSE_CHILDREN, 0))
+
+        await asyncio.gather(*(async_prefetch(object_id) for object_id in self._get_prefetch_candidates(browse_lst)))
+
+    def media_entries_to_browse_media(self, media_entries, track_number=0):
+        """Return browse result entries as expected by webhook.
+
+        The track number of the first entry is its index within the container.
+        """
+        browse_lst = []
+        can_play = False
 
         for entry in media_entries:
-            can_expand = True
-            media_content_id = entry[DIDL_ATTR_ID]
+            media_content_id = entry.id
 
             if not is_supported_oid(media_content_id):
                 log_info(f"Unsupported Object ID: {media_content_id}")
                 continue
 
-            # Workaround: Sometimes XML includes namespaces.
-            if DIDL_ELEM_TITLE in entry:
-                if entry[DIDL_ELEM_TITLE] is not None and DIDL_VALUE in entry[DIDL_ELEM_TITLE]:
-                    title = entry[DIDL_ELEM_TITLE][DIDL_VALUE]
-                else:
-                    title = entry[DIDL_ELEM_TITLE]
-            else:
+            title = entry.title
+            if title is None:
                 log_warn(f"Media with id '{media_content_id}' is lacking a title")
                 title = TITLE_UNKNOWN
 
-            # Workaround: Sometimes XML includes namespaces.
-            if DIDL_VALUE in entry[DIDL_ELEM_CLASS]:
-                media_content_type = entry[DIDL_ELEM_CLASS][DIDL_VALUE]
-            else:
-                media_content_type = entry[DIDL_ELEM_CLASS]
-
-            if media_content_type.startswith(UPNP_CLASS_AUDIO_ITEM):
-                can_expand = False
-
-            if DIDL_ELEM_ART_URI in entry:
-                thumbnail = entry[DIDL_ELEM_ART_URI][DIDL_VALUE]
+            media_content_type = entry.upnp_class or ""
+            can_expand = not media_content_type.startswith(UPNP_CLASS_AUDIO_ITEM)
 
             play_uri = self.mk_play_uri(
                 self.media_server_udn,
@@ -519,7 +1033,7 @@ class HassRaumfeldHost(hassfeld.RaumfeldHost):
                     media_content_type=media_content_type,
                     can_play=can_play,
                     can_expand=can_expand,
-                    thumbnail=thumbnail,
+                    thumbnail=entry.art_uri,
                 )
             )
         return browse_lst
@@ -528,30 +1042,42 @@ class HassRaumfeldHost(hassfeld.RaumfeldHost):
         """Return data to update media information."""
         position_info = await self.async_get_position_info(zone_room_lst)
         if position_info:
-            metadata_xml = position_info[POSINF_ELEM_TRACK_DATA]
-
-            track_info = {
-                TRACKINF_TITLE: None,
-                TRACKINF_ARTIST: None,
-                TRACKINF_IMGURI: None,
-                TRACKINF_ALBUM: None,
-            }
-
+            track_info = dict(self.parse_track_metadata(position_info[POSINF_ELEM_TRACK_DATA]))
             track_info["number"] = position_info[POSINF_ELEM_TRACK]
             track_info["duration"] = timespan_secs(position_info[POSINF_ELEM_DURATION])
             track_info["uri"] = position_info[POSINF_ELEM_URI]
             track_info["position"] = timespan_secs(position_info[POSINF_ELEM_ABS_TIME])
 
-            if metadata_xml is not None:
-                metadata = xmltodict.parse(metadata_xml)
-                if DIDL_ELEM_TITLE in metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM]:
-                    track_info[TRACKINF_TITLE] = metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM][DIDL_ELEM_TITLE]
-                if DIDL_ELEM_ARTIST in metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM]:
-                    track_info[TRACKINF_ARTIST] = metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM][DIDL_ELEM_ARTIST]
-                if DIDL_ELEM_ART_URI in metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM]:
-                    if DIDL_VALUE in metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM][DIDL_ELEM_ART_URI]:
-                        track_info[TRACKINF_IMGURI] = metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM][DIDL_ELEM_ART_URI][DIDL_VALUE]
-                if DIDL_ELEM_ALBUM in metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM]:
-                    track_info[TRACKINF_ALBUM] = metadata[DIDL_ELEMENT][DIDL_ELEM_ITEM][DIDL_ELEM_ALBUM]
-
             return track_info
+
+    def parse_track_metadata(self, metadata_xml):
+        """Return media information from DIDL-Lite track metadata.
+
+        Parsed metadata is kept in a bounded LRU cache keyed by the raw XML, so
+        the metadata of an unchanged track is not parsed again on every update.
+        """
+        if metadata_xml in self.track_metadata_cache:
+            self.track_metadata_cache.move_to_end(metadata_xml)
+            self.track_metadata_cache_stats["hits"] += 1
+            return self.track_metadata_cache[metadata_xml]
+        self.track_metadata_cache_stats["misses"] += 1
+
+        track_metadata = {
+            TRACKINF_TITLE: None,
+            TRACKINF_ARTIST: None,
+            TRACKINF_IMGURI: None,
+            TRACKINF_ALBUM: None,
+        }
+
+        if metadata_xml is not None:
+            item = next(iter_didl_objects(metadata_xml), None)
+            if item is not None:
+                track_metadata[TRACKINF_TITLE] = item.title
+                track_metadata[TRACKINF_ARTIST] = item.artist
+                track_metadata[TRACKINF_IMGURI] = item.art_uri
+                track_metadata[TRACKINF_ALBUM] = item.album
+
+        self.track_metadata_cache[metadata_xml] = track_metadata
+        if len(self.track_metadata_cache) > MAX_TRACK_METADATA_CACHE_SIZE:
+            self.track_metadata_cache.popitem(last=False)
+        return track_metadata
@@ -7,10 +7,12 @@ from hassfeld.constants import (
     POWER_STANDBY_AUTOMATIC,
     POWER_STANDBY_MANUAL,
 )
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 
 from . import log_debug
 from .const import DEVICE_MANUFACTURER, DOMAIN, POWER_ECO, POWER_ON, POWER_STANDBY, ROOM_PREFIX
+from .coordinator import room_slice
 
 STATE_TO_ICON = {
     POWER_ACTIVE: "mdi:power-on",
@@ -42,11 +44,12 @@ class RaumfeldRoom(Entity):
         self._room_name = self._config["room_name"]
         self._state = None
         self._icon = None
+        self._raumfeld = None
 
     @property
     def should_poll(self):
-        """Return True as entity has to be polled for state."""
-        return True
+        """Return False as entity is updated by the coordinator."""
+        return False
 
     @property
     def name(self):
@@ -78,6 +81,22 @@ class RaumfeldRoom(Entity):
             "model": "Raumfeld Speaker",
         }
 
+    def coordinator_slices(self):
+        """Return the coordinator slices the state of the entity depends on."""
+        return [room_slice(self._room_name)]
+
+    async def async_added_to_hass(self):
+        """Subscribe to coordinator updates and request initial state."""
+        coordinator = self._raumfeld.coordinator
+        for slice_key in self.coordinator_slices():
+            self.async_on_remove(coordinator.async_add_listener(slice_key, self._handle_coordinator_update))
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Update state after a change of a subscribed slice."""
+        self.async_schedule_update_ha_state(True)
+
     async def async_update(self):
         """Update sensor."""
         if inspect.iscoroutinefunction(self._get_state):
@@ -13,6 +13,7 @@ from .const import (
     DEFAULT_ANNOUNCEMENT_VOLUME,
     DEFAULT_CHANGE_STEP_VOLUME_DOWN,
     DEFAULT_CHANGE_STEP_VOLUME_UP,
+    DEFAULT_DEVICE_INFO_TTL,
     DEFAULT_HOST_WEBSERVICE,
     DEFAULT_PORT_WEBSERVICE,
     DEFAULT_VOLUME,
@@ -21,6 +22,7 @@ from .const import (
     OPTION_CHANGE_STEP_VOLUME_DOWN,
     OPTION_CHANGE_STEP_VOLUME_UP,
     OPTION_DEFAULT_VOLUME,
+    OPTION_DEVICE_INFO_TTL,
     OPTION_FIXED_ANNOUNCEMENT_VOLUME,
     OPTION_USE_DEFAULT_VOLUME,
 )
@@ -100,6 +102,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             DEFAULT_CHANGE_STEP_VOLUME_DOWN,
                         ),
                     ): vol.All(int, vol.Range(min=1, max=20)),
+                    vol.Required(
+                        OPTION_DEVICE_INFO_TTL,
+                        default=self.config_entry.options.get(OPTION_DEVICE_INFO_TTL, DEFAULT_DEVICE_INFO_TTL),
+                    ): vol.All(int, vol.Range(min=1, max=168)),
                 }
             ),
         )
@@ -2,31 +2,56 @@
 
 VERSION = "0.1.17-alpha1"
 
+ATTR_EVENT_WSUPD_TOPOLOGY_VERSION = "topology_version"
 ATTR_EVENT_WSUPD_TYPE = "type"
+ATTR_EVENT_WSUPD_TYPES = "types"
+BROWSE_PAGE_SIZE = 200
+BROWSE_PREFETCH_COUNT = 4
 DEFAULT_ANNOUNCEMENT_VOLUME = 40
 DEFAULT_CHANGE_STEP_VOLUME_DOWN = 2
 DEFAULT_CHANGE_STEP_VOLUME_UP = 5
+DEFAULT_DEVICE_INFO_TTL = 24
 DEFAULT_HOST_WEBSERVICE = "raumfeld-host.example.com"
 DEFAULT_PORT_WEBSERVICE = "47365"
 DEFAULT_VOLUME = 25
+DELAY_EVENT_COALESCING = 0.5
 DELAY_FAST_UPDATE_CHECKS = 0.3
+DELAY_HOST_VALIDATION_MAX = 300
 DELAY_MODERATE_UPDATE_CHECKS = 1
-DELAY_POWER_STATE_UPDATE = 2
 DEVICE_MANUFACTURER = "Teufel Audio GmbH"
-DIDL_ATTR_ID = "@id"
 DIDL_ATTR_CHILD_CNT = "@childCount"
-DIDL_ELEM_ARTIST = "upnp:artist"
-DIDL_ELEM_ART_URI = "upnp:albumArtURI"
-DIDL_ELEM_CLASS = "upnp:class"
-DIDL_ELEM_CONTAINER = "container"
-DIDL_ELEM_ITEM = "item"
-DIDL_ELEM_TITLE = "dc:title"
-DIDL_ELEM_ALBUM = "upnp:album"
-DIDL_ELEMENT = "DIDL-Lite"
-DIDL_VALUE = "#text"
 DOMAIN = "teufel_raumfeld"
+EVENT_CHANNEL_MASTER = "Master"
+EVENT_SUBSCRIPTION_TIMEOUT = 300
+EVENT_VAR_AV_TRANSPORT_URI = "AVTransportURI"
+EVENT_VAR_CURRENT_PLAY_MODE = "CurrentPlayMode"
+EVENT_VAR_CURRENT_TRACK = "CurrentTrack"
+EVENT_VAR_CURRENT_TRACK_META_DATA = "CurrentTrackMetaData"
+EVENT_VAR_CURRENT_TRACK_URI = "CurrentTrackURI"
+EVENT_VAR_LAST_CHANGE = "LastChange"
+EVENT_VAR_MUTE = "Mute"
+EVENT_VAR_ROOM_VOLUMES = "RoomVolumes"
+EVENT_VAR_SYSTEM_UPDATE_ID = "SystemUpdateID"
+EVENT_VAR_TRANSPORT_STATE = "TransportState"
+EVENT_VAR_VOLUME = "Volume"
 EVENT_WEBSERVICE_UPDATE = "teufel_raumfeld.webservice_update"
 GROUP_PREFIX = "Group: "
+INTERVAL_EVENT_RENEWAL = 30
+INTERVAL_POLL = 10
+INTERVAL_POLL_IDLE = 60
+INTERVAL_POLL_SLOW = 30
+INTERVAL_POLL_STANDBY = 600
+INTERVAL_POSITION_CHECK = 60
+MAX_ANNOUNCEMENT_RECORDS = 10
+MAX_BROWSE_ACCESS_COUNTS = 500
+MAX_BROWSE_CACHE_SIZE = 64
+MAX_BROWSE_LISTED_SIZE = 1000
+MAX_PARALLEL_BROWSE_PREFETCHES = 2
+MAX_PARALLEL_DEVICE_INTROSPECTIONS = 4
+MAX_PARALLEL_REQUESTS_PER_DEVICE = 4
+MAX_POSITION_DRIFT = 2
+MAX_TRACK_METADATA_CACHE_SIZE = 32
+MEDIA_CONTENT_ID_PAGE_SEP = "[:page:]"
 MEDIA_CONTENT_ID_SEP = "[:sep:]"
 MESSAGE_PHASE_ALPHA = (
     "You are using teufel_raumfeld, which is still in alpha phase and therefore subject to change."
@@ -39,6 +64,7 @@ OPTION_ANNOUNCEMENT_VOLUME = "announcement_volume"
 OPTION_CHANGE_STEP_VOLUME_DOWN = "change_step_volume_down"
 OPTION_CHANGE_STEP_VOLUME_UP = "change_step_volume_up"
 OPTION_DEFAULT_VOLUME = "default_volume"
+OPTION_DEVICE_INFO_TTL = "device_info_ttl"
 OPTION_FIXED_ANNOUNCEMENT_VOLUME = "fixed_announcement_volume"
 OPTION_USE_DEFAULT_VOLUME = "use_default_volume"
 PLATFORMS = ["media_player", "sensor", "select", "number"]
@@ -63,8 +89,25 @@ SERVICE_DROP_ROOM = "drop_room"
 SERVICE_PLAY_SYSTEM_SOUND = "play_sound"
 SERVICE_RESTORE = "restore"
 SERVICE_SNAPSHOT = "snapshot"
+SLICE_DEVICE_INFO = "device_info"
+SLICE_DEVICES = "devices"
+SLICE_MEDIA_SERVER = "media_server"
+SLICE_POLL = "poll"
+SLICE_ROOM = "room"
+SLICE_ROOM_VOLUME = "room_volume"
+SLICE_SYSTEM = "system"
+SLICE_ZONE = "zone"
+SLICE_ZONES = "zones"
+STORAGE_DELAY_SAVE = 10
+STORAGE_VERSION = 1
+TIMEOUT_ANNOUNCEMENT = 300
+TIMEOUT_ANNOUNCEMENT_GRACE = 5
+TIMEOUT_BROWSE_CACHE = 300
+TIMEOUT_EVENT_REQUEST = 5
+TIMEOUT_POLL_BOOST = 60
+TIMEOUT_POWER_STATE = 10
 TIMEOUT_TRANSITION_PERIOD = 5
-TIMEOUT_HOST_VALIDATION = 30
+TITLE_MORE = "More…"
 TITLE_UNKNOWN = "Unkown title (Teufel Raumfeld)"
 TRACKINF_ALBUM = "album"
 TRACKINF_ARTIST = "artist"
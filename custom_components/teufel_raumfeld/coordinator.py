@@ -0,0 +1,1014 @@
+"""Coordinator sharing the state of a Raumfeld host with its entities."""
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from functools import partial
+
+from hassfeld.constants import (
+    POWER_STANDBY_AUTOMATIC,
+    POWER_STANDBY_MANUAL,
+    SERVICE_AV_TRANSPORT,
+    TRANSPORT_STATE_PLAYING,
+    TRANSPORT_STATE_TRANSITIONING,
+    TRIGGER_UPDATE_DEVICES,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util.dt import utcnow
+
+from . import log_debug, log_info, log_warn
+from .const import (
+    DEFAULT_DEVICE_INFO_TTL,
+    DELAY_FAST_UPDATE_CHECKS,
+    DELAY_MODERATE_UPDATE_CHECKS,
+    DOMAIN,
+    EVENT_VAR_AV_TRANSPORT_URI,
+    EVENT_VAR_CURRENT_PLAY_MODE,
+    EVENT_VAR_CURRENT_TRACK,
+    EVENT_VAR_CURRENT_TRACK_META_DATA,
+    EVENT_VAR_CURRENT_TRACK_URI,
+    EVENT_VAR_MUTE,
+    EVENT_VAR_ROOM_VOLUMES,
+    EVENT_VAR_TRANSPORT_STATE,
+    EVENT_VAR_VOLUME,
+    INTERVAL_POLL,
+    INTERVAL_POLL_IDLE,
+    INTERVAL_POLL_SLOW,
+    INTERVAL_POLL_STANDBY,
+    INTERVAL_POSITION_CHECK,
+    MAX_ANNOUNCEMENT_RECORDS,
+    MAX_PARALLEL_DEVICE_INTROSPECTIONS,
+    MAX_PARALLEL_REQUESTS_PER_DEVICE,
+    MAX_POSITION_DRIFT,
+    OPTION_DEVICE_INFO_TTL,
+    SLICE_DEVICE_INFO,
+    SLICE_DEVICES,
+    SLICE_POLL,
+    SLICE_ROOM,
+    SLICE_ROOM_VOLUME,
+    SLICE_SYSTEM,
+    SLICE_ZONE,
+    SLICE_ZONES,
+    STORAGE_DELAY_SAVE,
+    STORAGE_VERSION,
+    TIMEOUT_ANNOUNCEMENT,
+    TIMEOUT_ANNOUNCEMENT_GRACE,
+    TIMEOUT_POLL_BOOST,
+    TIMEOUT_POWER_STATE,
+    TIMEOUT_TRANSITION_PERIOD,
+)
+
+POWER_STATES_STANDBY = (POWER_STANDBY_AUTOMATIC, POWER_STANDBY_MANUAL)
+TRANSPORT_STATES_ACTIVE = (TRANSPORT_STATE_PLAYING, TRANSPORT_STATE_TRANSITIONING)
+EVENT_VARS_TRACK_CHANGE = (
+    EVENT_VAR_AV_TRANSPORT_URI,
+    EVENT_VAR_CURRENT_TRACK,
+    EVENT_VAR_CURRENT_TRACK_META_DATA,
+    EVENT_VAR_CURRENT_TRACK_URI,
+)
+
+
+def room_slice(room):
+    """Return the key of the snapshot slice describing a room."""
+    return (SLICE_ROOM, room)
+
+
+def room_volume_slice(room):
+    """Return the key of the slice holding the volume of a room."""
+    return (SLICE_ROOM_VOLUME, room)
+
+
+def zone_key(rooms):
+    """Return the key identifying a zone independent of the order of its rooms."""
+    return frozenset(rooms)
+
+
+def zone_slice(rooms):
+    """Return the key of the slice holding the media state of a zone."""
+    return (SLICE_ZONE, zone_key(rooms))
+
+
+@dataclass
+class ZoneState:
+    """Media state of a zone as reported by its virtual renderer."""
+
+    transport_state: str | None = None
+    volume: int | None = None
+    mute: bool | None = None
+    track_info: dict | None = None
+    play_mode: str | None = None
+    position_updated_at: datetime | None = None
+    position_checked_at: datetime | None = field(default=None, compare=False)
+    updated_at: datetime | None = field(default=None, compare=False)
+
+    def media_position(self, now):
+        """Return the position of the current track extrapolated to now."""
+        if not self.track_info or self.position_updated_at is None:
+            return None
+        position = self.track_info.get("position") or 0
+        if self.transport_state in TRANSPORT_STATES_ACTIVE:
+            position += (now - self.position_updated_at).total_seconds()
+        return position
+
+    def track_info_is_outdated(self, now):
+        """Return True if the position can't be extrapolated reliably any longer.
+
+        This is the case if no track information is known, the current track
+        is a stream without duration whose metadata may change any time, the
+        extrapolated position reached the end of the track or the position
+        wasn't verified for INTERVAL_POSITION_CHECK seconds.
+        """
+        if self.media_position(now) is None:
+            return True
+        if self.transport_state not in TRANSPORT_STATES_ACTIVE:
+            return False
+        duration = self.track_info.get("duration")
+        if not duration or self.media_position(now) >= duration:
+            return True
+        return self.position_check_is_due(now)
+
+    def position_check_is_due(self, now):
+        """Return True if the position of an active track wasn't verified for INTERVAL_POSITION_CHECK seconds.
+
+        Renderer events neither carry the position nor report seeks, so the
+        position of evented zones is only verified at this interval.
+        """
+        if self.transport_state not in TRANSPORT_STATES_ACTIVE or self.position_updated_at is None:
+            return False
+        checked_at = self.position_checked_at or self.position_updated_at
+        return now - checked_at >= timedelta(seconds=INTERVAL_POSITION_CHECK)
+
+
+@dataclass
+class DeviceInfo:
+    """Software information of a device, which only changes with a firmware update."""
+
+    sw_version: str | None = None
+    update_version: str | None = None
+    updated_at: datetime | None = field(default=None, compare=False)
+
+
+@dataclass
+class EntityPlatform:
+    """Entities of a platform kept in line with the topology of the host."""
+
+    domain: str
+    async_add_entities: Callable
+    async_create_entities: Callable
+    retire: Callable | None = None
+    entities: dict = field(default_factory=dict)
+
+
+class RaumfeldCoordinator:
+    """Holds the latest host snapshot and notifies entities on changes.
+
+    The snapshot is split into slices (zones, devices, system state and one
+    slice per room). Listeners subscribe to the slices they depend on and are
+    only called if the value of such a slice changed. The poll slices are
+    triggered periodically for entities whose state is not part of the web
+    service data and therefore still has to be requested from the devices.
+    Each zone and room is polled at its own interval depending on its state:
+    fast while playing, slow while idle and rarely while in standby. After a
+    web service update all of them are polled at the fast interval for a
+    while, as their state is likely to change.
+
+    The media state of each zone is cached and requested once per poll cycle,
+    regardless of how many entities (the zone and each of its rooms) show it.
+    The volumes of the rooms are requested together for all rooms of a zone.
+    Zones whose renderer events are received (see eventing.py) are kept up to
+    date by these events and not polled, only the position of their track is
+    verified every INTERVAL_POSITION_CHECK seconds. The events of a zone also
+    carry the volumes of its rooms.
+
+    The software information of the devices is cached as well. It's requested
+    again only after a device update of the web service or once the cached
+    information is older than the configured time to live. The descriptions of
+    the devices, which don't change at all, and the last known topology are
+    stored across restarts, so entities can be created before the host
+    answers.
+
+    Entities of new rooms, zones and devices are added as soon as the topology
+    changes, entities of vanished ones are retired at the same time. Retired
+    entities keep their registry entry, so a speaker missing for a moment
+    keeps its customizations. Registry entries are only removed once at setup
+    for rooms, zones and devices not part of the stored topology.
+    """
+
+    def __init__(self, hass: HomeAssistant, raumfeld, entry_id=None):
+        """Initialize the coordinator of a Raumfeld host."""
+        self.hass = hass
+        self.raumfeld = raumfeld
+        self._entry_id = entry_id
+        self._store = None if entry_id is None else Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.device_descriptions = {}
+        self.stored_topology = None
+        self.snapshot = {}
+        self.zone_states = {}
+        self.room_volumes = {}
+        self.eventing = None
+        self._listeners = {}
+        self._unsub_timers = []
+        self._zone_fetches = {}
+        self._refresh_task = None
+        self._volume_task = None
+        self._volume_groups_cache = []
+        self._volume_groups_version = None
+        self._device_semaphores = {}
+        self._failing_devices = set()
+        self._poll_due = {}
+        self._boost_until = None
+        self._transitions = {}
+        self.device_infos = {}
+        self._entity_platforms = []
+        self._entity_sync_task = None
+        self._entity_sync_pending = False
+        self._topology_version = None
+        self._device_info_fetches = {}
+        self.announcements = deque(maxlen=MAX_ANNOUNCEMENT_RECORDS)
+
+    async def async_load(self):
+        """Load the data stored by a previous run."""
+        if self._store is None:
+            return
+        data = await self._store.async_load() or {}
+        self.device_descriptions = data.get("devices", {})
+        self.stored_topology = data.get("topology")
+        log_debug(f"Loaded descriptions of {len(self.device_descriptions)} devices")
+
+    @callback
+    def _async_schedule_save(self):
+        """Store the data to be kept across restarts after a short delay."""
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_store, STORAGE_DELAY_SAVE)
+
+    def _data_to_store(self):
+        """Return the device descriptions and the topology of the host as stored."""
+        data = {"devices": self.device_descriptions}
+        if self.raumfeld.get_rooms():
+            data["topology"] = self.raumfeld.get_topology()
+        return data
+
+    @callback
+    def async_add_listener(self, slice_key, update_callback) -> CALLBACK_TYPE:
+        """Call update_callback on changes of a slice, returns unsubscribe callback."""
+        self._listeners.setdefault(slice_key, []).append(update_callback)
+
+        @callback
+        def remove_listener():
+            listeners = self._listeners.get(slice_key, [])
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+            if not listeners:
+                self._listeners.pop(slice_key, None)
+
+        return remove_listener
+
+    @callback
+    def async_start(self):
+        """Start periodic triggering of the poll slices."""
+        self.snapshot = self._build_snapshot()
+        self._topology_version = self.raumfeld.topology_version
+        self._unsub_timers = [
+            async_track_time_interval(
+                self.hass,
+                self._async_poll,
+                timedelta(seconds=INTERVAL_POLL),
+                name="teufel_raumfeld poll",
+            ),
+        ]
+
+    @callback
+    def async_stop(self):
+        """Stop periodic triggering and drop all listeners."""
+        for unsub in self._unsub_timers:
+            unsub()
+        self._unsub_timers = []
+        self._listeners = {}
+        for task in (self._refresh_task, self._volume_task, self._entity_sync_task):
+            if task is not None:
+                task.cancel()
+        self._refresh_task = None
+        self._volume_task = None
+        self._entity_sync_task = None
+        self._entity_platforms = []
+
+    @callback
+    def async_handle_update(self, update_type):
+        """Refresh snapshot after a web service update and notify changed slices."""
+        snapshot = self._build_snapshot()
+        changed = {key for key in snapshot.keys() | self.snapshot.keys() if snapshot.get(key) != self.snapshot.get(key)}
+        self.snapshot = snapshot
+        log_debug(f"Update type '{update_type}' changed slices: {changed}")
+        self._boost_until = utcnow() + timedelta(seconds=TIMEOUT_POLL_BOOST)
+        self._poll_due = {}
+        if SLICE_ZONES in changed:
+            current_zones = {zone_key(zone) for zone in snapshot[SLICE_ZONES]}
+            for key in self.zone_states.keys() - current_zones:
+                del self.zone_states[key]
+        if update_type == TRIGGER_UPDATE_DEVICES or SLICE_SYSTEM in changed:
+            self.device_infos = {}
+            changed.add(SLICE_DEVICE_INFO)
+        if self.eventing is not None and changed & {SLICE_DEVICES, SLICE_ZONES}:
+            self.eventing.async_schedule_sync()
+        topology_version = self.raumfeld.topology_version
+        if topology_version != self._topology_version or SLICE_DEVICES in changed:
+            self._topology_version = topology_version
+            self._prune_device_keys()
+            self.async_schedule_entity_sync()
+            self._async_schedule_save()
+        for slice_key in changed:
+            self._async_notify(slice_key)
+
+    def _prune_device_keys(self):
+        """Forget the request limits and failures of zones and devices not in the topology anymore."""
+        raumfeld = self.raumfeld
+        current = {zone_key(zone) for zone in raumfeld.get_zones()}
+        current.update(zone_key(self._volume_group(room)) for room in raumfeld.get_rooms())
+        current.update(raumfeld.get_raumfeld_device_udns())
+        for device_key in self._device_semaphores.keys() - current:
+            del self._device_semaphores[device_key]
+        self._failing_devices &= current
+
+    async def async_track_entities(self, domain, async_add_entities, async_create_entities, retire=None):
+        """Add the entities of a platform and keep them in line with the topology.
+
+        async_create_entities returns the entities the current topology
+        requires. After each change of the topology, the ones not added yet
+        are added and added ones that aren't required anymore are retired,
+        i.e. removed while their registry entry is kept. If retire is passed,
+        only entities for whose unique ID it returns True are retired.
+        """
+        platform = EntityPlatform(domain, async_add_entities, async_create_entities, retire)
+        self._entity_platforms.append(platform)
+        await self._async_sync_platform_entities(platform)
+        self._async_remove_stale_registry_entries(platform)
+
+    @callback
+    def _async_remove_stale_registry_entries(self, platform):
+        """Remove registry entries of a platform not required by the topology the entry was set up with."""
+        if self._entry_id is None:
+            return
+        registry = entity_registry.async_get(self.hass)
+        for registry_entry in entity_registry.async_entries_for_config_entry(registry, self._entry_id):
+            unique_id = registry_entry.unique_id
+            if registry_entry.domain != platform.domain or unique_id in platform.entities:
+                continue
+            if platform.retire is not None and not platform.retire(unique_id):
+                continue
+            log_info(f"Removing registry entry of vanished room, zone or device: {registry_entry.entity_id}")
+            registry.async_remove(registry_entry.entity_id)
+
+    @callback
+    def async_schedule_entity_sync(self):
+        """Adapt the entities of all platforms to a changed topology in the background."""
+        if not self._entity_platforms:
+            return
+        if self._entity_sync_task is None or self._entity_sync_task.done():
+            self._entity_sync_task = self.hass.async_create_task(self._async_sync_entities())
+        else:
+            self._entity_sync_pending = True
+
+    async def _async_sync_entities(self):
+        """Adapt the entities of all platforms until the topology didn't change meanwhile."""
+        self._entity_sync_pending = True
+        while self._entity_sync_pending:
+            self._entity_sync_pending = False
+            for platform in list(self._entity_platforms):
+                await self._async_sync_platform_entities(platform)
+
+    async def _async_sync_platform_entities(self, platform):
+        """Add new entities of a platform and retire vanished ones, diffing by unique ID."""
+        required = {entity.unique_id: entity for entity in await platform.async_create_entities()}
+        new_entities = [entity for unique_id, entity in required.items() if unique_id not in platform.entities]
+        platform.entities.update((entity.unique_id, entity) for entity in new_entities)
+        if new_entities:
+            log_info(f"Adding {len(new_entities)} {platform.domain} entities")
+            platform.async_add_entities(new_entities)
+        for unique_id in [unique_id for unique_id in platform.entities if unique_id not in required]:
+            if platform.retire is not None and not platform.retire(unique_id):
+                continue
+            entity = platform.entities.pop(unique_id)
+            log_info(f"Retiring {platform.domain} entity of vanished room, zone or device: {entity.entity_id or unique_id}")
+            if entity.hass is not None:
+                await entity.async_remove()
+
+    async def async_get_zone_state(self, rooms, max_age=INTERVAL_POLL):
+        """Return state of a zone, requesting it only if the cached one is outdated."""
+        zone_state = self.zone_states.get(zone_key(rooms))
+        if zone_state is not None and self.is_evented(zone_slice(rooms)):
+            return zone_state
+        if zone_state is not None and utcnow() - zone_state.updated_at < timedelta(seconds=max_age):
+            return zone_state
+        return await self.async_refresh_zone(rooms)
+
+    async def async_refresh_zone(self, rooms):
+        """Request state of a zone once for all concurrent callers and notify on changes."""
+        key = zone_key(rooms)
+        if key not in self._zone_fetches:
+            self._zone_fetches[key] = self.hass.async_create_task(self._async_fetch_and_store(key))
+        return await asyncio.shield(self._zone_fetches[key])
+
+    async def _async_fetch_and_store(self, key):
+        """Request state of a zone, store it in the cache and notify on changes."""
+        try:
+            zone_state = await self._async_fetch_zone_state(sorted(key))
+        finally:
+            self._zone_fetches.pop(key, None)
+        changed = zone_state != self.zone_states.get(key)
+        self.zone_states[key] = zone_state
+        self._poll_due[(SLICE_ZONE, key)] = zone_state.updated_at + self._zone_poll_interval(key)
+        if changed:
+            self._async_notify((SLICE_ZONE, key))
+        return zone_state
+
+    async def async_wait_end_of_media(self, rooms):
+        """Wait until a zone finished playing its current media, e.g. an announcement.
+
+        The end of media is signalled by a transport state change of the zone,
+        received as event or, if events of the zone aren't received, requested
+        once the extrapolated position reached the end of the media and every
+        DELAY_MODERATE_UPDATE_CHECKS afterwards. Waiting is bounded by the media
+        duration plus TIMEOUT_ANNOUNCEMENT_GRACE, at most TIMEOUT_ANNOUNCEMENT.
+        Returns a record of the announcement, which is kept for diagnostics.
+        """
+        key = zone_key(rooms)
+        started = time.monotonic()
+        await self.async_refresh_zone(rooms)
+        zone_state = await self.async_refresh_track_info(rooms)
+        duration = zone_state.track_info.get("duration") if zone_state.track_info else None
+        timeout = min(duration + TIMEOUT_ANNOUNCEMENT_GRACE, TIMEOUT_ANNOUNCEMENT) if duration else TIMEOUT_ANNOUNCEMENT
+        ended = asyncio.Event()
+
+        @callback
+        def check_end_of_media():
+            zone_state = self.zone_states.get(key)
+            if zone_state is None or zone_state.transport_state not in TRANSPORT_STATES_ACTIVE:
+                ended.set()
+
+        unsub = self.async_add_listener(zone_slice(rooms), check_end_of_media)
+        check_end_of_media()
+        try:
+            async with asyncio.timeout(timeout):
+                if self.is_evented(zone_slice(rooms)):
+                    await ended.wait()
+                else:
+                    position = zone_state.media_position(utcnow()) or 0
+                    delay = max((duration or 0) - position, DELAY_MODERATE_UPDATE_CHECKS)
+                    while not ended.is_set():
+                        with contextlib.suppress(TimeoutError):
+                            async with asyncio.timeout(delay):
+                                await ended.wait()
+                        if not ended.is_set():
+                            await self.async_refresh_zone(rooms)
+                        delay = DELAY_MODERATE_UPDATE_CHECKS
+            finished = True
+        except TimeoutError:
+            finished = False
+        finally:
+            unsub()
+
+        announcement = {
+            "rooms": sorted(rooms),
+            "media_duration": duration,
+            "elapsed": round(time.monotonic() - started, 1),
+            "finished": finished,
+        }
+        self.announcements.append(announcement)
+        log_debug(f"Announcement on {announcement['rooms']} took {announcement['elapsed']}s, media duration: {duration}s")
+        if not finished:
+            log_warn(f"End of announcement on {announcement['rooms']} not detected within {timeout}s")
+        return announcement
+
+    async def async_wait_power_state(self, room, power_state):
+        """Wait until the web service reports the passed power state of a room.
+
+        Rooms switched at once are confirmed by the same system state update.
+        Returns False if the power state isn't reported within
+        TIMEOUT_POWER_STATE.
+        """
+        confirmed = asyncio.Event()
+
+        @callback
+        def check_power_state():
+            if self.raumfeld.get_room_power_state(room) == power_state:
+                confirmed.set()
+
+        unsub = self.async_add_listener(room_slice(room), check_power_state)
+        check_power_state()
+        try:
+            async with asyncio.timeout(TIMEOUT_POWER_STATE):
+                await confirmed.wait()
+        except TimeoutError:
+            log_warn(f"Power state '{power_state}' of room '{room}' not confirmed within {TIMEOUT_POWER_STATE}s")
+            return False
+        finally:
+            unsub()
+        return True
+
+    def is_evented(self, target, service_type=None):
+        """Return True if the state of a zone or room slice, optionally of one service, is kept up to date by events."""
+        return self.eventing is not None and self.eventing.is_subscribed(target, service_type)
+
+    @callback
+    def async_apply_zone_event(self, key, changes):
+        """Apply the changes of a renderer event to the cached state of a zone."""
+        zone_state = self.zone_states.get(key)
+        updates = {}
+        if EVENT_VAR_TRANSPORT_STATE in changes:
+            updates["transport_state"] = changes[EVENT_VAR_TRANSPORT_STATE]
+            if updates["transport_state"] != TRANSPORT_STATE_TRANSITIONING:
+                self._async_resolve_transition((SLICE_ZONE, key), updates["transport_state"])
+        if EVENT_VAR_CURRENT_PLAY_MODE in changes:
+            updates["play_mode"] = changes[EVENT_VAR_CURRENT_PLAY_MODE]
+        volume = self._parse_event_volume(changes)
+        if volume is not None:
+            updates["volume"] = volume
+        if EVENT_VAR_ROOM_VOLUMES in changes:
+            self._async_store_room_volumes(self._parse_room_volumes(changes[EVENT_VAR_ROOM_VOLUMES]))
+        if EVENT_VAR_MUTE in changes:
+            mute = str(changes[EVENT_VAR_MUTE]).lower()
+            if mute in ("0", "1", "false", "true"):
+                updates["mute"] = mute in ("1", "true")
+            else:
+                log_debug(f"Ignoring malformed mute state of event: {changes[EVENT_VAR_MUTE]!r}")
+        if zone_state is not None and updates:
+            new_zone_state = replace(zone_state, **updates, updated_at=utcnow())
+            self.zone_states[key] = new_zone_state
+            if new_zone_state != zone_state:
+                self._async_notify((SLICE_ZONE, key))
+        if zone_state is None:
+            self.hass.async_create_task(self.async_refresh_zone(key))
+        elif any(var in changes for var in EVENT_VARS_TRACK_CHANGE) or (
+            updates.get("transport_state", zone_state.transport_state) != zone_state.transport_state
+        ):
+            # Track metadata and position are not part of the event, hence request them.
+            self.hass.async_create_task(self.async_refresh_track_info(sorted(key)))
+
+    @callback
+    def async_apply_room_event(self, room, changes):
+        """Apply the changes of a renderer event to the cached volume of a room."""
+        volume = self._parse_event_volume(changes)
+        if volume is not None:
+            self._async_store_room_volumes({room: volume})
+
+    @staticmethod
+    def _parse_event_volume(changes):
+        """Return the volume of a renderer event or None if it has none or a malformed one."""
+        if EVENT_VAR_VOLUME not in changes:
+            return None
+        try:
+            return int(changes[EVENT_VAR_VOLUME])
+        except (TypeError, ValueError):
+            log_debug(f"Ignoring malformed volume of event: {changes[EVENT_VAR_VOLUME]!r}")
+            return None
+
+    @callback
+    def _async_store_room_volumes(self, volumes):
+        """Cache the volumes of rooms and notify the rooms whose volume changed."""
+        for room, volume in volumes.items():
+            if volume is not None and self.room_volumes.get(room) != volume:
+                self.room_volumes[room] = volume
+                self._async_notify(room_volume_slice(room))
+
+    def _parse_room_volumes(self, room_volumes):
+        """Return the volumes by room of a RoomVolumes event variable.
+
+        The variable lists the volume of each room of a zone as comma separated
+        pairs of room UDN and volume, e.g. "uuid:a=30,uuid:b=25".
+        """
+        volumes = {}
+        for pair in room_volumes.split(","):
+            room_udn, _, volume = pair.partition("=")
+            room = self.raumfeld.room_udn_to_name(room_udn.strip())
+            if room is not None and volume.strip().isdigit():
+                volumes[room] = int(volume)
+        return volumes
+
+    def room_volume_is_evented(self, room):
+        """Return True if the volume of a room is kept up to date by events."""
+        if self.is_evented(room_slice(room)):
+            return True
+        zone = self.raumfeld.get_zone_of_room(room)
+        return zone is not None and self.is_evented(zone_slice(zone))
+
+    async def async_get_room_volume(self, room):
+        """Return the volume of a room, requesting the volumes of its zone if not cached."""
+        if room not in self.room_volumes:
+            await self.async_refresh_room_volumes(self._volume_group(room))
+        return self.room_volumes.get(room)
+
+    async def async_refresh_room_volumes(self, rooms):
+        """Request the volumes of rooms in one pass and notify the rooms whose volume changed."""
+        raumfeld = self.raumfeld
+        volumes = await self.async_gather_requests(
+            zone_key(rooms), {room: raumfeld.async_get_room_volume(room) for room in rooms}
+        )
+        self._async_store_room_volumes(volumes)
+
+    def _volume_group(self, room):
+        """Return the rooms whose volumes are requested together with the volume of a room."""
+        return self.raumfeld.get_zone_of_room(room) or (room,)
+
+    def _volume_groups(self):
+        """Return the rooms whose volumes are requested together, one group per zone.
+
+        The groups are only derived again after the topology changed.
+        """
+        topology_version = self.raumfeld.topology_version
+        if self._volume_groups_version != topology_version:
+            self._volume_groups_cache = sorted({self._volume_group(room) for room in self.raumfeld.get_rooms()})
+            self._volume_groups_version = topology_version
+        return self._volume_groups_cache
+
+    async def async_get_device_info(self, udn):
+        """Return software information of a device, requesting it only if not cached."""
+        device_info = self.device_infos.get(udn)
+        if device_info is not None:
+            return device_info
+        if udn not in self._device_info_fetches:
+            self._device_info_fetches[udn] = self.hass.async_create_task(self._async_fetch_device_info(udn))
+        return await asyncio.shield(self._device_info_fetches[udn])
+
+    async def _async_fetch_device_info(self, udn):
+        """Request software information of a device and cache it if it was received."""
+        raumfeld = self.raumfeld
+        try:
+            results = await self.async_gather_requests(
+                udn,
+                {
+                    "sw_version": raumfeld.async_get_device_sw_version(udn),
+                    "update_version": raumfeld.async_get_device_update_version(udn),
+                },
+            )
+        finally:
+            self._device_info_fetches.pop(udn, None)
+        device_info = DeviceInfo(**results, updated_at=utcnow())
+        if device_info.sw_version is not None:
+            self.device_infos[udn] = device_info
+            description = self.device_descriptions.get(udn)
+            if description is not None and description["sw_version"] != device_info.sw_version:
+                description["sw_version"] = device_info.sw_version
+                self._async_schedule_save()
+        return device_info
+
+    async def async_get_device_descriptions(self, udns):
+        """Return descriptions of devices, requesting only those not stored yet.
+
+        Devices are introspected concurrently, at most
+        MAX_PARALLEL_DEVICE_INTROSPECTIONS at a time. Devices whose description
+        or renderer couldn't be requested are left out and retried on the next
+        call.
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_DEVICE_INTROSPECTIONS)
+
+        async def async_describe(udn):
+            async with semaphore:
+                return udn, await self._async_fetch_device_description(udn)
+
+        missing = [udn for udn in udns if udn not in self.device_descriptions]
+        if missing:
+            for udn, description in await asyncio.gather(*(async_describe(udn) for udn in missing)):
+                if description is not None:
+                    self.device_descriptions[udn] = description
+            self._async_schedule_save()
+        return {udn: self.device_descriptions[udn] for udn in udns if udn in self.device_descriptions}
+
+    async def _async_fetch_device_description(self, udn):
+        """Request description and software version of a device."""
+        results, device_info = await asyncio.gather(
+            self.async_gather_requests(udn, {"description": self.raumfeld.async_get_device_description(udn)}),
+            self.async_get_device_info(udn),
+        )
+        if results["description"] is None:
+            log_debug(f"Unable to describe device: {udn}")
+            return None
+        return {**results["description"], "sw_version": device_info.sw_version}
+
+    def _device_info_ttl(self):
+        """Return the configured time to live of cached software information."""
+        return timedelta(hours=self.raumfeld.options.get(OPTION_DEVICE_INFO_TTL, DEFAULT_DEVICE_INFO_TTL))
+
+    async def async_gather_requests(self, device_key, requests):
+        """Run independent requests to one device concurrently.
+
+        At most MAX_PARALLEL_REQUESTS_PER_DEVICE requests are in flight per
+        device. A failing request yields None without affecting the others.
+        Returns a dict mapping the request names to their results.
+        """
+        semaphore = self._device_semaphores.setdefault(device_key, asyncio.Semaphore(MAX_PARALLEL_REQUESTS_PER_DEVICE))
+
+        async def async_request(request):
+            async with semaphore:
+                try:
+                    return await request, None
+                except Exception as err:  # pylint: disable=broad-except
+                    return None, err
+
+        outcomes = await asyncio.gather(*(async_request(request) for request in requests.values()))
+        errors = {name: err for name, (_, err) in zip(requests, outcomes, strict=True) if err is not None}
+        self._log_request_errors(device_key, errors)
+        return {name: result for name, (result, _) in zip(requests, outcomes, strict=True)}
+
+    def _log_request_errors(self, device_key, errors):
+        """Log failing requests once per outage of a device and its recovery.
+
+        While a device keeps failing, e.g. because the host is unreachable,
+        every poll cycle would log the same errors again, hence they are only
+        logged at debug level until the device responds again.
+        """
+        device = ", ".join(sorted(device_key)) if isinstance(device_key, frozenset) else device_key
+        if errors:
+            details = ", ".join(f"'{name}': {err!r}" for name, err in errors.items())
+            if device_key in self._failing_devices:
+                log_debug(f"Requests to {device} failed again: {details}")
+            else:
+                self._failing_devices.add(device_key)
+                log_warn(f"Requests to {device} failed, not logging further failures until it responds: {details}")
+        elif device_key in self._failing_devices:
+            self._failing_devices.discard(device_key)
+            log_info(f"Requests to {device} succeed again")
+
+    @callback
+    def async_update_zone_state(self, rooms, **changes):
+        """Write state requested by an entity, e.g. after a command, into the cached state of a zone.
+
+        Entities apply the cached state on every notification of their zone,
+        so values not written through would be reverted until the next poll.
+        Values that couldn't be requested, i.e. None, are left out.
+        """
+        key = zone_key(rooms)
+        zone_state = self.zone_states.get(key)
+        changes = {name: value for name, value in changes.items() if value is not None}
+        if zone_state is None or not changes:
+            return
+        new_zone_state = replace(zone_state, **changes)
+        if new_zone_state != zone_state:
+            self.zone_states[key] = new_zone_state
+            self._async_notify((SLICE_ZONE, key))
+
+    async def async_refresh_track_info(self, rooms):
+        """Request track information of a zone, e.g. after a seek or track command."""
+        key = zone_key(rooms)
+        cached = self.zone_states.get(key)
+        zone_state = cached or ZoneState()
+        track_info = await self._async_request_track_info(rooms)
+        now = utcnow()
+        new_zone_state = replace(zone_state, track_info=track_info, position_updated_at=None, updated_at=now)
+        self._rebase_position(new_zone_state, cached, now)
+        changed = new_zone_state != zone_state
+        self.zone_states[key] = new_zone_state
+        if changed:
+            self._async_notify((SLICE_ZONE, key))
+        return new_zone_state
+
+    async def _async_request_track_info(self, rooms):
+        """Request track information of a zone, yielding None if the request failed."""
+        results = await self.async_gather_requests(
+            zone_key(rooms), {"track_info": self.raumfeld.async_get_track_info(rooms)}
+        )
+        return results["track_info"]
+
+    async def _async_fetch_zone_state(self, rooms):
+        """Request the media state of a zone from its virtual renderer.
+
+        Track information is only requested if the position of the cached one
+        can't be extrapolated, see ZoneState.track_info_is_outdated, or if the
+        transport state changed.
+        """
+        raumfeld = self.raumfeld
+        cached = self.zone_states.get(zone_key(rooms))
+        now = utcnow()
+        fetch_track_info = cached is None or cached.track_info_is_outdated(now)
+        zone_state = ZoneState()
+        if raumfeld.group_is_valid(rooms):
+            requests = {
+                "transport_state": self.async_get_transport_state(rooms),
+                "volume": raumfeld.async_get_group_volume(rooms),
+                "mute": raumfeld.async_get_group_mute(rooms),
+                "play_mode": raumfeld.async_get_play_mode(rooms),
+            }
+            if fetch_track_info:
+                requests["track_info"] = raumfeld.async_get_track_info(rooms)
+            results = await self.async_gather_requests(zone_key(rooms), requests)
+            if results["transport_state"] is not None:
+                if not fetch_track_info and results["transport_state"] != cached.transport_state:
+                    fetch_track_info = True
+                    results["track_info"] = await self._async_request_track_info(rooms)
+                zone_state = ZoneState(**results)
+                if fetch_track_info:
+                    self._rebase_position(zone_state, cached, now)
+                else:
+                    zone_state.track_info = cached.track_info
+                    zone_state.position_updated_at = cached.position_updated_at
+                    zone_state.position_checked_at = cached.position_checked_at
+        zone_state.updated_at = utcnow()
+        return zone_state
+
+    @staticmethod
+    def _rebase_position(zone_state, cached, now):
+        """Set the position timestamp, keeping the cached one if the drift is small.
+
+        Keeping the cached position and timestamp of an unchanged track avoids
+        a state change on every poll just because the position moved forward.
+        """
+        if not zone_state.track_info:
+            return
+        zone_state.position_updated_at = now
+        zone_state.position_checked_at = now
+        if (
+            cached is None
+            or not cached.track_info
+            or cached.transport_state != zone_state.transport_state
+            or any(cached.track_info.get(key) != zone_state.track_info.get(key) for key in ("uri", "number"))
+        ):
+            return
+        drift = abs((zone_state.track_info.get("position") or 0) - cached.media_position(now))
+        if drift <= MAX_POSITION_DRIFT:
+            zone_state.track_info = {**zone_state.track_info, "position": cached.track_info.get("position")}
+            zone_state.position_updated_at = cached.position_updated_at
+        else:
+            log_debug(f"Position drifted by {drift:.1f}s, rebasing extrapolation")
+
+    async def async_get_transport_state(self, rooms):
+        """Return transport state of a zone, waiting for a transition to finish."""
+        return await self._async_settle_transport_state(
+            zone_slice(rooms), partial(self._async_request_transport_state, rooms)
+        )
+
+    async def async_get_room_transport_state(self, room):
+        """Return transport state of a room outside of a zone, waiting for a transition to finish."""
+        return await self._async_settle_transport_state(
+            room_slice(room), partial(self._async_request_room_transport_state, room)
+        )
+
+    async def _async_request_transport_state(self, rooms):
+        """Request transport state of a zone, returns None if the zone is invalid."""
+        if not self.raumfeld.group_is_valid(rooms):
+            return None
+        info = await self.raumfeld.async_get_transport_info(rooms)
+        return info["CurrentTransportState"] if info else None
+
+    async def _async_request_room_transport_state(self, room):
+        """Request transport state of the renderer of a room."""
+        info = await self.raumfeld.async_get_room_transport_info(room)
+        return info["CurrentTransportState"] if info else None
+
+    async def _async_settle_transport_state(self, target, request):
+        """Return the transport state of a zone or room once it is not transitioning.
+
+        All callers waiting for the transition of the same zone or room share one
+        future. It is resolved by the next transport state received as event or,
+        if AVTransport events of the zone or room aren't received, by a single
+        poller. Room renderers are only subscribed for RenderingControl events,
+        so transitions of rooms are always polled.
+        """
+        if target not in self._transitions:
+            transport_state = await request()
+            if transport_state != TRANSPORT_STATE_TRANSITIONING:
+                return transport_state
+        future = self._transitions.get(target)
+        if future is None:
+            future = self.hass.loop.create_future()
+            self._transitions[target] = future
+            if not self.is_evented(target, SERVICE_AV_TRANSPORT):
+                self.hass.async_create_task(self._async_poll_transition(target, request, future))
+        try:
+            async with asyncio.timeout(TIMEOUT_TRANSITION_PERIOD):
+                return await asyncio.shield(future)
+        except TimeoutError:
+            log_info(f"Transition of {target} did not finish within {TIMEOUT_TRANSITION_PERIOD}s")
+            self._async_resolve_transition(target, TRANSPORT_STATE_TRANSITIONING)
+            return TRANSPORT_STATE_TRANSITIONING
+
+    async def _async_poll_transition(self, target, request, future):
+        """Request transport state until the transition of a zone or room finished."""
+        try:
+            async with asyncio.timeout(TIMEOUT_TRANSITION_PERIOD):
+                while not future.done():
+                    await asyncio.sleep(DELAY_FAST_UPDATE_CHECKS)
+                    transport_state = await request()
+                    if transport_state != TRANSPORT_STATE_TRANSITIONING:
+                        self._async_resolve_transition(target, transport_state)
+        except TimeoutError:
+            self._async_resolve_transition(target, TRANSPORT_STATE_TRANSITIONING)
+
+    @callback
+    def _async_resolve_transition(self, target, transport_state):
+        """Pass the transport state to all callers waiting for the transition of a zone or room."""
+        future = self._transitions.pop(target, None)
+        if future is not None and not future.done():
+            future.set_result(transport_state)
+
+    def poll_interval(self, rooms, transport_state=None):
+        """Return the poll interval of a zone or room derived from its current state."""
+        if self._boost_until is not None and utcnow() < self._boost_until:
+            return timedelta(seconds=INTERVAL_POLL)
+        power_states = [self.snapshot.get(room_slice(room), (None,))[0] for room in rooms]
+        if power_states and all(power_state in POWER_STATES_STANDBY for power_state in power_states):
+            return timedelta(seconds=INTERVAL_POLL_STANDBY)
+        if transport_state in TRANSPORT_STATES_ACTIVE:
+            return timedelta(seconds=INTERVAL_POLL)
+        return timedelta(seconds=INTERVAL_POLL_IDLE)
+
+    def _zone_poll_interval(self, zone):
+        """Return the poll interval of a zone."""
+        zone_state = self.zone_states.get(zone_key(zone))
+        return self.poll_interval(zone, zone_state.transport_state if zone_state is not None else None)
+
+    def _volume_poll_interval(self, rooms):
+        """Return the poll interval of the room volumes of a zone, which is at least the slow one."""
+        zone_state = self.zone_states.get(zone_key(rooms))
+        transport_state = None if zone_state is None else zone_state.transport_state
+        return max(self.poll_interval(rooms, transport_state), timedelta(seconds=INTERVAL_POLL_SLOW))
+
+    def _is_due(self, target, now):
+        """Return True if a zone or room has to be polled."""
+        due = self._poll_due.get(target)
+        return due is None or now >= due
+
+    async def _async_refresh_volume_groups(self, groups):
+        """Refresh the room volumes of the passed zones."""
+        for rooms in groups:
+            await self.async_refresh_room_volumes(rooms)
+
+    async def _async_refresh_zones(self, zones, position_checks=()):
+        """Refresh the state of the passed zones and the track information of evented ones."""
+        for zone in zones:
+            await self.async_refresh_zone(zone)
+        for zone in position_checks:
+            await self.async_refresh_track_info(zone)
+
+    @callback
+    def _async_poll(self, now=None):
+        """Refresh states of zones and rooms that are due and trigger listeners of the poll slice."""
+        now = utcnow()
+        if self._refresh_task is None or self._refresh_task.done():
+            zones = []
+            position_checks = []
+            for zone in self.snapshot.get(SLICE_ZONES, ()):
+                target = zone_slice(zone)
+                if target not in self._listeners:
+                    continue
+                if not self.is_evented(target):
+                    if self._is_due(target, now):
+                        zones.append(zone)
+                    continue
+                # Seeks by other controllers and drift are not reported by events.
+                zone_state = self.zone_states.get(zone_key(zone))
+                if zone_state is not None and zone_state.position_check_is_due(now):
+                    position_checks.append(zone)
+            if zones or position_checks:
+                self._refresh_task = self.hass.async_create_task(self._async_refresh_zones(zones, position_checks))
+        else:
+            log_debug("Skipping refresh of zone states as previous one is still running")
+        if self._volume_task is None or self._volume_task.done():
+            groups = []
+            for rooms in self._volume_groups():
+                polled = [
+                    room
+                    for room in rooms
+                    if room_volume_slice(room) in self._listeners and not self.room_volume_is_evented(room)
+                ]
+                target = (SLICE_ROOM_VOLUME, zone_key(rooms))
+                if polled and self._is_due(target, now):
+                    self._poll_due[target] = now + self._volume_poll_interval(rooms)
+                    groups.append(polled)
+            if groups:
+                self._volume_task = self.hass.async_create_task(self._async_refresh_volume_groups(groups))
+        else:
+            log_debug("Skipping refresh of room volumes as previous one is still running")
+        self._async_notify(SLICE_POLL)
+        expired = now - self._device_info_ttl()
+        outdated = [udn for udn, device_info in self.device_infos.items() if device_info.updated_at < expired]
+        if outdated:
+            for udn in outdated:
+                del self.device_infos[udn]
+            self._async_notify(SLICE_DEVICE_INFO)
+
+    @callback
+    def _async_notify(self, slice_key):
+        """Call all listeners subscribed to a slice."""
+        for update_callback in list(self._listeners.get(slice_key, [])):
+            update_callback()
+
+    def _build_snapshot(self):
+        """Derive the slices from the current web service data."""
+        raumfeld = self.raumfeld
+        snapshot = {
+            SLICE_DEVICES: tuple(raumfeld.get_raumfeld_device_udns()),
+            SLICE_SYSTEM: raumfeld.update_available,
+            SLICE_ZONES: tuple(tuple(zone) for zone in raumfeld.get_zones()),
+        }
+        for room in raumfeld.get_rooms():
+            snapshot[room_slice(room)] = (
+                raumfeld.get_room_power_state(room),
+                raumfeld.room_is_spotify_single_room(room),
+            )
+        return snapshot
@@ -14,14 +14,28 @@ TO_REDACT = {"host", "port"}
 async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     raumfeld: HassRaumfeldHost = entry.runtime_data
+    browse_stats = raumfeld.browse_cache_stats
+    browse_lookups = browse_stats["hits"] + browse_stats["misses"]
 
     return {
         "entry": async_redact_data(entry.as_dict(), TO_REDACT),
         "host": {
-            "valid": await raumfeld.async_host_is_valid(),
+            "valid": raumfeld.validation_stats["last_valid"],
+            "validation": raumfeld.validation_stats,
+            "updates": raumfeld.update_stats,
         },
         "zones": raumfeld.get_zones() if hasattr(raumfeld, "get_zones") else None,
         "rooms": raumfeld.get_rooms() if hasattr(raumfeld, "get_rooms") else None,
         "devices": raumfeld.get_raumfeld_device_udns() if hasattr(raumfeld, "get_raumfeld_device_udns") else None,
         "options": raumfeld.options if hasattr(raumfeld, "options") else None,
+        "track_metadata_cache": {
+            **raumfeld.track_metadata_cache_stats,
+            "size": len(raumfeld.track_metadata_cache),
+        },
+        "browse_cache": {
+            **browse_stats,
+            "size": len(raumfeld.browse_cache),
+            "hit_ratio": round(browse_stats["hits"] / browse_lookups, 3) if browse_lookups else None,
+        },
+        "announcements": list(raumfeld.coordinator.announcements),
     }
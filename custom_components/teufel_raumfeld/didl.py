@@ -0,0 +1,102 @@
+"""Incremental parser of the DIDL-Lite documents of the Raumfeld media server."""
+
+import logging
+from dataclasses import dataclass
+
+from defusedxml import DefusedXmlException, ElementTree
+
+_LOGGER = logging.getLogger(__name__)
+
+NS_DC = "{http://purl.org/dc/elements/1.1/}"
+NS_UPNP = "{urn:schemas-upnp-org:metadata-1-0/upnp/}"
+
+TAG_ALBUM = NS_UPNP + "album"
+TAG_ALBUM_ART_URI = NS_UPNP + "albumArtURI"
+TAG_ARTIST = NS_UPNP + "artist"
+TAG_CLASS = NS_UPNP + "class"
+TAG_TITLE = NS_DC + "title"
+
+ELEM_CONTAINER = "container"
+ELEM_ITEM = "item"
+
+
+@dataclass(slots=True)
+class DidlObject:
+    """Container or item of a DIDL-Lite document."""
+
+    id: str
+    is_container: bool
+    title: str | None = None
+    upnp_class: str | None = None
+    artist: str | None = None
+    album: str | None = None
+    art_uri: str | None = None
+
+
+class _StringReader:
+    """File-like reader passing slices of a string, without copying the whole string."""
+
+    def __init__(self, string):
+        """Initialize the reader of a string."""
+        self._string = string
+        self._position = 0
+
+    def read(self, size):
+        """Return the next slice of the string."""
+        start = self._position
+        self._position += size
+        return self._string[start : self._position]
+
+
+def _local_name(tag):
+    """Return the tag of an element without its namespace."""
+    return tag.rpartition("}")[2]
+
+
+def _to_didl_object(element):
+    """Return the record of a container or item element."""
+    didl_object = DidlObject(element.get("id"), _local_name(element.tag) == ELEM_CONTAINER)
+    for child in element:
+        tag = child.tag
+        # Only the first of repeated properties is used, e.g. of several artists.
+        if tag == TAG_TITLE:
+            if didl_object.title is None:
+                didl_object.title = child.text
+        elif tag == TAG_CLASS:
+            if didl_object.upnp_class is None:
+                didl_object.upnp_class = child.text
+        elif tag == TAG_ARTIST:
+            if didl_object.artist is None:
+                didl_object.artist = child.text
+        elif tag == TAG_ALBUM:
+            if didl_object.album is None:
+                didl_object.album = child.text
+        elif tag == TAG_ALBUM_ART_URI:
+            if didl_object.art_uri is None:
+                didl_object.art_uri = child.text
+    return didl_object
+
+
+def iter_didl_objects(didl_xml):
+    """Yield the containers and items of a DIDL-Lite document in document order.
+
+    The document is parsed incrementally. Each container or item is dropped
+    from the tree as soon as its record is yielded, so the memory needed does
+    not grow with the size of the document. A malformed document ends the
+    iteration after the objects parsed so far.
+    """
+    root = None
+    depth = 0
+    try:
+        for event, element in ElementTree.iterparse(_StringReader(didl_xml), events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = element
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and _local_name(element.tag) in (ELEM_CONTAINER, ELEM_ITEM):
+                yield _to_didl_object(element)
+                root.clear()
+    except (DefusedXmlException, ElementTree.ParseError) as err:
+        _LOGGER.warning("Ignoring malformed DIDL-Lite document: %r", err)
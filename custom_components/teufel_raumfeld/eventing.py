@@ -0,0 +1,268 @@
+"""Subscriptions to the UPnP events of the Raumfeld renderers."""
+
+import asyncio
+from datetime import timedelta
+from functools import partial
+
+from async_upnp_client.aiohttp import AiohttpNotifyServer, AiohttpSessionRequester
+from async_upnp_client.client_factory import UpnpFactory
+from async_upnp_client.exceptions import UpnpError
+from async_upnp_client.utils import async_get_local_ip
+from defusedxml import ElementTree
+from hassfeld.constants import SERVICE_AV_TRANSPORT, SERVICE_CONTENT_DIRECTORY, SERVICE_RENDERING_CONTROL
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util.dt import utcnow
+
+from . import log_debug, log_info, log_warn
+from .const import (
+    EVENT_CHANNEL_MASTER,
+    EVENT_SUBSCRIPTION_TIMEOUT,
+    EVENT_VAR_LAST_CHANGE,
+    EVENT_VAR_SYSTEM_UPDATE_ID,
+    INTERVAL_EVENT_RENEWAL,
+    SLICE_MEDIA_SERVER,
+    SLICE_ROOM,
+    SLICE_ZONE,
+    SLICE_ZONES,
+    TIMEOUT_EVENT_REQUEST,
+)
+from .coordinator import room_slice, zone_slice
+
+
+def parse_last_change(last_change):
+    """Return the state variables of instance 0 changed by a LastChange event.
+
+    Only the changed variables are part of an event, so the result is a delta to
+    be applied on the last known state. For variables reported per channel only
+    the master channel is considered.
+    """
+    changes = {}
+    try:
+        event = ElementTree.fromstring(last_change)
+    except ElementTree.ParseError as err:
+        log_warn(f"Ignoring malformed LastChange event: {err!r}")
+        return changes
+
+    for instance in event:
+        if instance.get("val") != "0":
+            continue
+        for variable in instance:
+            channel = variable.get("channel")
+            if channel is not None and channel != EVENT_CHANNEL_MASTER:
+                continue
+            changes[variable.tag.rpartition("}")[2]] = variable.get("val")
+    return changes
+
+
+class _Subscription:
+    """Event subscription to the services of one renderer."""
+
+    def __init__(self, location, device):
+        """Initialize the subscription of a renderer."""
+        self.location = location
+        # The event handler only keeps weak references to the services.
+        self.device = device
+        self.services = []
+        self.renew_at = None
+
+    def set_timeout(self, timeout):
+        """Schedule renewal of the subscription at half of its lifetime."""
+        renew_at = utcnow() + timeout / 2
+        if self.renew_at is None or renew_at < self.renew_at:
+            self.renew_at = renew_at
+
+
+class RaumfeldEventSubscriber:
+    """Keeps LastChange subscriptions to the zone and room renderers.
+
+    Each zone's virtual renderer is subscribed for AVTransport and
+    RenderingControl events, each room renderer for RenderingControl events.
+    Events are passed as deltas to the coordinator, which updates its cached
+    state and notifies the entities. Zones and rooms without an active
+    subscription, e.g. because it lapsed, are polled by the coordinator until
+    the subscription is re-established. The ContentDirectory of the media
+    server is subscribed for its SystemUpdateID, which invalidates the browse
+    cache of the host.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, session):
+        """Initialize the event subscriber of a Raumfeld host."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.raumfeld = coordinator.raumfeld
+        self._requester = AiohttpSessionRequester(session, with_sleep=True, timeout=TIMEOUT_EVENT_REQUEST)
+        self._factory = UpnpFactory(self._requester, non_strict=True)
+        self._notify_server = None
+        self._subscriptions = {}
+        self._sync_task = None
+        self._sync_pending = False
+        self._unsub_timer = None
+
+    def is_subscribed(self, target, service_type=None):
+        """Return True if events of the zone or room slice, optionally of one service, are received."""
+        subscription = self._subscriptions.get(target)
+        if subscription is None:
+            return False
+        return service_type is None or any(service.service_type == service_type for service in subscription.services)
+
+    async def async_start(self, source_ip=None):
+        """Start the notify server and subscribe to all renderers."""
+        if source_ip is None:
+            _, source_ip = await async_get_local_ip(self.raumfeld.location)
+        notify_server = AiohttpNotifyServer(self._requester, (source_ip, 0))
+        try:
+            await notify_server.async_start_server()
+        except UpnpError as err:
+            log_warn(f"Unable to receive UPnP events, falling back to polling: {err!r}")
+            return
+        self._notify_server = notify_server
+        log_info(f"Receiving UPnP events at: {notify_server.callback_url}")
+        self._unsub_timer = async_track_time_interval(
+            self.hass,
+            self._async_renew,
+            timedelta(seconds=INTERVAL_EVENT_RENEWAL),
+            name="teufel_raumfeld event renewal",
+        )
+        await self.async_sync()
+
+    async def async_stop(self):
+        """Cancel all subscriptions and stop the notify server."""
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+        if self._notify_server is not None:
+            notify_server, self._notify_server = self._notify_server, None
+            await notify_server.async_stop_server()
+        self._subscriptions = {}
+
+    @callback
+    def async_schedule_sync(self):
+        """Adapt the subscriptions to a changed topology in the background."""
+        if self._notify_server is None:
+            return
+        if self._sync_task is None or self._sync_task.done():
+            self._sync_task = self.hass.async_create_task(self.async_sync())
+        else:
+            self._sync_pending = True
+
+    async def async_sync(self):
+        """Subscribe to new renderers and drop subscriptions of vanished ones."""
+        self._sync_pending = True
+        while self._sync_pending and self._notify_server is not None:
+            self._sync_pending = False
+            targets = self._get_targets()
+            for target, subscription in list(self._subscriptions.items()):
+                if targets.get(target) != subscription.location:
+                    await self._async_unsubscribe(target)
+            await asyncio.gather(
+                *(
+                    self._async_subscribe(target, location)
+                    for target, location in targets.items()
+                    if target not in self._subscriptions
+                )
+            )
+
+    def _get_targets(self):
+        """Return the renderer locations to subscribe to by zone or room slice."""
+        raumfeld = self.raumfeld
+        targets = {}
+        for zone in self.coordinator.snapshot.get(SLICE_ZONES, ()):
+            location = raumfeld.get_zone_location(zone)
+            if location is not None:
+                targets[zone_slice(zone)] = location
+        for room in raumfeld.get_rooms():
+            location = raumfeld.get_room_renderer_location(room)
+            if location is not None:
+                targets[room_slice(room)] = location
+        location = raumfeld.get_media_server_location()
+        if location is not None:
+            targets[(SLICE_MEDIA_SERVER, raumfeld.media_server_udn)] = location
+        return targets
+
+    async def _async_subscribe(self, target, location):
+        """Subscribe to the LastChange events of a renderer."""
+        if target[0] == SLICE_ZONE:
+            service_types = [SERVICE_AV_TRANSPORT, SERVICE_RENDERING_CONTROL]
+        elif target[0] == SLICE_MEDIA_SERVER:
+            service_types = [SERVICE_CONTENT_DIRECTORY]
+        else:
+            service_types = [SERVICE_RENDERING_CONTROL]
+        event_handler = self._notify_server.event_handler
+        subscription = None
+        try:
+            device = await self._factory.async_create_device(location)
+            subscription = _Subscription(location, device)
+            for service_type in service_types:
+                if not device.has_service(service_type):
+                    continue
+                service = device.service(service_type)
+                service.on_event = partial(self._handle_event, target)
+                _, timeout = await event_handler.async_subscribe(
+                    service, timeout=timedelta(seconds=EVENT_SUBSCRIPTION_TIMEOUT)
+                )
+                subscription.services.append(service)
+                subscription.set_timeout(timeout)
+        except UpnpError as err:
+            log_warn(f"Unable to subscribe to events of '{location}', polling instead: {err!r}")
+            if subscription is not None:
+                await self._async_unsubscribe_services(subscription)
+            return
+        if subscription.services:
+            self._subscriptions[target] = subscription
+            log_debug(f"Subscribed to events of {target} at '{location}'")
+
+    async def _async_unsubscribe(self, target):
+        """Cancel the subscription of a zone or room slice."""
+        subscription = self._subscriptions.pop(target, None)
+        if subscription is not None:
+            await self._async_unsubscribe_services(subscription)
+            log_debug(f"Unsubscribed from events of {target}")
+
+    async def _async_unsubscribe_services(self, subscription):
+        """Cancel the subscriptions of all services of a renderer."""
+        for service in subscription.services:
+            try:
+                await self._notify_server.event_handler.async_unsubscribe(service)
+            except (KeyError, UpnpError) as err:
+                log_debug(f"Unable to unsubscribe from {service}: {err!r}")
+
+    async def _async_renew(self, now=None):
+        """Renew subscriptions close to expiry and retry lapsed ones."""
+        event_handler = self._notify_server.event_handler
+        for target, subscription in list(self._subscriptions.items()):
+            if utcnow() < subscription.renew_at:
+                continue
+            subscription.renew_at = None
+            try:
+                for service in subscription.services:
+                    _, timeout = await event_handler.async_resubscribe(
+                        service, timeout=timedelta(seconds=EVENT_SUBSCRIPTION_TIMEOUT)
+                    )
+                    subscription.set_timeout(timeout)
+            except (KeyError, UpnpError) as err:
+                log_warn(f"Subscription to events of {target} lapsed, polling instead: {err!r}")
+                await self._async_unsubscribe(target)
+        await self.async_sync()
+
+    @callback
+    def _handle_event(self, target, service, state_variables):
+        """Pass the changes of a LastChange event to the coordinator."""
+        if target[0] == SLICE_MEDIA_SERVER:
+            for state_variable in state_variables:
+                if state_variable.name == EVENT_VAR_SYSTEM_UPDATE_ID:
+                    self.raumfeld.set_system_update_id(state_variable.value)
+            return
+        for state_variable in state_variables:
+            if state_variable.name != EVENT_VAR_LAST_CHANGE:
+                continue
+            changes = parse_last_change(state_variable.value)
+            if not changes:
+                continue
+            if target[0] == SLICE_ZONE:
+                self.coordinator.async_apply_zone_event(target[1], changes)
+            elif target[0] == SLICE_ROOM:
+                self.coordinator.async_apply_room_event(target[1], changes)
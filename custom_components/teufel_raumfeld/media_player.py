@@ -6,6 +6,7 @@ import datetime
 import json
 import logging
 import pickle
+from functools import partial
 from typing import Any
 
 import voluptuous as vol
@@ -37,6 +38,7 @@ from homeassistant.components.media_player import (
     async_process_play_media_url,
 )
 from homeassistant.const import STATE_IDLE, STATE_OFF, STATE_PAUSED, STATE_PLAYING
+from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform, entity_registry
 from homeassistant.util.dt import utcnow
@@ -59,7 +61,8 @@ from .const import (
     SERVICE_PLAY_SYSTEM_SOUND,
     SERVICE_RESTORE,
     SERVICE_SNAPSHOT,
-    TIMEOUT_TRANSITION_PERIOD,
+    SLICE_POLL,
+    SLICE_ZONES,
     UPNP_CLASS_ALBUM,
     UPNP_CLASS_LINE_IN,
     UPNP_CLASS_PLAYLIST_CONTAINER,
@@ -67,6 +70,7 @@ from .const import (
     UPNP_CLASS_RADIO,
     UPNP_CLASS_TRACK,
 )
+from .coordinator import room_slice, zone_key, zone_slice
 
 SUPPORT_RAUMFELD_SPOTIFY = (
     MediaPlayerEntityFeature.PAUSE
@@ -106,6 +110,13 @@ SUPPORTED_MEDIA_TYPES = [
     UPNP_CLASS_LINE_IN,
 ]
 
+TRANSPORT_STATE_TO_STATE = {
+    TRANSPORT_STATE_NO_MEDIA: STATE_IDLE,
+    TRANSPORT_STATE_PAUSED: STATE_PAUSED,
+    TRANSPORT_STATE_PLAYING: STATE_PLAYING,
+    TRANSPORT_STATE_STOPPED: STATE_IDLE,
+}
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -142,18 +153,10 @@ async def async_setup_entry(hass, config_entry, async_add_devices):
     """Set up entry."""
     raumfeld = config_entry.runtime_data
     room_names = raumfeld.get_rooms()
-    room_groups = raumfeld.get_groups()
     registry = entity_registry.async_get(hass)
     entity_entries = entity_registry.async_entries_for_config_entry(registry, config_entry.entry_id)
     platform = entity_platform.current_platform.get()
-    devices = []
-
-    for room_name in room_names:
-        devices.append(RaumfeldRoom(room_name, raumfeld))
-
-    for group in room_groups:
-        if len(group) > 1:
-            devices.append(RaumfeldGroup(group, raumfeld))
+    restored_groups = []
 
     for entity in entity_entries:
         if not entity.entity_id.startswith(platform.domain):
@@ -162,17 +165,26 @@ async def async_setup_entry(hass, config_entry, async_add_devices):
 
         rooms = uid_to_obj(entity.unique_id)
         if len(rooms) > 1:
-            group = rooms
-            if group not in room_groups:
-                if entity.disabled:
-                    continue
-                devices.append(RaumfeldGroup(group, raumfeld))
-                raumfeld.eid_to_obj[entity.entity_id] = uid_to_obj(entity.unique_id)
+            if entity.disabled:
+                continue
+            restored_groups.append(rooms)
+            raumfeld.eid_to_obj[entity.entity_id] = rooms
         else:
             log_info(f"Media player entity '{entity.entity_id}' is not recognized as speaker group")
             raumfeld.eid_to_obj[entity.entity_id] = uid_to_obj(entity.unique_id)
 
-    async_add_devices(devices)
+    async def async_create_entities():
+        devices = [RaumfeldRoom(room_name, raumfeld) for room_name in raumfeld.get_rooms()]
+        for group in raumfeld.get_groups() + restored_groups:
+            if len(group) > 1:
+                devices.append(RaumfeldGroup(group, raumfeld))
+        return devices
+
+    def retire(unique_id):
+        """Speaker groups are kept after the zone was dissolved, vanished rooms are retired."""
+        return len(uid_to_obj(unique_id)) == 1
+
+    await raumfeld.coordinator.async_track_entities(platform.domain, async_add_devices, async_create_entities, retire)
     platform.async_register_entity_service(SERVICE_RESTORE, {}, "async_restore")
     platform.async_register_entity_service(SERVICE_SNAPSHOT, {}, "async_snapshot")
     platform.async_register_entity_service(
@@ -237,8 +249,8 @@ class RaumfeldGroup(MediaPlayerEntity):
 
     @property
     def should_poll(self):
-        """Return True as entity has to be polled for state."""
-        return True
+        """Return False as entity is updated by the coordinator."""
+        return False
 
     @property
     def unique_id(self):
@@ -357,6 +369,41 @@ class RaumfeldGroup(MediaPlayerEntity):
         """Flag media player features that are supported."""
         return SUPPORT_RAUMFELD_GROUP
 
+    # Coordinator handling
+
+    def coordinator_slices(self):
+        """Return the coordinator slices the validity of the entity depends on."""
+        return [SLICE_ZONES]
+
+    async def async_added_to_hass(self):
+        """Subscribe to coordinator updates and request initial state."""
+        self._raumfeld.eid_to_obj[self.entity_id] = self._rooms
+        self.async_on_remove(partial(self._raumfeld.eid_to_obj.pop, self.entity_id, None))
+        coordinator = self._raumfeld.coordinator
+        for slice_key in self.coordinator_slices():
+            self.async_on_remove(coordinator.async_add_listener(slice_key, self._handle_coordinator_update))
+        self.async_on_remove(coordinator.async_add_listener(zone_slice(self._rooms), self._handle_zone_state_update))
+        self.async_on_remove(coordinator.async_add_listener(SLICE_POLL, self._handle_coordinator_poll))
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Update state after a change of the zone configuration."""
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _handle_zone_state_update(self):
+        """Apply the cached state after it changed for the zone of the player."""
+        if self._raumfeld.group_is_valid(self._rooms):
+            self._apply_zone_state(self._raumfeld.coordinator.zone_states.get(zone_key(self._rooms)))
+            self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_poll(self):
+        """Request state of rooms, which are not covered by the zone state cache."""
+        if self._is_spotify_sroom:
+            self.async_schedule_update_ha_state(True)
+
     # MediaPlayer Methods
 
     async def async_turn_on(self):
@@ -517,8 +564,7 @@ class RaumfeldGroup(MediaPlayerEntity):
                         self._attributes["last_content_id"] = play_uri
                         self._attributes["last_content_type"] = media_type
                     if announce and was_playing:
-                        while self._state == STATE_PLAYING:
-                            await asyncio.sleep(DELAY_FAST_UPDATE_CHECKS)
+                        await self._raumfeld.coordinator.async_wait_end_of_media(self._rooms)
                         log_debug(f"Trigger restore of snapshot for '{self._rooms}' due to announcement")
                         await self.async_restore()
             else:
@@ -593,72 +639,45 @@ class RaumfeldGroup(MediaPlayerEntity):
         else:
             object_id = media_content_id
 
-        metadata = await self._raumfeld.async_browse_media(object_id, BROWSE_METADATA)
+        self._raumfeld.record_browse_access(object_id)
+        # The metadata is usually known from browsing the parent already.
+        metadata, children = await asyncio.gather(
+            self._raumfeld.async_browse_media(object_id, BROWSE_METADATA),
+            self._raumfeld.async_browse_media(object_id, BROWSE_CHILDREN),
+        )
         if not metadata:
             return None
         metadata = metadata[0]
-
-        children = await self._raumfeld.async_browse_media(object_id, BROWSE_CHILDREN)
+        # Pages of a large container keep their own ID to browse further.
+        metadata.media_content_id = object_id
 
         if children is None:
             log_fatal("No media identified")
 
         metadata.children = children
+        if children:
+            self.platform.config_entry.async_create_background_task(
+                self.hass, self._raumfeld.async_prefetch_children(children), "teufel_raumfeld browse prefetch"
+            )
         return metadata
 
     # MediaPlayer update methods
 
-    async def async_update_transport_state(self):
-        """Update state of the player."""
-        info = None
-        max_attempts = int(TIMEOUT_TRANSITION_PERIOD / DELAY_FAST_UPDATE_CHECKS)
-
-        for attempt in range(1, max_attempts):
-            if self._raumfeld.group_is_valid(self._rooms):
-                info = await self._raumfeld.async_get_transport_info(self._rooms)
-            elif self._is_spotify_sroom:
-                info = await self._raumfeld.async_get_room_transport_info(self._room)
-
-            if info:
-                transport_state = info["CurrentTransportState"]
-                if transport_state == TRANSPORT_STATE_STOPPED:
-                    self._state = STATE_IDLE
-                elif transport_state == TRANSPORT_STATE_NO_MEDIA:
-                    self._state = STATE_IDLE
-                elif transport_state == TRANSPORT_STATE_PLAYING:
-                    self._state = STATE_PLAYING
-                elif transport_state == TRANSPORT_STATE_PAUSED:
-                    self._state = STATE_PAUSED
-                elif transport_state == TRANSPORT_STATE_TRANSITIONING:
-                    if attempt < max_attempts:
-                        await asyncio.sleep(DELAY_FAST_UPDATE_CHECKS)
-                        log_info(
-                            f"Starting attempt '{attempt + 1}' out of '{max_attempts}' attempts for transport state update"
-                        )
-                        continue
-                else:
-                    log_fatal(f"Unrecognized transport state: {transport_state}")
-                    self._state = STATE_OFF
-            else:
-                log_debug(f"Method was called although speaker group '{self._rooms}' is invalid")
-            break
-
-    async def async_update_volume_level(self):
-        """Update volume level of the player."""
-        if self._raumfeld.group_is_valid(self._rooms):
-            group_volume = await self._raumfeld.async_get_group_volume(self._rooms)
-        elif self._is_spotify_sroom:
-            group_volume = await self._raumfeld.async_get_room_volume(self._room)
-        if group_volume:
-            self._volume_level = group_volume / 100
+    def _apply_transport_state(self, transport_state):
+        """Set state of the player according to a Raumfeld transport state."""
+        if transport_state in TRANSPORT_STATE_TO_STATE:
+            self._state = TRANSPORT_STATE_TO_STATE[transport_state]
+        elif transport_state != TRANSPORT_STATE_TRANSITIONING:
+            log_fatal(f"Unrecognized transport state: {transport_state}")
+            self._state = STATE_OFF
 
-    async def async_update_mute(self):
-        """Update mute status of the player."""
-        self._mute = await self._raumfeld.async_get_group_mute(self._rooms)
+    def _apply_volume_level(self, volume):
+        """Set volume level of the player from a Raumfeld volume [0-100]."""
+        if volume:
+            self._volume_level = volume / 100
 
-    async def async_update_track_info(self):
-        """Update media information of the player."""
-        track_info = await self._raumfeld.async_get_track_info(self._rooms)
+    def _apply_track_info(self, track_info, updated_at=None):
+        """Set media information of the player from track information."""
         if track_info:
             self._media_duration = track_info["duration"]
             self._media_image_url = track_info["image_uri"]
@@ -668,11 +687,10 @@ class RaumfeldGroup(MediaPlayerEntity):
             self._media_album_artist = track_info["artist"]
             self._media_track = track_info["number"]
             self._media_position = track_info["position"]
-            self._media_position_updated_at = utcnow()
+            self._media_position_updated_at = updated_at or utcnow()
 
-    async def async_update_play_mode(self):
-        """Update play mode of the player."""
-        play_mode = await self._raumfeld.async_get_play_mode(self._rooms)
+    def _apply_play_mode(self, play_mode):
+        """Set shuffle and repeat mode of the player from a Raumfeld play mode."""
         if play_mode:
             self._play_mode = play_mode
             if play_mode == PLAY_MODE_NORMAL:
@@ -693,19 +711,67 @@ class RaumfeldGroup(MediaPlayerEntity):
             else:
                 log_fatal(f"Unrecognized play mode: {play_mode}")
 
-    async def async_update_all(self):
-        """Run all state update methods of the player."""
-        await self.async_update_transport_state()
+    def _apply_zone_state(self, zone_state):
+        """Set all state of the player from a cached zone state."""
+        if zone_state is None or zone_state.transport_state is None:
+            log_debug(f"No state available for speaker group '{self._rooms}'")
+            return
+        self._apply_transport_state(zone_state.transport_state)
         if self._state != STATE_OFF:
-            await self.async_update_volume_level()
-            await self.async_update_mute()
-            await self.async_update_track_info()
-            await self.async_update_play_mode()
+            self._apply_volume_level(zone_state.volume)
+            self._mute = zone_state.mute
+            self._apply_track_info(zone_state.track_info, zone_state.position_updated_at)
+            self._apply_play_mode(zone_state.play_mode)
+
+    async def async_update_transport_state(self):
+        """Update state of the player."""
+        transport_state = None
+        if self._raumfeld.group_is_valid(self._rooms):
+            transport_state = await self._raumfeld.coordinator.async_get_transport_state(self._rooms)
+            self._raumfeld.coordinator.async_update_zone_state(self._rooms, transport_state=transport_state)
+        elif self._is_spotify_sroom:
+            transport_state = await self._raumfeld.coordinator.async_get_room_transport_state(self._room)
+
+        if transport_state is not None:
+            self._apply_transport_state(transport_state)
+        else:
+            log_debug(f"Method was called although speaker group '{self._rooms}' is invalid")
+
+    async def async_update_volume_level(self):
+        """Update volume level of the player."""
+        group_volume = None
+        if self._raumfeld.group_is_valid(self._rooms):
+            group_volume = await self._raumfeld.async_get_group_volume(self._rooms)
+            self._raumfeld.coordinator.async_update_zone_state(self._rooms, volume=group_volume)
+        elif self._is_spotify_sroom:
+            group_volume = await self._raumfeld.async_get_room_volume(self._room)
+        self._apply_volume_level(group_volume)
+
+    async def async_update_mute(self):
+        """Update mute status of the player."""
+        self._mute = await self._raumfeld.async_get_group_mute(self._rooms)
+        self._raumfeld.coordinator.async_update_zone_state(self._rooms, mute=self._mute)
+
+    async def async_update_track_info(self):
+        """Update media information of the player."""
+        if self._raumfeld.group_is_valid(self._rooms):
+            zone_state = await self._raumfeld.coordinator.async_refresh_track_info(self._rooms)
+            self._apply_track_info(zone_state.track_info, zone_state.position_updated_at)
+        else:
+            track_info = await self._raumfeld.async_get_track_info(self._rooms)
+            self._apply_track_info(track_info)
+
+    async def async_update_play_mode(self):
+        """Update play mode of the player."""
+        play_mode = await self._raumfeld.async_get_play_mode(self._rooms)
+        self._raumfeld.coordinator.async_update_zone_state(self._rooms, play_mode=play_mode)
+        self._apply_play_mode(play_mode)
 
     async def async_update(self):
-        """Update entity"""
+        """Update entity from the state cache of its zone."""
         if self._raumfeld.group_is_valid(self._rooms):
-            await self.async_update_all()
+            zone_state = await self._raumfeld.coordinator.async_get_zone_state(self._rooms)
+            self._apply_zone_state(zone_state)
         else:
             self._state = STATE_OFF
 
@@ -765,12 +831,19 @@ class RaumfeldRoom(RaumfeldGroup):
             return SUPPORT_RAUMFELD_SPOTIFY
         return SUPPORT_RAUMFELD_ROOM
 
+    def coordinator_slices(self):
+        """Return the coordinator slices the validity of the entity depends on."""
+        return super().coordinator_slices() + [room_slice(self._room)]
+
     async def async_join_players(self, group_members):
         """Join `group_members` as a player group with the current player."""
         if self._raumfeld.group_is_valid(self._rooms):
             room_lst = []
             for member in group_members:
-                obj = self._raumfeld.eid_to_obj[member]
+                obj = self._raumfeld.eid_to_obj.get(member)
+                if obj is None:
+                    log_error(f"Player '{member}' is not part of the Raumfeld system of '{self.entity_id}'")
+                    continue
                 room_lst += obj
             await self._raumfeld.async_add_rooms_to_group(room_lst, self._rooms)
             await self.async_update_transport_state()
@@ -788,7 +861,7 @@ class RaumfeldRoom(RaumfeldGroup):
     async def async_update(self):
         """Update entity"""
         if self._raumfeld.group_is_valid(self._rooms):
-            await super().async_update_all()
+            await super().async_update()
         elif self._raumfeld.room_is_spotify_single_room(self._room):
             self._is_spotify_sroom = True
             await super().async_update_transport_state()
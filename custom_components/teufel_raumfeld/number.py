@@ -2,6 +2,7 @@
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.const import EntityCategory
+from homeassistant.core import callback
 
 from . import log_debug
 from .common import RaumfeldRoom
@@ -9,28 +10,27 @@ from .const import (
     NUMBER_ROOM_VOLUME_ICON,
     NUMBER_ROOM_VOLUME_NAME,
 )
+from .coordinator import room_volume_slice
 
 
 async def async_setup_entry(hass, config_entry, async_add_devices):
     """Set up entry."""
     raumfeld = config_entry.runtime_data
-    device_udns = raumfeld.get_raumfeld_device_udns()
-    log_debug(f"device_udns={device_udns}")
-    room_names = raumfeld.get_rooms()
-    devices = []
-
-    for room in room_names:
-        number_config = {
-            "room_name": room,
-            "get_state": raumfeld.async_get_room_volume,
-            "identifier": room,
-            "sensor_name": NUMBER_ROOM_VOLUME_NAME,
-            "native_unit_of_measurement": "%",
-        }
-        log_debug(f"number_config={number_config}")
-        devices.append(RaumfeldRoomVolume(raumfeld, number_config))
-
-    async_add_devices(devices)
+
+    async def async_create_entities():
+        devices = []
+        for room in raumfeld.get_rooms():
+            number_config = {
+                "room_name": room,
+                "get_state": raumfeld.coordinator.async_get_room_volume,
+                "identifier": room,
+                "sensor_name": NUMBER_ROOM_VOLUME_NAME,
+                "native_unit_of_measurement": "%",
+            }
+            devices.append(RaumfeldRoomVolume(raumfeld, number_config))
+        return devices
+
+    await raumfeld.coordinator.async_track_entities("number", async_add_devices, async_create_entities)
 
     return True
 
@@ -53,10 +53,26 @@ class RaumfeldRoomVolume(RaumfeldRoom, NumberEntity):
         """Return the icon to use in the frontend."""
         return self._icon
 
+    async def async_added_to_hass(self):
+        """Subscribe to volume changes of the room, either evented or polled per zone."""
+        self.async_on_remove(
+            self._raumfeld.coordinator.async_add_listener(room_volume_slice(self._room_name), self._handle_volume_event)
+        )
+        await super().async_added_to_hass()
+
+    @callback
+    def _handle_volume_event(self):
+        """Write volume received by a renderer event or a zone poll to the state."""
+        self._state = self._raumfeld.coordinator.room_volumes[self._room_name]
+        self.async_write_ha_state()
+
+    async def async_update(self):
+        """Update volume from the coordinator, which requests it per zone if not cached."""
+        self._state = await self._raumfeld.coordinator.async_get_room_volume(self._room_name)
+
     async def async_set_native_value(self, value):
         """Set new speaker volume."""
         volume = int(value)
         log_debug(f"{self._room_name} -> volume: {volume}")
         await self._raumfeld.async_set_room_volume(self._room_name, volume)
-        await self.async_update()
-        self.async_schedule_update_ha_state()
+        await self._raumfeld.coordinator.async_refresh_room_volumes([self._room_name])
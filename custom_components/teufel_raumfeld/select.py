@@ -1,34 +1,31 @@
 """Platform for select integration."""
 
-import asyncio
-
+from hassfeld.constants import POWER_ACTIVE, POWER_STANDBY_AUTOMATIC, POWER_STANDBY_MANUAL
 from homeassistant.components.select import SelectEntity
 from homeassistant.const import EntityCategory
 
 from . import log_debug, log_fatal
 from .common import RaumfeldRoom
-from .const import DELAY_POWER_STATE_UPDATE, POWER_ECO, POWER_ON, POWER_STANDBY
+from .const import POWER_ECO, POWER_ON, POWER_STANDBY
 
 
 async def async_setup_entry(hass, config_entry, async_add_devices):
     """Set up entry."""
     raumfeld = config_entry.runtime_data
-    device_udns = raumfeld.get_raumfeld_device_udns()
-    log_debug(f"device_udns={device_udns}")
-    room_names = raumfeld.get_rooms()
-    devices = []
-
-    for room in room_names:
-        sensor_config = {
-            "room_name": room,
-            "get_state": raumfeld.get_room_power_state,
-            "identifier": room,
-            "sensor_name": "PowerState",
-        }
-        log_debug(f"sensor_config={sensor_config}")
-        devices.append(RaumfeldPowerState(raumfeld, sensor_config))
-
-    async_add_devices(devices)
+
+    async def async_create_entities():
+        devices = []
+        for room in raumfeld.get_rooms():
+            sensor_config = {
+                "room_name": room,
+                "get_state": raumfeld.get_room_power_state,
+                "identifier": room,
+                "sensor_name": "PowerState",
+            }
+            devices.append(RaumfeldPowerState(raumfeld, sensor_config))
+        return devices
+
+    await raumfeld.coordinator.async_track_entities("select", async_add_devices, async_create_entities)
 
     return True
 
@@ -51,12 +48,16 @@ class RaumfeldPowerState(RaumfeldRoom, SelectEntity):
         log_debug(f"{self._room_name} -> option: {option}")
         if option == POWER_ON:
             await self._raumfeld.async_leave_standby(self._room_name)
+            power_state = POWER_ACTIVE
         elif option == POWER_ECO:
             await self._raumfeld.async_enter_automatic_standby(self._room_name)
+            power_state = POWER_STANDBY_AUTOMATIC
         elif option == POWER_STANDBY:
             await self._raumfeld.async_enter_manual_standby(self._room_name)
+            power_state = POWER_STANDBY_MANUAL
         else:
-            log_fatal("Unexpected power state: {option}")
+            log_fatal(f"Unexpected power state: {option}")
+            return
+        await self._raumfeld.coordinator.async_wait_power_state(self._room_name, power_state)
         await self.async_update()
-        await asyncio.sleep(DELAY_POWER_STATE_UPDATE)
-        self.async_schedule_update_ha_state()
+        self.async_write_ha_state()
@@ -1,48 +1,53 @@
 """Platform for sensor integration."""
 
 from homeassistant.const import EntityCategory
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 
 from . import log_debug
-from .const import DOMAIN
+from .const import DOMAIN, SLICE_DEVICE_INFO
 
 
 async def async_setup_entry(hass, config_entry, async_add_devices):
     """Set up entry."""
     raumfeld = config_entry.runtime_data
-    device_udns = raumfeld.get_raumfeld_device_udns()
-    log_debug(f"device_udns={device_udns}")
-    devices = []
-
-    for udn in device_udns:
-        renderer_udn = await raumfeld.async_get_device_renderer(udn)
-        if renderer_udn is None:
-            log_debug(f"No renderer found for device UDN: {udn}, skipping sensor creation")
-            continue
-        device_name = raumfeld.device_udn_to_name(renderer_udn)
-        sw_version = await raumfeld.async_get_device_info(udn)
-        manufacturer = await raumfeld.async_get_device_manufacturer(udn)
-        model = await raumfeld.async_get_device_model_name(udn)
-
-        sensor_config = {
-            "device_udn": udn,
-            "device_name": device_name,
-            "get_state": raumfeld.async_get_device_info,
-            "identifier": device_name,
-            "manufacturer": manufacturer,
-            "model": model,
-            "sensor_name": "SoftwareVersion",
-            "sw_version": sw_version,
-        }
-        log_debug(f"sensor_config={sensor_config}")
-        devices.append(RaumfeldSpeaker(raumfeld, sensor_config))
-
-        sensor_config["sensor_name"] = "UpdateInfoVersion"
-        sensor_config["get_state"] = raumfeld.async_get_device_update_info_version
-        log_debug(f"sensor_config={sensor_config}")
-        devices.append(RaumfeldSpeaker(raumfeld, sensor_config))
 
-    async_add_devices(devices)
+    async def async_create_entities():
+        device_udns = raumfeld.get_raumfeld_device_udns()
+        log_debug(f"device_udns={device_udns}")
+        descriptions = await raumfeld.coordinator.async_get_device_descriptions(device_udns)
+        devices = []
+
+        for udn in device_udns:
+            description = descriptions.get(udn)
+            if description is None:
+                log_debug(f"No renderer found for device UDN: {udn}, skipping sensor creation")
+                continue
+            device_name = raumfeld.device_udn_to_name(description["renderer_udn"])
+
+            sensor_config = {
+                "device_udn": udn,
+                "device_name": device_name,
+                "info_attribute": "sw_version",
+                "identifier": device_name,
+                "manufacturer": description["manufacturer"],
+                "model": description["model"],
+                "sensor_name": "SoftwareVersion",
+                "sw_version": description["sw_version"],
+            }
+            devices.append(RaumfeldSpeaker(raumfeld, sensor_config))
+
+            sensor_config["sensor_name"] = "UpdateInfoVersion"
+            sensor_config["info_attribute"] = "update_version"
+            devices.append(RaumfeldSpeaker(raumfeld, sensor_config))
+        return devices
+
+    def retire(unique_id):
+        """Devices that merely failed to respond keep their sensors, vanished ones are retired."""
+        device_name = unique_id.removeprefix(f"{DOMAIN}.").rpartition(".")[0]
+        return device_name not in raumfeld.get_device_names()
+
+    await raumfeld.coordinator.async_track_entities("sensor", async_add_devices, async_create_entities, retire)
 
     return True
 
@@ -64,7 +69,7 @@ class RaumfeldSpeaker(Entity):
         self._sensor_name = self._config["sensor_name"]
         self._name = f"{self._device_name} - {self._sensor_name}"
         self._unique_id = f"{DOMAIN}.{self._device_name}.{self._sensor_name}"
-        self._get_state = self._config["get_state"]
+        self._info_attribute = self._config["info_attribute"]
         self._sw_version = self._config["sw_version"]
         self._identifier = self._config["identifier"]
         self._manufacturer = self._config["manufacturer"]
@@ -86,8 +91,8 @@ class RaumfeldSpeaker(Entity):
 
     @property
     def should_poll(self):
-        """Return True as entity has to be polled for state."""
-        return True
+        """Return False as entity is updated by the coordinator."""
+        return False
 
     @property
     def name(self):
@@ -104,6 +109,18 @@ class RaumfeldSpeaker(Entity):
         """Return a unique ID."""
         return self._unique_id
 
+    async def async_added_to_hass(self):
+        """Subscribe to invalidations of the cached software information and request initial state."""
+        coordinator = self._raumfeld.coordinator
+        self.async_on_remove(coordinator.async_add_listener(SLICE_DEVICE_INFO, self._handle_coordinator_update))
+        self.async_schedule_update_ha_state(True)
+
+    @callback
+    def _handle_coordinator_update(self):
+        """Update state after the cached software information was invalidated."""
+        self.async_schedule_update_ha_state(True)
+
     async def async_update(self):
-        """Update sensor."""
-        self._state = await self._get_state(self._device_udn)
+        """Update sensor from the cached software information of the device."""
+        device_info = await self._raumfeld.coordinator.async_get_device_info(self._device_udn)
+        self._state = getattr(device_info, self._info_attribute)
@@ -0,0 +1,101 @@
+"""Benchmark of the DIDL-Lite parser against the former xmltodict based parsing.
+
+Run from the repository root, optionally passing the numbers of items:
+
+    PYTHONPATH=. python tests/benchmark_didl.py 200 5000 40000
+
+The documents resemble browse responses of the Raumfeld media server for
+containers of music tracks.
+"""
+
+import sys
+import time
+import tracemalloc
+
+import xmltodict
+
+from custom_components.teufel_raumfeld.didl import iter_didl_objects
+
+ITEM = (
+    '<item id="0/My Music/AllTracks/{index}" parentID="0/My Music/AllTracks" restricted="1">'
+    "<dc:title>Track {index} of a long playlist</dc:title>"
+    "<upnp:class>object.item.audioItem.musicTrack</upnp:class>"
+    '<upnp:artist role="Performer">Artist {index}</upnp:artist>'
+    '<upnp:artist role="Composer">Composer {index}</upnp:artist>'
+    "<upnp:album>Album {album}</upnp:album>"
+    "<upnp:genre>Rock</upnp:genre>"
+    "<upnp:originalTrackNumber>{track}</upnp:originalTrackNumber>"
+    "<dc:date>2001-01-01</dc:date>"
+    '<upnp:albumArtURI dlna:profileID="JPEG_TN">http://10.0.0.2:47366/?albumArt={album}</upnp:albumArtURI>'
+    '<res protocolInfo="http-get:*:audio/mpeg:DLNA.ORG_PN=MP3" size="7340032" duration="0:04:12.000"'
+    ' bitrate="40000" sampleFrequency="44100" nrAudioChannels="2">http://10.0.0.2:47366/track/{index}.mp3</res>'
+    "</item>"
+)
+
+
+def make_document(count):
+    """Return a browse response with the passed number of tracks."""
+    items = "".join(ITEM.format(index=index, album=index // 12, track=index % 12 + 1) for index in range(count))
+    return (
+        '<DIDL-Lite xmlns="urn:schemas-upnp-org:metadata-1-0/DIDL-Lite/"'
+        ' xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/"'
+        ' xmlns:dlna="urn:schemas-dlna-org:metadata-1-0/">' + items + "</DIDL-Lite>"
+    )
+
+
+def parse_didl(didl_xml):
+    """Return the records of the containers and items of a document parsed incrementally."""
+    return list(iter_didl_objects(didl_xml))
+
+
+def parse_xmltodict(didl_xml):
+    """Return the properties used by the media browser the way they were parsed before."""
+    media = xmltodict.parse(didl_xml, force_list=("container", "item"))["DIDL-Lite"]
+    records = []
+    for entry in media.get("container", []) + media.get("item", []):
+        title = entry["dc:title"]
+        if isinstance(title, dict):
+            title = title["#text"]
+        upnp_class = entry["upnp:class"]
+        if isinstance(upnp_class, dict):
+            upnp_class = upnp_class["#text"]
+        art_uri = entry.get("upnp:albumArtURI")
+        if isinstance(art_uri, dict):
+            art_uri = art_uri["#text"]
+        records.append((entry["@id"], title, upnp_class, entry.get("upnp:artist"), entry.get("upnp:album"), art_uri))
+    return records
+
+
+def measure(parse, didl_xml, repeat=3):
+    """Return best duration in seconds and peak of allocated memory in bytes of a parser."""
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(didl_xml)
+        durations.append(time.perf_counter() - started)
+    tracemalloc.start()
+    parse(didl_xml)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(durations), peak
+
+
+def main(counts):
+    """Print durations and memory peaks of both parsers for documents of the passed sizes."""
+    print(f"{'items':>7} {'size':>9} {'xmltodict':>19} {'didl':>19} {'speed-up':>9}")
+    for count in counts:
+        didl_xml = make_document(count)
+        assert len(parse_didl(didl_xml)) == len(parse_xmltodict(didl_xml)) == count
+        legacy_time, legacy_peak = measure(parse_xmltodict, didl_xml)
+        didl_time, didl_peak = measure(parse_didl, didl_xml)
+        print(
+            f"{count:>7} {len(didl_xml) // 1024:>7}kB"
+            f" {legacy_time * 1000:>8.1f}ms {legacy_peak / 2**20:>6.1f}MiB"
+            f" {didl_time * 1000:>8.1f}ms {didl_peak / 2**20:>6.1f}MiB"
+            f" {legacy_time / didl_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [200, 5000, 40000])
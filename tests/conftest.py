@@ -0,0 +1,55 @@
+"""Fixtures shared by the tests of the coordinator and the event subscriptions."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+
+@pytest.fixture
+def raumfeld():
+    """Return a host mock with two rooms in one zone."""
+    raumfeld = MagicMock()
+    raumfeld.options = {}
+    raumfeld.get_zones.return_value = [["Küche", "Wohnzimmer"]]
+    raumfeld.get_rooms.return_value = ["Küche", "Wohnzimmer"]
+    raumfeld.get_raumfeld_device_udns.return_value = ["uuid:a", "uuid:b"]
+    raumfeld.room_udn_to_name.side_effect = {"uuid:kueche": "Küche", "uuid:wohnzimmer": "Wohnzimmer"}.get
+    raumfeld.get_room_power_state.return_value = "ACTIVE"
+    raumfeld.room_is_spotify_single_room.return_value = False
+    raumfeld.get_zone_of_room.side_effect = lambda room: ("Küche", "Wohnzimmer") if room in ("Küche", "Wohnzimmer") else None
+    raumfeld.update_available = False
+    raumfeld.group_is_valid.return_value = True
+    raumfeld.async_get_transport_info = AsyncMock(return_value={"CurrentTransportState": "PLAYING"})
+    raumfeld.async_get_group_volume = AsyncMock(return_value=30)
+    raumfeld.async_get_group_mute = AsyncMock(return_value=False)
+    raumfeld.async_get_track_info = AsyncMock(return_value=None)
+    raumfeld.async_get_play_mode = AsyncMock(return_value="NORMAL")
+    raumfeld.async_get_room_volume = AsyncMock(return_value=30)
+    raumfeld.async_get_device_sw_version = AsyncMock(return_value="1.2.3")
+    raumfeld.async_get_device_update_version = AsyncMock(return_value=None)
+    raumfeld.async_get_device_description = AsyncMock(
+        side_effect=lambda udn: {"renderer_udn": f"{udn}-renderer", "manufacturer": "Teufel", "model": "One M"}
+    )
+    return raumfeld
+
+
+@pytest.fixture
+def hass():
+    """Return a hass mock running tasks on the current event loop."""
+    hass = MagicMock()
+    hass.async_create_task = lambda coro: asyncio.get_running_loop().create_task(coro)
+    return hass
+
+
+@pytest.fixture
+def async_poll():
+    """Return a function running one poll cycle of a coordinator including the zone refresh."""
+
+    async def async_poll(coordinator):
+        coordinator._async_poll()
+        for task in (coordinator._refresh_task, coordinator._volume_task):
+            if task is not None:
+                await task
+
+    return async_poll
@@ -0,0 +1,790 @@
+"""Tests for the RaumfeldCoordinator shared by all entities of a host."""
+
+import asyncio
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
+from itertools import chain, repeat
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from hassfeld.constants import SERVICE_AV_TRANSPORT
+
+from custom_components.teufel_raumfeld import sensor
+from custom_components.teufel_raumfeld.const import (
+    DOMAIN,
+    INTERVAL_POLL,
+    INTERVAL_POLL_IDLE,
+    INTERVAL_POLL_SLOW,
+    INTERVAL_POLL_STANDBY,
+    INTERVAL_POSITION_CHECK,
+    MAX_PARALLEL_DEVICE_INTROSPECTIONS,
+    MAX_PARALLEL_REQUESTS_PER_DEVICE,
+    SLICE_DEVICE_INFO,
+    SLICE_DEVICES,
+    SLICE_POLL,
+    SLICE_ZONES,
+)
+from custom_components.teufel_raumfeld.coordinator import (
+    RaumfeldCoordinator,
+    ZoneState,
+    room_slice,
+    room_volume_slice,
+    zone_key,
+    zone_slice,
+)
+
+
+class TestSliceNotification:
+    """Listeners are only called if their slice changed."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(MagicMock(), self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+
+    def test_unchanged_update_notifies_nobody(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(SLICE_ZONES, listener)
+
+        self.coordinator.async_handle_update("zone_config")
+
+        listener.assert_not_called()
+
+    def test_zone_change_notifies_zone_listeners_only(self):
+        zones_listener = MagicMock()
+        devices_listener = MagicMock()
+        self.coordinator.async_add_listener(SLICE_ZONES, zones_listener)
+        self.coordinator.async_add_listener(SLICE_DEVICES, devices_listener)
+
+        self.raumfeld.get_zones.return_value = [["Küche"], ["Wohnzimmer"]]
+        self.coordinator.async_handle_update("zone_config")
+
+        zones_listener.assert_called_once()
+        devices_listener.assert_not_called()
+
+    def test_power_state_change_notifies_room_listener(self):
+        kitchen = MagicMock()
+        living_room = MagicMock()
+        self.coordinator.async_add_listener(room_slice("Küche"), kitchen)
+        self.coordinator.async_add_listener(room_slice("Wohnzimmer"), living_room)
+
+        self.raumfeld.get_room_power_state.side_effect = lambda room: "MANUAL_STANDBY" if room == "Küche" else "ACTIVE"
+        self.coordinator.async_handle_update("zone_config")
+
+        kitchen.assert_called_once()
+        living_room.assert_not_called()
+
+    def test_vanished_room_notifies_room_listener(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(room_slice("Küche"), listener)
+
+        self.raumfeld.get_rooms.return_value = ["Wohnzimmer"]
+        self.coordinator.async_handle_update("zone_config")
+
+        listener.assert_called_once()
+
+    def test_removed_listener_is_not_called(self):
+        listener = MagicMock()
+        unsub = self.coordinator.async_add_listener(SLICE_POLL, listener)
+        unsub()
+
+        self.coordinator._async_poll()
+
+        listener.assert_not_called()
+
+    def test_poll_notifies_poll_listeners(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(SLICE_POLL, listener)
+
+        self.coordinator._async_poll()
+
+        listener.assert_called_once()
+
+
+class TestZoneStateCache:
+    """The state of a zone is requested once for all entities showing it."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass, async_poll):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.async_poll = async_poll
+
+    async def test_concurrent_requests_share_one_fetch(self):
+        rooms = ["Küche", "Wohnzimmer"]
+        results = await asyncio.gather(
+            self.coordinator.async_get_zone_state(rooms),
+            self.coordinator.async_get_zone_state(list(reversed(rooms))),
+            self.coordinator.async_get_zone_state(rooms),
+        )
+
+        assert self.raumfeld.async_get_transport_info.call_count == 1
+        assert results[0] is results[1] is results[2]
+        assert results[0].transport_state == "PLAYING"
+        assert results[0].volume == 30
+
+    async def test_cached_state_is_reused_within_cycle(self):
+        rooms = ["Küche", "Wohnzimmer"]
+        await self.coordinator.async_get_zone_state(rooms)
+        await self.coordinator.async_get_zone_state(rooms)
+
+        assert self.raumfeld.async_get_group_volume.call_count == 1
+
+    async def test_refresh_notifies_zone_listeners_on_change_only(self):
+        rooms = ["Küche", "Wohnzimmer"]
+        listener = MagicMock()
+        self.coordinator.async_add_listener(zone_slice(rooms), listener)
+
+        await self.coordinator.async_refresh_zone(rooms)
+        await self.coordinator.async_refresh_zone(rooms)
+        self.raumfeld.async_get_group_volume.return_value = 50
+        await self.coordinator.async_refresh_zone(rooms)
+
+        assert listener.call_count == 2
+
+    async def test_refresh_zones_skips_zones_without_listeners(self):
+        await self.async_poll(self.coordinator)
+
+        self.raumfeld.async_get_transport_info.assert_not_called()
+
+    async def test_invalid_zone_is_not_requested(self):
+        self.raumfeld.group_is_valid.return_value = False
+
+        zone_state = await self.coordinator.async_refresh_zone(["Küche"])
+
+        assert zone_state.transport_state is None
+        self.raumfeld.async_get_transport_info.assert_not_called()
+
+
+class TestGatherRequests:
+    """Independent requests run concurrently, bounded and isolated per device."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.coordinator = RaumfeldCoordinator(hass, raumfeld)
+
+    async def test_failing_request_does_not_affect_others(self):
+        async def async_fail():
+            raise TimeoutError
+
+        async def async_value():
+            return 42
+
+        results = await self.coordinator.async_gather_requests("zone", {"fail": async_fail(), "value": async_value()})
+
+        assert results == {"fail": None, "value": 42}
+
+    @patch("custom_components.teufel_raumfeld.coordinator.log_info")
+    @patch("custom_components.teufel_raumfeld.coordinator.log_warn")
+    async def test_outage_is_logged_once(self, log_warn, log_info):
+        async def async_fail():
+            raise TimeoutError
+
+        async def async_value():
+            return 42
+
+        for _ in range(3):
+            await self.coordinator.async_gather_requests("uuid:a", {"fail": async_fail(), "other": async_fail()})
+        await self.coordinator.async_gather_requests("uuid:a", {"value": async_value()})
+        await self.coordinator.async_gather_requests("uuid:a", {"value": async_value()})
+
+        log_warn.assert_called_once()
+        log_info.assert_called_once_with("Requests to uuid:a succeed again")
+
+    async def test_fan_out_is_bounded_per_device(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def async_slow():
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        await self.coordinator.async_gather_requests(
+            "zone", {str(i): async_slow() for i in range(MAX_PARALLEL_REQUESTS_PER_DEVICE * 2)}
+        )
+
+        assert max_in_flight == MAX_PARALLEL_REQUESTS_PER_DEVICE
+
+    async def test_limits_of_vanished_zones_and_devices_are_dropped(self):
+        raumfeld = self.coordinator.raumfeld
+        raumfeld.topology_version = 1
+        self.coordinator.async_handle_update("zone_config")
+        for device_key in (zone_key(["Küche", "Wohnzimmer"]), zone_key(["Bad"]), "uuid:a", "uuid:gone"):
+            await self.coordinator.async_gather_requests(device_key, {})
+
+        raumfeld.topology_version = 2
+        self.coordinator.async_handle_update("zone_config")
+
+        assert set(self.coordinator._device_semaphores) == {zone_key(["Küche", "Wohnzimmer"]), "uuid:a"}
+
+    async def test_zone_fields_are_requested_concurrently(self):
+        raumfeld = self.coordinator.raumfeld
+        started = []
+
+        def slow(name, value):
+            async def async_call(rooms):
+                started.append(name)
+                await asyncio.sleep(0.01)
+                return value
+
+            return async_call
+
+        raumfeld.async_get_group_volume = slow("volume", 20)
+        raumfeld.async_get_group_mute = slow("mute", True)
+        raumfeld.async_get_track_info = slow("track_info", None)
+
+        task = asyncio.ensure_future(self.coordinator._async_fetch_zone_state(["Küche"]))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert {"volume", "mute", "track_info"} <= set(started)
+
+        zone_state = await task
+        assert zone_state.volume == 20
+        assert zone_state.mute is True
+
+
+class TestAdaptivePolling:
+    """Zones and rooms are polled at intervals depending on their state."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass, async_poll):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.rooms = ["Küche", "Wohnzimmer"]
+        self.coordinator.async_add_listener(zone_slice(self.rooms), MagicMock())
+        self.now = datetime(2026, 1, 1, tzinfo=UTC)
+        self.async_poll = async_poll
+
+    async def _async_poll_at(self, seconds):
+        with patch(
+            "custom_components.teufel_raumfeld.coordinator.utcnow", return_value=self.now + timedelta(seconds=seconds)
+        ):
+            await self.async_poll(self.coordinator)
+
+    async def test_playing_zone_is_polled_every_cycle(self):
+        await self._async_poll_at(0)
+        await self._async_poll_at(INTERVAL_POLL)
+
+        assert self.raumfeld.async_get_transport_info.call_count == 2
+
+    async def test_idle_zone_is_polled_slowly(self):
+        self.raumfeld.async_get_transport_info.return_value = {"CurrentTransportState": "STOPPED"}
+
+        await self._async_poll_at(0)
+        await self._async_poll_at(INTERVAL_POLL)
+        await self._async_poll_at(INTERVAL_POLL_IDLE)
+
+        assert self.raumfeld.async_get_transport_info.call_count == 2
+
+    def test_standby_zone_has_standby_interval(self):
+        self.raumfeld.get_room_power_state.return_value = "MANUAL_STANDBY"
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+
+        assert self.coordinator.poll_interval(self.rooms, "STOPPED") == timedelta(seconds=INTERVAL_POLL_STANDBY)
+
+    async def test_webservice_update_switches_to_fast_interval(self):
+        self.raumfeld.async_get_transport_info.return_value = {"CurrentTransportState": "STOPPED"}
+        await self._async_poll_at(0)
+
+        self.coordinator.async_handle_update("zone_config")
+        await self._async_poll_at(INTERVAL_POLL)
+
+        assert self.raumfeld.async_get_transport_info.call_count == 2
+
+    async def test_room_volumes_are_polled_per_zone_at_room_interval(self):
+        self.coordinator.zone_states[zone_key(self.rooms)] = ZoneState(transport_state="PLAYING", updated_at=self.now)
+        listener = MagicMock()
+        for room in self.rooms:
+            self.coordinator.async_add_listener(room_volume_slice(room), listener)
+
+        await self._async_poll_at(0)
+        await self._async_poll_at(INTERVAL_POLL)
+        await self._async_poll_at(INTERVAL_POLL_SLOW)
+
+        assert self.raumfeld.async_get_room_volume.call_count == 2 * len(self.rooms)
+        assert listener.call_count == len(self.rooms)
+        assert self.coordinator.room_volumes == dict.fromkeys(self.rooms, 30)
+
+    async def test_room_volume_is_requested_together_with_its_zone(self):
+        assert await self.coordinator.async_get_room_volume("Küche") == 30
+        assert await self.coordinator.async_get_room_volume("Wohnzimmer") == 30
+
+        assert self.raumfeld.async_get_room_volume.call_count == len(self.rooms)
+
+
+class TestPositionExtrapolation:
+    """Track information is only requested if the position can't be extrapolated."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.rooms = ["Küche", "Wohnzimmer"]
+        self.now = datetime(2026, 1, 1, tzinfo=UTC)
+        self.track_info = {"uri": "http://track", "number": 1, "duration": 300, "position": 10}
+        self.cached = ZoneState(
+            transport_state="PLAYING",
+            volume=30,
+            mute=False,
+            play_mode="NORMAL",
+            track_info=self.track_info,
+            position_updated_at=self.now - timedelta(seconds=20),
+            updated_at=self.now - timedelta(seconds=20),
+        )
+        self.coordinator.zone_states[zone_key(self.rooms)] = self.cached
+
+    async def _async_refresh(self):
+        with patch("custom_components.teufel_raumfeld.coordinator.utcnow", return_value=self.now):
+            return await self.coordinator.async_refresh_zone(self.rooms)
+
+    def test_position_is_extrapolated_while_playing_only(self):
+        assert self.cached.media_position(self.now) == 30
+        assert replace(self.cached, transport_state="PAUSED_PLAYBACK").media_position(self.now) == 10
+
+    async def test_track_info_is_not_requested_while_extrapolating(self):
+        zone_state = await self._async_refresh()
+
+        self.raumfeld.async_get_track_info.assert_not_called()
+        assert zone_state.track_info == self.track_info
+        assert zone_state.position_updated_at == self.cached.position_updated_at
+
+    async def test_transport_change_requests_track_info(self):
+        self.raumfeld.async_get_transport_info.return_value = {"CurrentTransportState": "PAUSED_PLAYBACK"}
+
+        await self._async_refresh()
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+
+    async def test_end_of_track_requests_track_info(self):
+        self.cached.position_updated_at = self.now - timedelta(seconds=300)
+
+        await self._async_refresh()
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+
+    async def test_small_drift_keeps_extrapolation(self):
+        self.cached.position_updated_at = self.now - timedelta(seconds=INTERVAL_POSITION_CHECK)
+        self.raumfeld.async_get_track_info.return_value = {**self.track_info, "position": 10 + INTERVAL_POSITION_CHECK + 1}
+        listener = MagicMock()
+        self.coordinator.async_add_listener(zone_slice(self.rooms), listener)
+
+        zone_state = await self._async_refresh()
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+        assert zone_state.position_updated_at == self.cached.position_updated_at
+        listener.assert_not_called()
+
+    async def test_failing_track_info_degrades_one_field(self):
+        self.raumfeld.async_get_transport_info.return_value = {"CurrentTransportState": "PAUSED_PLAYBACK"}
+        self.raumfeld.async_get_track_info.side_effect = TimeoutError
+
+        zone_state = await self._async_refresh()
+        refreshed = await self.coordinator.async_refresh_track_info(self.rooms)
+
+        assert (zone_state.transport_state, zone_state.volume, zone_state.track_info) == ("PAUSED_PLAYBACK", 30, None)
+        assert refreshed.transport_state == "PAUSED_PLAYBACK"
+
+    async def test_large_drift_rebases_position(self):
+        self.cached.position_updated_at = self.now - timedelta(seconds=INTERVAL_POSITION_CHECK)
+        self.raumfeld.async_get_track_info.return_value = {**self.track_info, "position": 200}
+
+        zone_state = await self._async_refresh()
+
+        assert zone_state.position_updated_at == self.now
+        assert zone_state.media_position(self.now) == 200
+
+    async def _async_poll_evented(self, async_poll):
+        self.coordinator.eventing = MagicMock()
+        self.coordinator.eventing.is_subscribed.return_value = True
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.coordinator.async_add_listener(zone_slice(self.rooms), MagicMock())
+        with patch("custom_components.teufel_raumfeld.coordinator.utcnow", return_value=self.now):
+            await async_poll(self.coordinator)
+
+    async def test_written_state_survives_track_refresh(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(zone_slice(self.rooms), listener)
+
+        self.coordinator.async_update_zone_state(self.rooms, volume=45, mute=None, play_mode="SHUFFLE")
+        listener.assert_called_once()
+        zone_state = await self.coordinator.async_refresh_track_info(self.rooms)
+
+        assert (zone_state.volume, zone_state.mute, zone_state.play_mode) == (45, False, "SHUFFLE")
+
+    async def test_position_of_evented_zone_is_checked_slowly(self, async_poll):
+        await self._async_poll_evented(async_poll)
+        self.raumfeld.async_get_track_info.assert_not_called()
+
+        self.cached.position_updated_at = self.now - timedelta(seconds=INTERVAL_POSITION_CHECK)
+        self.raumfeld.async_get_track_info.return_value = {**self.track_info, "position": 200}
+        await self._async_poll_evented(async_poll)
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+        self.raumfeld.async_get_transport_info.assert_not_called()
+        assert self.coordinator.zone_states[zone_key(self.rooms)].media_position(self.now) == 200
+
+    async def test_checked_position_is_not_checked_again_right_away(self, async_poll):
+        self.cached.position_updated_at = self.now - timedelta(seconds=INTERVAL_POSITION_CHECK)
+        self.raumfeld.async_get_track_info.return_value = {**self.track_info, "position": 10 + INTERVAL_POSITION_CHECK}
+
+        await self._async_poll_evented(async_poll)
+        await self._async_poll_evented(async_poll)
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+        zone_state = self.coordinator.zone_states[zone_key(self.rooms)]
+        assert zone_state.position_updated_at == self.cached.position_updated_at
+        assert zone_state.position_checked_at == self.now
+
+
+@patch("custom_components.teufel_raumfeld.coordinator.DELAY_FAST_UPDATE_CHECKS", 0)
+class TestTransitions:
+    """Callers waiting for a transition share one future."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.rooms = ["Küche", "Wohnzimmer"]
+
+    def _transport_states(self, *transport_states):
+        self.raumfeld.async_get_transport_info.side_effect = [
+            {"CurrentTransportState": transport_state} for transport_state in transport_states
+        ]
+
+    async def test_settled_state_is_returned_directly(self):
+        assert await self.coordinator.async_get_transport_state(self.rooms) == "PLAYING"
+
+    async def test_waiters_share_one_poller(self):
+        self.coordinator.hass.loop = asyncio.get_running_loop()
+        self._transport_states("TRANSITIONING", "TRANSITIONING", "PLAYING")
+
+        results = await asyncio.gather(*(self.coordinator.async_get_transport_state(self.rooms) for _ in range(5)))
+
+        assert results == ["PLAYING"] * 5
+        assert self.raumfeld.async_get_transport_info.call_count == 3
+
+    async def test_event_resolves_waiters(self):
+        self.coordinator.hass.loop = asyncio.get_running_loop()
+        self.coordinator.eventing = MagicMock()
+        self.coordinator.eventing.is_subscribed.return_value = True
+        self._transport_states("TRANSITIONING")
+
+        task = asyncio.ensure_future(self.coordinator.async_get_transport_state(self.rooms))
+        await asyncio.sleep(0)
+        self.coordinator.async_apply_zone_event(zone_key(self.rooms), {"TransportState": "PLAYING"})
+
+        assert await task == "PLAYING"
+        assert self.raumfeld.async_get_transport_info.call_count == 1
+
+    async def test_transition_of_evented_room_is_polled(self):
+        self.coordinator.hass.loop = asyncio.get_running_loop()
+        # Room renderers are subscribed for RenderingControl events only.
+        self.coordinator.eventing = MagicMock()
+        self.coordinator.eventing.is_subscribed.side_effect = lambda target, service_type=None: service_type is None
+        self.raumfeld.async_get_room_transport_info = AsyncMock(
+            side_effect=[{"CurrentTransportState": "TRANSITIONING"}, {"CurrentTransportState": "PLAYING"}]
+        )
+
+        assert await self.coordinator.async_get_room_transport_state("Küche") == "PLAYING"
+        self.coordinator.eventing.is_subscribed.assert_called_with(room_slice("Küche"), SERVICE_AV_TRANSPORT)
+
+    @patch("custom_components.teufel_raumfeld.coordinator.TIMEOUT_TRANSITION_PERIOD", 0.01)
+    async def test_unfinished_transition_times_out(self):
+        self.coordinator.hass.loop = asyncio.get_running_loop()
+        self.raumfeld.async_get_transport_info.return_value = {"CurrentTransportState": "TRANSITIONING"}
+
+        assert await self.coordinator.async_get_transport_state(self.rooms) == "TRANSITIONING"
+        assert self.coordinator._transitions == {}
+
+
+@patch("custom_components.teufel_raumfeld.coordinator.DELAY_MODERATE_UPDATE_CHECKS", 0)
+class TestEndOfMedia:
+    """Announcements end on a transport state change, bounded by a timeout."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.rooms = ["Küche", "Wohnzimmer"]
+
+    async def test_polled_zone_ends_when_stopped(self):
+        self.raumfeld.async_get_transport_info.side_effect = chain(
+            [{"CurrentTransportState": "PLAYING"}], repeat({"CurrentTransportState": "STOPPED"})
+        )
+
+        announcement = await self.coordinator.async_wait_end_of_media(self.rooms)
+
+        assert announcement["finished"] is True
+        assert list(self.coordinator.announcements) == [announcement]
+
+    async def test_evented_zone_ends_on_event(self):
+        self.coordinator.eventing = MagicMock()
+        self.coordinator.eventing.is_subscribed.return_value = True
+
+        task = asyncio.ensure_future(self.coordinator.async_wait_end_of_media(self.rooms))
+        for _ in range(5):
+            await asyncio.sleep(0)
+        calls = self.raumfeld.async_get_transport_info.call_count
+        self.coordinator.async_apply_zone_event(zone_key(self.rooms), {"TransportState": "STOPPED"})
+
+        assert (await task)["finished"] is True
+        assert self.raumfeld.async_get_transport_info.call_count == calls
+
+    @patch("custom_components.teufel_raumfeld.coordinator.TIMEOUT_ANNOUNCEMENT", 0.01)
+    async def test_timeout_when_end_is_not_detected(self):
+        announcement = await self.coordinator.async_wait_end_of_media(self.rooms)
+
+        assert announcement["finished"] is False
+
+
+class TestDeviceInfoCache:
+    """Software information is requested once and kept until invalidated or expired."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass, async_poll):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.async_poll = async_poll
+
+    async def test_concurrent_callers_share_one_request(self):
+        results = await asyncio.gather(*(self.coordinator.async_get_device_info("uuid:a") for _ in range(3)))
+        await self.coordinator.async_get_device_info("uuid:a")
+
+        assert {result.sw_version for result in results} == {"1.2.3"}
+        self.raumfeld.async_get_device_sw_version.assert_called_once_with("uuid:a")
+        self.raumfeld.async_get_device_update_version.assert_called_once_with("uuid:a")
+
+    async def test_failed_request_is_not_cached(self):
+        self.raumfeld.async_get_device_sw_version.return_value = None
+
+        await self.coordinator.async_get_device_info("uuid:a")
+        await self.coordinator.async_get_device_info("uuid:a")
+
+        assert self.raumfeld.async_get_device_sw_version.call_count == 2
+
+    async def test_device_update_invalidates_cache(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(SLICE_DEVICE_INFO, listener)
+        await self.coordinator.async_get_device_info("uuid:a")
+
+        self.coordinator.async_handle_update("zone_config")
+        listener.assert_not_called()
+        self.coordinator.async_handle_update("devices")
+        await self.coordinator.async_get_device_info("uuid:a")
+
+        listener.assert_called_once()
+        assert self.raumfeld.async_get_device_sw_version.call_count == 2
+
+    async def test_expired_information_is_invalidated_on_poll(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(SLICE_DEVICE_INFO, listener)
+        self.raumfeld.options = {"device_info_ttl": 1}
+        device_info = await self.coordinator.async_get_device_info("uuid:a")
+
+        await self.async_poll(self.coordinator)
+        listener.assert_not_called()
+        device_info.updated_at -= timedelta(hours=1)
+        await self.async_poll(self.coordinator)
+
+        listener.assert_called_once()
+        assert self.coordinator.device_infos == {}
+
+
+class TestDeviceDescriptions:
+    """Devices are introspected concurrently once and their descriptions stored."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator._store = MagicMock()
+        self.coordinator._store.async_load = AsyncMock(return_value=None)
+
+    async def test_descriptions_are_requested_concurrently_and_bounded(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def async_get_device_description(udn):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"renderer_udn": f"{udn}-renderer", "manufacturer": "Teufel", "model": "One M"}
+
+        self.raumfeld.async_get_device_description = async_get_device_description
+        udns = [f"uuid:{index}" for index in range(2 * MAX_PARALLEL_DEVICE_INTROSPECTIONS)]
+
+        descriptions = await self.coordinator.async_get_device_descriptions(udns)
+
+        assert max_in_flight == MAX_PARALLEL_DEVICE_INTROSPECTIONS
+        assert descriptions["uuid:0"] == {
+            "renderer_udn": "uuid:0-renderer",
+            "manufacturer": "Teufel",
+            "model": "One M",
+            "sw_version": "1.2.3",
+        }
+        self.coordinator._store.async_delay_save.assert_called_once()
+
+    async def test_devices_without_renderer_are_left_out(self):
+        self.raumfeld.async_get_device_description = AsyncMock(return_value=None)
+
+        assert await self.coordinator.async_get_device_descriptions(["uuid:a"]) == {}
+        assert await self.coordinator.async_get_device_descriptions(["uuid:a"]) == {}
+        assert self.raumfeld.async_get_device_description.call_count == 2
+
+    async def test_stored_descriptions_need_no_requests(self):
+        stored = {"renderer_udn": "uuid:a-renderer", "manufacturer": "Teufel", "model": "One M", "sw_version": "1.0"}
+        self.coordinator._store.async_load.return_value = {"devices": {"uuid:a": stored}}
+        await self.coordinator.async_load()
+
+        descriptions = await self.coordinator.async_get_device_descriptions(["uuid:a"])
+
+        assert descriptions == {"uuid:a": stored}
+        self.raumfeld.async_get_device_description.assert_not_called()
+        self.coordinator._store.async_delay_save.assert_not_called()
+
+    async def test_topology_is_stored_once_known(self):
+        self.coordinator._store.async_load.return_value = {"devices": {}, "topology": {"lists": {}}}
+        await self.coordinator.async_load()
+        self.raumfeld.get_topology.return_value = {"lists": {"rooms": ["Küche"]}}
+
+        assert self.coordinator.stored_topology == {"lists": {}}
+        assert self.coordinator._data_to_store()["topology"] == {"lists": {"rooms": ["Küche"]}}
+        self.raumfeld.get_rooms.return_value = []
+        assert "topology" not in self.coordinator._data_to_store()
+
+    async def test_new_software_version_is_stored(self):
+        stored = {"renderer_udn": "uuid:a-renderer", "manufacturer": "Teufel", "model": "One M", "sw_version": "1.0"}
+        self.coordinator.device_descriptions = {"uuid:a": stored}
+
+        await self.coordinator.async_get_device_info("uuid:a")
+
+        assert stored["sw_version"] == "1.2.3"
+        self.coordinator._store.async_delay_save.assert_called_once()
+
+
+class TestPowerState:
+    """Power state changes are confirmed by the next system state update."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+
+    async def test_rooms_switched_at_once_are_confirmed_by_one_update(self):
+        tasks = [
+            asyncio.ensure_future(self.coordinator.async_wait_power_state(room, "MANUAL_STANDBY"))
+            for room in ("Küche", "Wohnzimmer")
+        ]
+        await asyncio.sleep(0)
+        assert not any(task.done() for task in tasks)
+
+        self.raumfeld.get_room_power_state.return_value = "MANUAL_STANDBY"
+        self.coordinator.async_handle_update("system_state")
+
+        assert await asyncio.gather(*tasks) == [True, True]
+        assert self.coordinator._listeners == {}
+
+    async def test_reported_power_state_returns_immediately(self):
+        assert await self.coordinator.async_wait_power_state("Küche", "ACTIVE") is True
+
+    @patch("custom_components.teufel_raumfeld.coordinator.TIMEOUT_POWER_STATE", 0.01)
+    async def test_timeout_when_power_state_is_not_reported(self):
+        assert await self.coordinator.async_wait_power_state("Küche", "MANUAL_STANDBY") is False
+
+
+@patch("custom_components.teufel_raumfeld.coordinator.entity_registry")
+class TestEntityLifecycle:
+    """Entities follow the topology without reloading the integration."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.raumfeld.topology_version = 1
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.async_start()
+        self.async_add_entities = MagicMock()
+
+    def teardown_method(self):
+        self.coordinator.async_stop()
+
+    async def _async_create_entities(self):
+        return [MagicMock(unique_id=room, async_remove=AsyncMock()) for room in self.raumfeld.get_rooms()]
+
+    async def _async_change_rooms(self, rooms, update_type="zone_config"):
+        self.raumfeld.get_rooms.return_value = rooms
+        self.raumfeld.topology_version += 1
+        self.coordinator.async_handle_update(update_type)
+        await self.coordinator._entity_sync_task
+
+    async def test_new_room_is_added_and_vanished_room_retired(self, registry):
+        await self.coordinator.async_track_entities("select", self.async_add_entities, self._async_create_entities)
+        retired = self.coordinator._entity_platforms[0].entities["Wohnzimmer"]
+
+        await self._async_change_rooms(["Küche", "Bad"])
+
+        added = [[entity.unique_id for entity in call.args[0]] for call in self.async_add_entities.call_args_list]
+        assert added == [["Küche", "Wohnzimmer"], ["Bad"]]
+        retired.async_remove.assert_awaited_once()
+        # The registry entry keeps the customizations for when the room returns.
+        registry.async_get.return_value.async_remove.assert_not_called()
+        assert set(self.coordinator._entity_platforms[0].entities) == {"Küche", "Bad"}
+
+    async def test_stale_registry_entries_are_removed_at_setup(self, registry):
+        registry.async_entries_for_config_entry.return_value = [
+            MagicMock(domain="select", unique_id="Küche", entity_id="select.kueche"),
+            MagicMock(domain="select", unique_id="Dachboden", entity_id="select.dachboden"),
+            MagicMock(domain="number", unique_id="Keller", entity_id="number.keller"),
+        ]
+        self.coordinator._entry_id = "entry"
+
+        await self.coordinator.async_track_entities("select", self.async_add_entities, self._async_create_entities)
+        await self._async_change_rooms(["Küche"])
+
+        registry.async_entries_for_config_entry.assert_called_once_with(registry.async_get.return_value, "entry")
+        registry.async_get.return_value.async_remove.assert_called_once_with("select.dachboden")
+
+    async def test_retire_filter_keeps_entities(self, registry):
+        await self.coordinator.async_track_entities(
+            "media_player", self.async_add_entities, self._async_create_entities, retire=lambda uid: uid != "Wohnzimmer"
+        )
+
+        await self._async_change_rooms(["Küche"])
+
+        registry.async_get.return_value.async_remove.assert_not_called()
+        assert "Wohnzimmer" in self.coordinator._entity_platforms[0].entities
+
+    async def test_sensors_of_unresponsive_devices_are_kept_at_setup(self, registry):
+        registry.async_entries_for_config_entry.return_value = [
+            MagicMock(domain="sensor", unique_id=f"{DOMAIN}.{name}.SoftwareVersion", entity_id=f"sensor.{name.lower()}")
+            for name in ("A", "B", "Gone")
+        ]
+        self.coordinator._entry_id = "entry"
+        self.raumfeld.coordinator = self.coordinator
+        self.raumfeld.device_udn_to_name.side_effect = {"uuid:a-renderer": "A", "uuid:b-renderer": "B"}.get
+        self.raumfeld.get_device_names.return_value = {"A", "B"}
+        self.raumfeld.async_get_device_description.side_effect = lambda udn: (
+            {"renderer_udn": f"{udn}-renderer", "manufacturer": "Teufel", "model": "One M"} if udn == "uuid:a" else None
+        )
+
+        await sensor.async_setup_entry(self.coordinator.hass, MagicMock(runtime_data=self.raumfeld), self.async_add_entities)
+
+        registry.async_get.return_value.async_remove.assert_called_once_with("sensor.gone")
+
+    async def test_unchanged_topology_is_not_diffed(self, registry):
+        create_entities = AsyncMock(side_effect=self._async_create_entities)
+        await self.coordinator.async_track_entities("number", self.async_add_entities, create_entities)
+
+        self.coordinator.async_handle_update("system_state")
+
+        assert self.coordinator._entity_sync_task is None
+        create_entities.assert_called_once()
@@ -0,0 +1,25 @@
+"""Tests for teufel_raumfeld diagnostics module."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.teufel_raumfeld.__init__ import HassRaumfeldHost
+from custom_components.teufel_raumfeld.diagnostics import async_get_config_entry_diagnostics
+
+
+class TestConfigEntryDiagnostics:
+    """Tests for the diagnostics of a config entry."""
+
+    async def test_recorded_validation_is_reported_without_probing(self):
+        raumfeld = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        raumfeld.coordinator = MagicMock(announcements=[])
+        raumfeld.validation_stats.update(attempts=3, failures=1, last_valid=True)
+        raumfeld.async_host_is_valid = AsyncMock()
+        entry = MagicMock(runtime_data=raumfeld)
+        entry.as_dict.return_value = {"data": {"host": "127.0.0.1", "port": 47365}}
+
+        diagnostics = await async_get_config_entry_diagnostics(MagicMock(), entry)
+
+        raumfeld.async_host_is_valid.assert_not_called()
+        assert diagnostics["host"]["valid"] is True
+        assert diagnostics["host"]["validation"]["attempts"] == 3
+        assert diagnostics["entry"]["data"]["host"] == "**REDACTED**"
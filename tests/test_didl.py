@@ -0,0 +1,75 @@
+"""Tests for the incremental DIDL-Lite parser."""
+
+from custom_components.teufel_raumfeld.didl import DidlObject, iter_didl_objects
+
+DIDL = (
+    '<DIDL-Lite xmlns="urn:schemas-upnp-org:metadata-1-0/DIDL-Lite/"'
+    ' xmlns:dc="http://purl.org/dc/elements/1.1/"'
+    ' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/"'
+    ' xmlns:dlna="urn:schemas-dlna-org:metadata-1-0/">'
+    '<container id="0/My Music/Albums/A" parentID="0/My Music/Albums" restricted="1" childCount="2">'
+    "<dc:title>Album A</dc:title>"
+    "<upnp:class>object.container.album.musicAlbum</upnp:class>"
+    "<upnp:artist>Band</upnp:artist>"
+    '<upnp:albumArtURI dlna:profileID="JPEG_TN">http://host/a.jpg</upnp:albumArtURI>'
+    "</container>"
+    '<item id="0/My Music/Albums/A/1" parentID="0/My Music/Albums/A" restricted="1">'
+    "<dc:title>Song &amp; Dance</dc:title>"
+    "<upnp:class>object.item.audioItem.musicTrack</upnp:class>"
+    '<upnp:artist role="Performer">Singer</upnp:artist>'
+    '<upnp:artist role="Composer">Writer</upnp:artist>'
+    "<upnp:album>Album A</upnp:album>"
+    '<res protocolInfo="http-get:*:audio/mpeg:*">http://host/1.mp3</res>'
+    "</item>"
+    "</DIDL-Lite>"
+)
+
+
+class TestIterDidlObjects:
+    """Tests for iter_didl_objects."""
+
+    def test_records_of_containers_and_items(self):
+        assert list(iter_didl_objects(DIDL)) == [
+            DidlObject(
+                id="0/My Music/Albums/A",
+                is_container=True,
+                title="Album A",
+                upnp_class="object.container.album.musicAlbum",
+                artist="Band",
+                art_uri="http://host/a.jpg",
+            ),
+            DidlObject(
+                id="0/My Music/Albums/A/1",
+                is_container=False,
+                title="Song & Dance",
+                upnp_class="object.item.audioItem.musicTrack",
+                artist="Singer",
+                album="Album A",
+            ),
+        ]
+
+    def test_namespaces_are_resolved_by_uri(self):
+        didl_xml = (
+            '<d:DIDL-Lite xmlns:d="urn:schemas-upnp-org:metadata-1-0/DIDL-Lite/"'
+            ' xmlns:purl="http://purl.org/dc/elements/1.1/" xmlns:u="urn:schemas-upnp-org:metadata-1-0/upnp/"'
+            ' xmlns:other="urn:example">'
+            '<d:item id="1"><purl:title>Song</purl:title><other:title>Wrong</other:title>'
+            "<u:class>object.item.audioItem.musicTrack</u:class></d:item>"
+            "</d:DIDL-Lite>"
+        )
+
+        (item,) = list(iter_didl_objects(didl_xml))
+
+        assert (item.title, item.upnp_class) == ("Song", "object.item.audioItem.musicTrack")
+
+    def test_records_are_yielded_while_parsing(self):
+        truncated = DIDL[: DIDL.index("<item")] + "<item id="
+
+        assert [didl_object.id for didl_object in iter_didl_objects(truncated)] == ["0/My Music/Albums/A"]
+
+    def test_malformed_document(self):
+        assert list(iter_didl_objects("NOT_IMPLEMENTED")) == []
+        assert list(iter_didl_objects('<!DOCTYPE d [<!ENTITY e "x">]><DIDL-Lite>&e;</DIDL-Lite>')) == []
+
+    def test_records_are_slotted(self):
+        assert not hasattr(next(iter_didl_objects(DIDL)), "__dict__")
@@ -0,0 +1,295 @@
+"""Tests for the UPnP event subscriptions, using a local fake renderer."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from xml.sax.saxutils import escape
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from hassfeld.constants import SERVICE_AV_TRANSPORT, SERVICE_CONTENT_DIRECTORY
+
+from custom_components.teufel_raumfeld.coordinator import RaumfeldCoordinator, ZoneState, zone_key, zone_slice
+from custom_components.teufel_raumfeld.eventing import RaumfeldEventSubscriber, parse_last_change
+
+ROOMS = ["Küche", "Wohnzimmer"]
+
+DEVICE_DESCRIPTION = """<?xml version="1.0"?>
+<root xmlns="urn:schemas-upnp-org:device-1-0">
+  <specVersion><major>1</major><minor>0</minor></specVersion>
+  <device>
+    <deviceType>urn:schemas-upnp-org:device:MediaRenderer:1</deviceType>
+    <friendlyName>Fake Raumfeld Renderer</friendlyName>
+    <manufacturer>Raumfeld</manufacturer>
+    <modelName>Fake</modelName>
+    <UDN>uuid:fake-renderer</UDN>
+    <serviceList>
+      <service>
+        <serviceType>urn:schemas-upnp-org:service:AVTransport:1</serviceType>
+        <serviceId>urn:upnp-org:serviceId:AVTransport</serviceId>
+        <SCPDURL>/AVTransport.xml</SCPDURL>
+        <controlURL>/AVTransport/control</controlURL>
+        <eventSubURL>/AVTransport/event</eventSubURL>
+      </service>
+      <service>
+        <serviceType>urn:schemas-upnp-org:service:RenderingControl:1</serviceType>
+        <serviceId>urn:upnp-org:serviceId:RenderingControl</serviceId>
+        <SCPDURL>/RenderingControl.xml</SCPDURL>
+        <controlURL>/RenderingControl/control</controlURL>
+        <eventSubURL>/RenderingControl/event</eventSubURL>
+      </service>
+    </serviceList>
+  </device>
+</root>"""
+
+SERVICE_DESCRIPTION = """<?xml version="1.0"?>
+<scpd xmlns="urn:schemas-upnp-org:service-1-0">
+  <specVersion><major>1</major><minor>0</minor></specVersion>
+  <actionList/>
+  <serviceStateTable>
+    <stateVariable sendEvents="yes">
+      <name>LastChange</name>
+      <dataType>string</dataType>
+    </stateVariable>
+  </serviceStateTable>
+</scpd>"""
+
+PROPERTY_SET = """<?xml version="1.0"?>
+<e:propertyset xmlns:e="urn:schemas-upnp-org:event-1-0">
+  <e:property><LastChange>{}</LastChange></e:property>
+</e:propertyset>"""
+
+
+def _last_change(**variables):
+    """Return a LastChange event of instance 0 with the passed variables."""
+    elements = "".join(f'<{name} val="{value}"/>' for name, value in variables.items())
+    return f'<Event xmlns="urn:schemas-upnp-org:metadata-1-0/AVT/"><InstanceID val="0">{elements}</InstanceID></Event>'
+
+
+class FakeRenderer:
+    """Local renderer accepting subscriptions and emitting NOTIFY requests."""
+
+    def __init__(self):
+        """Initialize the fake renderer."""
+        self.callbacks = {}
+        self.accept_subscriptions = True
+        self.server = None
+        app = web.Application()
+        app.router.add_get("/description.xml", self._handle_description)
+        app.router.add_get("/{service}.xml", self._handle_scpd)
+        app.router.add_route("SUBSCRIBE", "/{service}/event", self._handle_subscribe)
+        app.router.add_route("UNSUBSCRIBE", "/{service}/event", self._handle_unsubscribe)
+        self._app = app
+
+    @property
+    def location(self):
+        """Return the URL of the device description."""
+        return str(self.server.make_url("/description.xml"))
+
+    async def async_start(self):
+        """Start serving on a local port."""
+        self.server = TestServer(self._app, host="127.0.0.1")
+        await self.server.start_server()
+
+    async def async_stop(self):
+        """Stop serving."""
+        await self.server.close()
+
+    async def async_notify(self, service, **variables):
+        """Send a LastChange event to the subscriber of a service."""
+        sid, callback_url = self.callbacks[service]
+        headers = {"NT": "upnp:event", "NTS": "upnp:propchange", "SID": sid, "SEQ": "0"}
+        body = PROPERTY_SET.format(escape(_last_change(**variables)))
+        async with aiohttp.ClientSession() as session:
+            async with session.request("NOTIFY", callback_url, headers=headers, data=body) as response:
+                assert response.status == 200
+
+    async def _handle_description(self, request):
+        return web.Response(text=DEVICE_DESCRIPTION, content_type="text/xml")
+
+    async def _handle_scpd(self, request):
+        return web.Response(text=SERVICE_DESCRIPTION, content_type="text/xml")
+
+    async def _handle_subscribe(self, request):
+        if not self.accept_subscriptions:
+            return web.Response(status=412)
+        service = request.match_info["service"]
+        sid = f"uuid:sid-{service}"
+        if "CALLBACK" in request.headers:
+            self.callbacks[service] = (sid, request.headers["CALLBACK"].strip("<>"))
+        return web.Response(headers={"SID": sid, "TIMEOUT": "Second-300"})
+
+    async def _handle_unsubscribe(self, request):
+        self.callbacks.pop(request.match_info["service"], None)
+        return web.Response()
+
+
+class TestParseLastChange:
+    """Only the changed variables of instance 0 are returned."""
+
+    def test_variables_of_instance_0(self):
+        changes = parse_last_change(_last_change(TransportState="PLAYING", CurrentPlayMode="SHUFFLE"))
+
+        assert changes == {"TransportState": "PLAYING", "CurrentPlayMode": "SHUFFLE"}
+
+    def test_master_channel_only(self):
+        last_change = (
+            '<Event xmlns="urn:schemas-upnp-org:metadata-1-0/RCS/"><InstanceID val="0">'
+            '<Volume channel="LF" val="10"/><Volume channel="Master" val="30"/><Mute channel="Master" val="1"/>'
+            "</InstanceID></Event>"
+        )
+
+        assert parse_last_change(last_change) == {"Volume": "30", "Mute": "1"}
+
+    def test_other_instances_are_ignored(self):
+        last_change = '<Event><InstanceID val="1"><TransportState val="PLAYING"/></InstanceID></Event>'
+
+        assert parse_last_change(last_change) == {}
+
+    def test_malformed_event(self):
+        assert parse_last_change("<Event><InstanceID") == {}
+
+
+class TestApplyEvents:
+    """Events update the cached state of zones and rooms."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass):
+        self.raumfeld = raumfeld
+        self.coordinator = RaumfeldCoordinator(hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.key = zone_key(ROOMS)
+        self.coordinator.zone_states[self.key] = ZoneState(transport_state="STOPPED", volume=10, mute=False)
+
+    @staticmethod
+    async def _async_settle():
+        """Wait for the requests scheduled by events."""
+        await asyncio.gather(*(asyncio.all_tasks() - {asyncio.current_task()}))
+
+    async def test_zone_event_updates_state_and_notifies(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(zone_slice(ROOMS), listener)
+
+        self.coordinator.async_apply_zone_event(self.key, {"TransportState": "PLAYING", "Volume": "30", "Mute": "1"})
+
+        zone_state = self.coordinator.zone_states[self.key]
+        assert (zone_state.transport_state, zone_state.volume, zone_state.mute) == ("PLAYING", 30, True)
+        listener.assert_called_once()
+        self.raumfeld.async_get_transport_info.assert_not_called()
+        await self._async_settle()
+
+    async def test_track_change_requests_track_info(self):
+        self.coordinator.async_apply_zone_event(self.key, {"CurrentTrackURI": "http://stream"})
+        await self._async_settle()
+
+        self.raumfeld.async_get_track_info.assert_called_once()
+
+    async def test_zone_event_fans_out_room_volumes(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(("room_volume", "Küche"), listener)
+
+        self.coordinator.async_apply_zone_event(self.key, {"RoomVolumes": "uuid:kueche=20,uuid:wohnzimmer=35,uuid:x=5"})
+
+        assert self.coordinator.room_volumes == {"Küche": 20, "Wohnzimmer": 35}
+        listener.assert_called_once()
+
+    async def test_room_event_notifies_on_volume_change_only(self):
+        listener = MagicMock()
+        self.coordinator.async_add_listener(("room_volume", "Küche"), listener)
+
+        self.coordinator.async_apply_room_event("Küche", {"Volume": "20"})
+        self.coordinator.async_apply_room_event("Küche", {"Volume": "20", "Mute": "0"})
+
+        assert self.coordinator.room_volumes["Küche"] == 20
+        listener.assert_called_once()
+
+    async def test_malformed_values_are_skipped(self):
+        self.coordinator.async_apply_zone_event(self.key, {"TransportState": "PLAYING", "Volume": "loud", "Mute": "maybe"})
+        self.coordinator.async_apply_room_event("Küche", {"Volume": None})
+
+        zone_state = self.coordinator.zone_states[self.key]
+        assert (zone_state.transport_state, zone_state.volume, zone_state.mute) == ("PLAYING", 10, False)
+        assert "Küche" not in self.coordinator.room_volumes
+        await self._async_settle()
+
+    async def test_system_update_id_is_passed_to_host(self):
+        subscriber = RaumfeldEventSubscriber(self.coordinator.hass, self.coordinator, MagicMock())
+        state_variables = [SimpleNamespace(name="SystemUpdateID", value="42")]
+
+        subscriber._handle_event(("media_server", "uuid:ms"), None, state_variables)
+
+        self.raumfeld.set_system_update_id.assert_called_once_with("42")
+
+
+@patch("custom_components.teufel_raumfeld.eventing.async_track_time_interval")
+class TestEventSubscriber:
+    """Subscriptions to a fake renderer deliver events and fall back to polling."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, raumfeld, hass, async_poll):
+        self.raumfeld = raumfeld
+        self.hass = hass
+        self.async_poll = async_poll
+
+    async def _async_start(self):
+        self.renderer = FakeRenderer()
+        await self.renderer.async_start()
+        self.session = aiohttp.ClientSession()
+        self.raumfeld.get_zone_location.return_value = self.renderer.location
+        self.raumfeld.get_room_renderer_location.return_value = None
+        self.raumfeld.get_media_server_location.return_value = None
+        self.coordinator = RaumfeldCoordinator(self.hass, self.raumfeld)
+        self.coordinator.snapshot = self.coordinator._build_snapshot()
+        self.coordinator.zone_states[zone_key(ROOMS)] = ZoneState(transport_state="STOPPED")
+        self.subscriber = RaumfeldEventSubscriber(self.coordinator.hass, self.coordinator, self.session)
+        self.coordinator.eventing = self.subscriber
+        await self.subscriber.async_start(source_ip="127.0.0.1")
+
+    async def _async_stop(self):
+        await self.subscriber.async_stop()
+        await self.session.close()
+        await self.renderer.async_stop()
+
+    async def test_notify_updates_zone_without_polling(self, _):
+        await self._async_start()
+        try:
+            listener = MagicMock()
+            self.coordinator.async_add_listener(zone_slice(ROOMS), listener)
+
+            await self.renderer.async_notify("AVTransport", TransportState="PLAYING")
+            await self.async_poll(self.coordinator)
+
+            assert self.coordinator.is_evented(zone_slice(ROOMS))
+            assert self.coordinator.is_evented(zone_slice(ROOMS), SERVICE_AV_TRANSPORT)
+            assert not self.coordinator.is_evented(zone_slice(ROOMS), SERVICE_CONTENT_DIRECTORY)
+            assert self.coordinator.zone_states[zone_key(ROOMS)].transport_state == "PLAYING"
+            listener.assert_called_once()
+            self.raumfeld.async_get_transport_info.assert_not_called()
+        finally:
+            await self._async_stop()
+
+    async def test_lapsed_subscription_falls_back_to_polling(self, _):
+        await self._async_start()
+        try:
+            self.coordinator.async_add_listener(zone_slice(ROOMS), MagicMock())
+            self.renderer.accept_subscriptions = False
+            for subscription in self.subscriber._subscriptions.values():
+                subscription.renew_at = subscription.renew_at.replace(year=2000)
+
+            await self.subscriber._async_renew()
+            await self.async_poll(self.coordinator)
+
+            assert not self.coordinator.is_evented(zone_slice(ROOMS))
+            self.raumfeld.async_get_transport_info.assert_called_once()
+        finally:
+            await self._async_stop()
+
+    async def test_stop_unsubscribes(self, _):
+        await self._async_start()
+        assert set(self.renderer.callbacks) == {"AVTransport", "RenderingControl"}
+
+        await self._async_stop()
+
+        assert self.renderer.callbacks == {}
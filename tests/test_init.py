@@ -1,18 +1,33 @@
 """Tests for teufel_raumfeld __init__ module — utility functions and HassRaumfeldHost."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from homeassistant.core import ServiceCall
 
+from custom_components.teufel_raumfeld import didl
 from custom_components.teufel_raumfeld.__init__ import (
     HassRaumfeldHost,
+    WebserviceUpdateEvents,
+    async_get_service_host,
     is_supported_oid,
     timespan_secs,
 )
 from custom_components.teufel_raumfeld.const import (
+    BROWSE_PAGE_SIZE,
+    BROWSE_PREFETCH_COUNT,
+    DOMAIN,
+    MAX_BROWSE_ACCESS_COUNTS,
+    MAX_BROWSE_CACHE_SIZE,
+    MAX_PARALLEL_BROWSE_PREFETCHES,
+    MAX_TRACK_METADATA_CACHE_SIZE,
+    MEDIA_CONTENT_ID_PAGE_SEP,
     MEDIA_CONTENT_ID_SEP,
     OBJECT_ID_LINE_IN,
     PORT_LINE_IN,
+    TITLE_MORE,
     TITLE_UNKNOWN,
     UPNP_CLASS_ALBUM,
     UPNP_CLASS_AUDIO_ITEM,
@@ -221,3 +236,595 @@ class TestAsyncBrowseMedia:
         result = await self.host.async_browse_media(object_id="0")
         assert len(result) == 1
         assert result[0].title == TITLE_UNKNOWN
+
+
+BROWSE_RESULT = (
+    '<DIDL-Lite xmlns:dc="http://purl.org/dc/elements/1.1/"'
+    ' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/">'
+    '<container id="0/My Music" childCount="5" restricted="1">'
+    "<dc:title>My Music</dc:title>"
+    "<upnp:class>object.container.storageFolder</upnp:class>"
+    "</container>"
+    "</DIDL-Lite>"
+)
+
+
+def _didl_tracks(count):
+    """Return a DIDL-Lite browse result with the passed number of tracks."""
+    items = "".join(
+        f'<item id="0/All/{index}" restricted="1"><dc:title>Track {index}</dc:title>'
+        "<upnp:class>object.item.audioItem.musicTrack</upnp:class></item>"
+        for index in range(count)
+    )
+    return (
+        '<DIDL-Lite xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        f' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/">{items}</DIDL-Lite>'
+    )
+
+
+class TestBrowsePages:
+    """Tests for browsing the children of large containers page by page."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host.media_server_udn = "uuid:test"
+
+    async def test_full_page_links_to_next_page(self):
+        self.host.async_browse_media_server = AsyncMock(return_value=_didl_tracks(BROWSE_PAGE_SIZE + 1))
+
+        result = await self.host.async_browse_media("0/All", "BrowseDirectChildren")
+
+        self.host.async_browse_media_server.assert_called_once_with(
+            "0/All", "BrowseDirectChildren", starting_index=0, requested_count=BROWSE_PAGE_SIZE + 1
+        )
+        assert len(result) == BROWSE_PAGE_SIZE + 1
+        assert result[-1].title == TITLE_MORE
+        assert result[-1].can_expand
+        assert result[-1].media_content_id == f"0/All{MEDIA_CONTENT_ID_PAGE_SEP}{BROWSE_PAGE_SIZE}"
+
+    async def test_next_page_continues_track_numbers(self):
+        self.host.async_browse_media_server = AsyncMock(return_value=_didl_tracks(3))
+
+        result = await self.host.async_browse_media(f"0/All{MEDIA_CONTENT_ID_PAGE_SEP}400", "BrowseDirectChildren")
+
+        assert self.host.async_browse_media_server.call_args.kwargs["starting_index"] == 400
+        assert [media.title for media in result] == ["Track 0", "Track 1", "Track 2"]
+        assert result[0].media_content_id.endswith("fii=400")
+
+    async def test_metadata_of_page_is_metadata_of_container(self):
+        self.host.async_browse_media_server = AsyncMock(return_value=BROWSE_RESULT)
+
+        await self.host.async_browse_media(f"0/My Music{MEDIA_CONTENT_ID_PAGE_SEP}200", "BrowseMetadata")
+
+        self.host.async_browse_media_server.assert_called_once_with("0/My Music", "BrowseMetadata")
+
+
+class TestBrowseCache:
+    """Tests for caching browse results in HassRaumfeldHost."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host.media_server_udn = "uuid:test"
+        self.host.async_browse_media_server = AsyncMock(return_value=BROWSE_RESULT)
+
+    async def test_repeated_browse_is_served_from_cache(self):
+        first = await self.host.async_browse_media("0", "BrowseDirectChildren")
+        first[0].children = ["attached by caller"]
+        second = await self.host.async_browse_media(f"0{MEDIA_CONTENT_ID_SEP}uri", "BrowseDirectChildren")
+        await self.host.async_browse_media("0", "BrowseMetadata")
+
+        assert self.host.async_browse_media_server.call_count == 2
+        assert second[0].title == "My Music"
+        assert second[0].children is None
+        assert self.host.browse_cache_stats == {"hits": 1, "misses": 2, "invalidations": 0, "prefetches": 0}
+
+    async def test_expired_results_are_browsed_again(self):
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+        key = ("0", "BrowseDirectChildren", 0)
+        self.host.browse_cache[key] = (0, self.host.browse_cache[key][1])
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+
+        assert self.host.async_browse_media_server.call_count == 2
+        assert self.host.browse_cache[key][0] > 0
+
+    async def test_changed_system_update_id_clears_cache(self):
+        self.host.set_system_update_id("1")
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+        self.host.set_system_update_id("1")
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+        self.host.set_system_update_id("2")
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+
+        assert self.host.async_browse_media_server.call_count == 2
+        assert self.host.browse_cache_stats["invalidations"] == 2
+
+    async def test_result_of_outdated_content_is_not_cached(self):
+        async def browse_during_change(object_id, browse_flag, **kwargs):
+            self.host.set_system_update_id("2")
+            return BROWSE_RESULT
+
+        self.host.async_browse_media_server = AsyncMock(side_effect=browse_during_change)
+        await self.host.async_browse_media("0", "BrowseDirectChildren")
+
+        assert self.host.browse_cache == {}
+
+    async def test_metadata_of_listed_children_is_known(self):
+        self.host.async_browse_media_server = AsyncMock(return_value=_didl_tracks(BROWSE_PAGE_SIZE + 1))
+        await self.host.async_browse_media("0/All", "BrowseDirectChildren")
+
+        metadata = await self.host.async_browse_media("0/All/3", "BrowseMetadata")
+
+        self.host.async_browse_media_server.assert_called_once()
+        assert metadata[0].title == "Track 3"
+        assert len(self.host.browse_listed) == BROWSE_PAGE_SIZE
+
+        self.host.set_system_update_id("2")
+        await self.host.async_browse_media("0/All/3", "BrowseMetadata")
+        assert self.host.async_browse_media_server.call_count == 2
+
+    async def test_cache_is_bounded(self):
+        for index in range(MAX_BROWSE_CACHE_SIZE + 5):
+            await self.host.async_browse_media(f"0/{index}", "BrowseDirectChildren")
+
+        assert len(self.host.browse_cache) == MAX_BROWSE_CACHE_SIZE
+        assert ("0/0", "BrowseDirectChildren", 0) not in self.host.browse_cache
+
+
+def _didl_containers(count):
+    """Return a DIDL-Lite browse result with the passed number of containers."""
+    containers = "".join(
+        f'<container id="0/My Music/{index}" restricted="1"><dc:title>Folder {index}</dc:title>'
+        "<upnp:class>object.container.storageFolder</upnp:class></container>"
+        for index in range(count)
+    )
+    return (
+        '<DIDL-Lite xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/">' + containers + "</DIDL-Lite>"
+    )
+
+
+class TestBrowsePrefetch:
+    """Tests for prefetching browse results in HassRaumfeldHost."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host.media_server_udn = "uuid:test"
+        self.host.async_browse_media_server = AsyncMock(return_value=_didl_containers(8))
+
+    def _browsed_oids(self):
+        return [call.args[0] for call in self.host.async_browse_media_server.call_args_list]
+
+    async def test_first_containers_are_prefetched(self):
+        listing = await self.host.async_browse_media("0/My Music", "BrowseDirectChildren")
+
+        await self.host.async_prefetch_children(listing)
+        await self.host.async_browse_media("0/My Music/0", "BrowseDirectChildren")
+
+        expected = [f"0/My Music/{index}" for index in range(BROWSE_PREFETCH_COUNT)]
+        assert self._browsed_oids() == ["0/My Music", *expected]
+        assert self.host.browse_cache_stats["prefetches"] == BROWSE_PREFETCH_COUNT
+        assert self.host.browse_cache_stats["hits"] == 1
+
+    async def test_frequently_opened_containers_come_first(self):
+        listing = await self.host.async_browse_media("0/My Music", "BrowseDirectChildren")
+        for _ in range(2):
+            self.host.record_browse_access("0/My Music/7")
+        self.host.record_browse_access(f"0/My Music/6{MEDIA_CONTENT_ID_SEP}uri")
+        self.host.async_browse_media_server.reset_mock()
+
+        await self.host.async_prefetch_children(listing)
+
+        assert self._browsed_oids()[:3] == ["0/My Music/7", "0/My Music/6", "0/My Music/0"]
+
+    async def test_cached_containers_and_more_entries_are_skipped(self):
+        await self.host.async_browse_media("0/My Music/0", "BrowseDirectChildren")
+        listing = await self.host.async_browse_media("0/My Music", "BrowseDirectChildren")
+        listing[1].media_content_id = f"0/My Music{MEDIA_CONTENT_ID_PAGE_SEP}200"
+        self.host.async_browse_media_server.reset_mock()
+
+        await self.host.async_prefetch_children(listing)
+
+        assert "0/My Music/0" not in self._browsed_oids()
+        assert all(MEDIA_CONTENT_ID_PAGE_SEP not in oid for oid in self._browsed_oids())
+
+    async def test_concurrency_is_bounded_and_superseded_prefetches_stop(self):
+        running = []
+        peak = 0
+        release = asyncio.Event()
+        saturated = asyncio.Event()
+
+        async def browse_media_server(object_id, *args, **kwargs):
+            nonlocal peak
+            running.append(object_id)
+            peak = max(peak, len(running))
+            if peak == MAX_PARALLEL_BROWSE_PREFETCHES:
+                saturated.set()
+            await release.wait()
+            running.remove(object_id)
+            return _didl_containers(0)
+
+        listing = await self.host.async_browse_media("0/My Music", "BrowseDirectChildren")
+        self.host.async_browse_media_server = AsyncMock(side_effect=browse_media_server)
+
+        prefetch = asyncio.ensure_future(self.host.async_prefetch_children(listing))
+        await asyncio.wait_for(saturated.wait(), 1)
+        # Browsing another listing drops the prefetches of this one still waiting.
+        newer = asyncio.ensure_future(self.host.async_prefetch_children([]))
+        release.set()
+        await asyncio.gather(prefetch, newer)
+
+        assert peak == MAX_PARALLEL_BROWSE_PREFETCHES
+        assert self.host.async_browse_media_server.call_count == MAX_PARALLEL_BROWSE_PREFETCHES
+
+    async def test_prefetch_gives_way_to_browses(self):
+        release = asyncio.Event()
+
+        async def browse_media_server(object_id, *args, **kwargs):
+            if object_id == "0/Other":
+                await release.wait()
+            return _didl_containers(0)
+
+        listing = await self.host.async_browse_media("0/My Music", "BrowseDirectChildren")
+        self.host.async_browse_media_server = AsyncMock(side_effect=browse_media_server)
+        browse = asyncio.ensure_future(self.host.async_browse_media("0/Other", "BrowseDirectChildren"))
+        await asyncio.sleep(0)
+
+        await self.host.async_prefetch_children(listing)
+        release.set()
+        await browse
+
+        assert self._browsed_oids() == ["0/Other"]
+        assert self.host.browse_cache_stats["prefetches"] == 0
+
+    async def test_browse_joins_running_prefetch(self):
+        release = asyncio.Event()
+
+        async def browse_media_server(*args, **kwargs):
+            await release.wait()
+            return BROWSE_RESULT
+
+        self.host.async_browse_media_server = AsyncMock(side_effect=browse_media_server)
+        first = asyncio.ensure_future(self.host.async_browse_media("0", "BrowseDirectChildren"))
+        second = asyncio.ensure_future(self.host.async_browse_media("0", "BrowseDirectChildren"))
+        await asyncio.sleep(0)
+        release.set()
+
+        assert [media.title for media in await first] == [media.title for media in await second] == ["My Music"]
+        assert self.host.async_browse_media_server.call_count == 1
+
+    def test_access_counts_are_bounded(self):
+        for index in range(MAX_BROWSE_ACCESS_COUNTS + 1):
+            self.host.record_browse_access(f"0/{index}")
+
+        assert len(self.host.browse_access_counts) == MAX_BROWSE_ACCESS_COUNTS // 2
+
+
+class TestAsyncGetTrackInfo:
+    """Tests for HassRaumfeldHost.async_get_track_info and its metadata cache."""
+
+    METADATA_XML = (
+        '<DIDL-Lite xmlns:dc="http://purl.org/dc/elements/1.1/"'
+        ' xmlns:upnp="urn:schemas-upnp-org:metadata-1-0/upnp/">'
+        '<item id="1"><dc:title>Song</dc:title><upnp:artist>Band</upnp:artist>'
+        "<upnp:album>Album</upnp:album></item>"
+        "</DIDL-Lite>"
+    )
+
+    def setup_method(self):
+        mock_session = MagicMock()
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=mock_session)
+        self.host.async_get_position_info = AsyncMock(
+            return_value={
+                "Track": "3",
+                "TrackDuration": "0:03:00",
+                "TrackMetaData": self.METADATA_XML,
+                "TrackURI": "http://track",
+                "AbsTime": "0:01:05",
+            }
+        )
+
+    @pytest.mark.asyncio
+    async def test_track_info(self):
+        track_info = await self.host.async_get_track_info(["Küche"])
+
+        assert track_info["title"] == "Song"
+        assert track_info["artist"] == "Band"
+        assert track_info["album"] == "Album"
+        assert track_info["duration"] == 180
+        assert track_info["position"] == 65
+
+    @pytest.mark.asyncio
+    async def test_unchanged_metadata_is_parsed_once(self):
+        with patch("custom_components.teufel_raumfeld.__init__.iter_didl_objects", wraps=didl.iter_didl_objects) as parse:
+            first = await self.host.async_get_track_info(["Küche"])
+            second = await self.host.async_get_track_info(["Küche"])
+
+        assert parse.call_count == 1
+        assert first == second
+        assert self.host.track_metadata_cache_stats == {"hits": 1, "misses": 1}
+
+    def test_cache_is_bounded(self):
+        for index in range(MAX_TRACK_METADATA_CACHE_SIZE + 1):
+            self.host.parse_track_metadata(self.METADATA_XML.replace("Song", f"Song {index}"))
+
+        assert len(self.host.track_metadata_cache) == MAX_TRACK_METADATA_CACHE_SIZE
+        assert self.METADATA_XML.replace("Song", "Song 0") not in self.host.track_metadata_cache
+
+
+ZONE_CONFIG = """<?xml version="1.0"?>
+<zoneConfig>
+  <zones>
+    <zone udn="uuid:zone-1">
+      <room name="Küche" udn="uuid:kueche" powerState="ACTIVE"><renderer udn="uuid:r-kueche"/></room>
+      <room name="Bad" udn="uuid:bad" powerState="ACTIVE"><renderer udn="uuid:r-bad"/></room>
+    </zone>
+  </zones>
+  <unassignedRooms>
+    <room name="Keller" udn="uuid:keller" powerState="MANUAL_STANDBY"><renderer udn="uuid:r-keller"/></room>
+  </unassignedRooms>
+</zoneConfig>"""
+
+
+class TestTopologyIndex:
+    """Tests for the room and zone lookups of HassRaumfeldHost."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG)
+
+    def test_lookups(self):
+        assert self.host.get_zone_of_room("Küche") == ("Bad", "Küche")
+        assert self.host.get_zone_of_room("Keller") is None
+        assert self.host.group_is_valid(["Küche", "Bad"])
+        assert not self.host.group_is_valid(["Küche"])
+        assert self.host.rooms_are_valid(["Keller", "Bad"])
+        assert not self.host.rooms_are_valid(["Keller", "Dachboden"])
+        assert self.host.roomlst_to_zoneudn(["Küche", "Bad"]) == "uuid:zone-1"
+
+    def test_version_changes_with_zone_config_only(self):
+        version = self.host.topology_version
+        assert self.host.topology_version == version
+
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG.replace('name="Keller"', 'name="Dachboden"'))
+
+        assert self.host.topology_version == version + 1
+        assert self.host.room_is_valid("Dachboden")
+        assert not self.host.room_is_valid("Keller")
+
+    def test_version_ignores_unchanged_topology(self):
+        version = self.host.topology_version
+
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG)
+        assert self.host.topology_version == version
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG.replace("MANUAL_STANDBY", "ACTIVE"))
+        assert self.host.topology_version == version
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG.replace('udn="uuid:zone-1"', 'udn="uuid:zone-2"'))
+        assert self.host.topology_version == version + 1
+
+
+class TestDeviceDescription:
+    """Tests for describing a device with HassRaumfeldHost."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host.device_udn_to_location = MagicMock(return_value="http://10.0.0.3:49152/description.xml")
+        self.device = MagicMock(manufacturer="Teufel", model_name="One M")
+        self.responses = {
+            "GetDevice": {"UniqueDeviceName": "uuid:renderer"},
+            "GetInfo": {"SoftwareVersion": "1.2.3"},
+            "GetUpdateInfo": {"Version": "1.3.0"},
+        }
+        self.device.service.return_value.action.side_effect = lambda name: MagicMock(
+            async_call=AsyncMock(return_value=self.responses[name])
+        )
+        patcher = patch("custom_components.teufel_raumfeld.__init__.UpnpFactory")
+        self.factory = patcher.start()
+        self.factory.return_value.async_create_device = AsyncMock(return_value=self.device)
+        self.patcher = patcher
+
+    def teardown_method(self):
+        self.patcher.stop()
+
+    async def test_description_is_parsed_once_for_all_fields(self):
+        description, sw_version, update_version = await asyncio.gather(
+            self.host.async_get_device_description("uuid:device"),
+            self.host.async_get_device_sw_version("uuid:device"),
+            self.host.async_get_device_update_version("uuid:device"),
+        )
+
+        assert description == {"renderer_udn": "uuid:renderer", "manufacturer": "Teufel", "model": "One M"}
+        assert (sw_version, update_version) == ("1.2.3", "1.3.0")
+        self.factory.return_value.async_create_device.assert_awaited_once_with("http://10.0.0.3:49152/description.xml")
+
+    async def test_device_without_renderer(self):
+        self.responses["GetDevice"] = {"UniqueDeviceName": ""}
+
+        assert await self.host.async_get_device_description("uuid:device") is None
+
+    async def test_failed_description_is_requested_again(self):
+        self.factory.return_value.async_create_device.side_effect = [OSError("unreachable"), self.device]
+
+        with pytest.raises(OSError):
+            await self.host.async_get_device_sw_version("uuid:device")
+        assert await self.host.async_get_device_sw_version("uuid:device") == "1.2.3"
+
+
+class TestStoredTopology:
+    """Tests for restoring the topology of a previous run into HassRaumfeldHost."""
+
+    def test_restored_topology_is_used_until_zone_config_update(self):
+        host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        host._RaumfeldHost__update_zone_config(ZONE_CONFIG)
+        topology = json.loads(json.dumps(host.get_topology()))
+
+        restored = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        restored.restore_topology(topology)
+
+        assert restored.get_rooms() == ["Küche", "Bad", "Keller"]
+        assert restored.get_zone_of_room("Bad") == ("Bad", "Küche")
+        version = restored.topology_version
+        restored._RaumfeldHost__update_zone_config(ZONE_CONFIG.replace('name="Keller"', 'name="Dachboden"'))
+        assert restored.topology_version == version + 1
+        assert restored.get_rooms() == ["Küche", "Bad", "Dachboden"]
+
+
+class TestHostValidation:
+    """Tests for recording host validation attempts of HassRaumfeldHost."""
+
+    async def test_attempts_and_latency_are_recorded(self):
+        host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+
+        with patch("hassfeld.RaumfeldHost.async_host_is_valid", AsyncMock(side_effect=[False, True])):
+            assert await host.async_host_is_valid() is False
+            assert await host.async_host_is_valid() is True
+
+        stats = host.validation_stats
+        assert (stats["attempts"], stats["failures"], stats["last_valid"]) == (2, 1, True)
+        assert stats["max_latency"] >= stats["last_latency"] >= 0
+
+
+class TestUpdateSupervision:
+    """Tests for the supervised long-polling of the web service by HassRaumfeldHost."""
+
+    def setup_method(self):
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+
+    async def test_remaining_loops_are_cancelled_when_one_ends(self):
+        cancelled = []
+
+        async def endless(session):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.append(session)
+                raise
+
+        self.host.async_update_gethostinfo = AsyncMock(side_effect=RuntimeError("disconnected"))
+        self.host.async_update_getzones = endless
+        self.host.async_update_listdevices = endless
+        self.host.async_update_systemstatechannel = endless
+
+        with pytest.raises(RuntimeError):
+            await self.host._async_run_update_loops("session")
+        assert cancelled == ["session"] * 3
+
+    async def test_restarts_with_backoff(self):
+        outcomes = iter([RuntimeError("boom"), "update", None, asyncio.CancelledError()])
+        delays = []
+
+        async def run_update_loops(session):
+            outcome = next(outcomes)
+            if isinstance(outcome, BaseException):
+                raise outcome
+            if outcome == "update":
+                self.host.record_update("zone_config")
+
+        async def sleep(delay):
+            delays.append(delay)
+
+        self.host._async_run_update_loops = run_update_loops
+        with (
+            patch("custom_components.teufel_raumfeld.__init__.asyncio.sleep", sleep),
+            pytest.raises(asyncio.CancelledError),
+        ):
+            await self.host.async_supervise_updates("session")
+
+        stats = self.host.update_stats
+        assert (stats["runs"], stats["errors"], stats["last_error"]) == (4, 3, "long-polling ended")
+        assert stats["updates"] == {"zone_config": 1}
+        assert stats["last_update"] is not None
+        # The backoff starts over after the run that received an update.
+        assert delays == [1, 1, 2]
+
+
+class TestMultipleSystems:
+    """Tests for running several Raumfeld systems side by side."""
+
+    def setup_method(self):
+        self.first = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.first._RaumfeldHost__update_zone_config(ZONE_CONFIG)
+        self.second = HassRaumfeldHost(host="127.0.0.2", session=MagicMock())
+        self.second._RaumfeldHost__update_zone_config(ZONE_CONFIG.replace('name="Keller"', 'name="Dachboden"'))
+        self.hass = MagicMock()
+        self.hass.config_entries.async_loaded_entries.return_value = [
+            MagicMock(entry_id="first", runtime_data=self.first),
+            MagicMock(entry_id="second", runtime_data=self.second),
+        ]
+
+    def test_state_is_per_host(self):
+        self.first.options["default_volume"] = 10
+        self.first.eid_to_obj["media_player.keller"] = ["Keller"]
+        assert self.second.options == {}
+        assert self.second.eid_to_obj == {}
+
+    async def _async_route(self, room_lst, entry_ids=()):
+        # The service helper resolving targets runs for real, only the registries are stubbed.
+        ent_reg = MagicMock()
+        ent_reg.async_get.side_effect = lambda entity_id: MagicMock(config_entry_id=entity_id.split(".")[1])
+        data = {"room_names": room_lst}
+        if entry_ids:
+            data["entity_id"] = [f"media_player.{entry_id}" for entry_id in entry_ids]
+        call = ServiceCall(self.hass, DOMAIN, "group", data)
+        with (
+            patch("homeassistant.helpers.entity_registry.async_get", return_value=ent_reg),
+            patch("homeassistant.helpers.device_registry.async_get", return_value=MagicMock(devices={})),
+        ):
+            return await async_get_service_host(self.hass, call, room_lst)
+
+    async def test_routed_by_rooms(self):
+        assert await self._async_route(["Keller"]) is self.first
+        assert await self._async_route(["Dachboden", "Bad"]) is self.second
+        assert await self._async_route(["Wintergarten"]) is None
+
+    async def test_routed_by_target(self):
+        assert await self._async_route(["Bad"]) is None
+        assert await self._async_route(["Bad"], ["second"]) is self.second
+        assert await self._async_route(["Keller"], ["second"]) is None
+
+
+class TestWebserviceUpdateEvents:
+    """Tests for coalescing the web service update events of a host."""
+
+    def setup_method(self):
+        self.hass = MagicMock()
+        self.host = HassRaumfeldHost(host="127.0.0.1", session=MagicMock())
+        self.host._RaumfeldHost__update_zone_config(ZONE_CONFIG)
+        self.events = WebserviceUpdateEvents(self.hass, self.host)
+
+    def test_burst_fires_one_event(self):
+        with patch("custom_components.teufel_raumfeld.__init__.async_call_later") as call_later:
+            for update_type in ("zone_config", "system_state", "devices", "zone_config"):
+                self.events.async_add(update_type)
+            self.events.async_add("unknown")
+
+        call_later.assert_called_once()
+        self.hass.bus.async_fire.assert_not_called()
+        call_later.call_args.args[2]()
+
+        self.hass.bus.async_fire.assert_called_once_with(
+            "teufel_raumfeld.webservice_update",
+            {
+                "type": "zone_config",
+                "types": ["devices", "system_state", "zone_config"],
+                "topology_version": self.host.topology_version,
+            },
+        )
+
+    def test_next_burst_starts_after_fire(self):
+        with patch("custom_components.teufel_raumfeld.__init__.async_call_later") as call_later:
+            self.events.async_add("devices")
+            call_later.call_args.args[2]()
+            self.events.async_add("host_info")
+            call_later.call_args.args[2]()
+
+        assert call_later.call_count == 2
+        assert self.hass.bus.async_fire.call_args.args[1]["types"] == ["host_info"]
+
+    def test_stop_drops_pending_updates(self):
+        unsub = MagicMock()
+        with patch("custom_components.teufel_raumfeld.__init__.async_call_later", return_value=unsub):
+            self.events.async_add("devices")
+            self.events.async_stop()
+
+        unsub.assert_called_once()
+        self.hass.bus.async_fire.assert_not_called()
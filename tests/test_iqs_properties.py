@@ -24,7 +24,7 @@ def _make_speaker():
     config = {
         "device_udn": "uuid:test",
         "device_name": "Test",
-        "get_state": MagicMock(),
+        "info_attribute": "sw_version",
         "identifier": "test",
         "manufacturer": "Test",
         "model": "Test",
@@ -1,13 +1,17 @@
 """Tests for RaumfeldGroup and RaumfeldRoom media player entities."""
 
+import asyncio
+import copy
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from homeassistant.components.media_player import BrowseMedia
 
 from custom_components.teufel_raumfeld.const import (
     OPTION_CHANGE_STEP_VOLUME_DOWN,
     OPTION_CHANGE_STEP_VOLUME_UP,
 )
+from custom_components.teufel_raumfeld.coordinator import ZoneState
 from custom_components.teufel_raumfeld.media_player import (
     SUPPORT_RAUMFELD_GROUP,
     SUPPORT_RAUMFELD_ROOM,
@@ -97,6 +101,15 @@ class TestRaumfeldGroupVolume:
 
         self.raumfeld.async_set_group_volume.assert_called_once_with(self.rooms, 75)
 
+    @pytest.mark.asyncio
+    async def test_requested_volume_is_written_to_zone_state(self):
+        self.raumfeld.group_is_valid.return_value = True
+        self.raumfeld.async_get_group_volume = AsyncMock(return_value=40)
+
+        await self.group.async_update_volume_level()
+
+        self.raumfeld.coordinator.async_update_zone_state.assert_called_once_with(self.rooms, volume=40)
+
 
 class TestRaumfeldGroupMute:
     """Tests for mute-related methods."""
@@ -127,6 +140,14 @@ class TestRaumfeldGroupMute:
 
         self.raumfeld.async_set_group_mute.assert_called_once_with(self.rooms, False)
 
+    @pytest.mark.asyncio
+    async def test_requested_mute_is_written_to_zone_state(self):
+        self.raumfeld.async_get_group_mute = AsyncMock(return_value=True)
+
+        await self.group.async_update_mute()
+
+        self.raumfeld.coordinator.async_update_zone_state.assert_called_once_with(self.rooms, mute=True)
+
 
 class TestRaumfeldGroupTransport:
     """Tests for transport control methods."""
@@ -297,3 +318,109 @@ class TestPlaySystemSound:
         calls = self.raumfeld.async_room_play_system_sound.call_args_list
         assert calls[0][0] == ("Wohnzimmer", "Success")
         assert calls[1][0] == ("Küche", "Success")
+
+
+class TestApplyZoneState:
+    """Tests for applying the cached zone state to a player."""
+
+    def setup_method(self):
+        self.raumfeld = MagicMock()
+        self.raumfeld.options = {}
+        self.group = RaumfeldGroup(["Wohnzimmer", "Küche"], self.raumfeld)
+
+    def test_playing_zone(self):
+        zone_state = ZoneState(
+            transport_state="PLAYING",
+            volume=40,
+            mute=False,
+            track_info=None,
+            play_mode="SHUFFLE",
+        )
+
+        self.group._apply_zone_state(zone_state)
+
+        assert self.group.state == "playing"
+        assert self.group.volume_level == 0.4
+        assert self.group.is_volume_muted is False
+        assert self.group.shuffle is True
+
+    def test_transitioning_keeps_previous_state(self):
+        self.group._state = "paused"
+
+        self.group._apply_zone_state(ZoneState(transport_state="TRANSITIONING"))
+
+        assert self.group.state == "paused"
+
+    def test_missing_state_is_ignored(self):
+        self.group._apply_zone_state(ZoneState())
+
+        assert self.group.state is None
+
+    @pytest.mark.asyncio
+    async def test_update_reads_zone_state_from_coordinator(self):
+        self.raumfeld.group_is_valid.return_value = True
+        self.raumfeld.coordinator.async_get_zone_state = AsyncMock(return_value=ZoneState(transport_state="STOPPED"))
+
+        await self.group.async_update()
+
+        self.raumfeld.coordinator.async_get_zone_state.assert_called_once_with(self.group._rooms)
+        assert self.group.state == "idle"
+
+
+class TestRaumfeldGroupBrowseMedia:
+    """Tests for browsing media through RaumfeldGroup."""
+
+    def setup_method(self):
+        self.raumfeld = MagicMock()
+        self.raumfeld.options = {}
+        self.group = RaumfeldGroup(["Wohnzimmer", "Küche"], self.raumfeld)
+
+    async def test_metadata_and_children_are_browsed_concurrently(self):
+        started = []
+        both_started = asyncio.Event()
+
+        async def browse_media(object_id, browse_flag):
+            started.append(browse_flag)
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            if browse_flag == "BrowseMetadata":
+                return [
+                    BrowseMedia(
+                        media_class="directory",
+                        media_content_id="x",
+                        media_content_type="object.container",
+                        title="Albums",
+                        can_play=False,
+                        can_expand=True,
+                    )
+                ]
+            return []
+
+        self.raumfeld.async_browse_media = browse_media
+
+        result = await self.group.async_browse_media(media_content_id="0/My Music/Albums")
+
+        assert sorted(started) == ["BrowseDirectChildren", "BrowseMetadata"]
+        assert result.title == "Albums"
+        assert result.media_content_id == "0/My Music/Albums"
+        assert result.children == []
+
+    async def test_children_of_listing_are_prefetched(self):
+        album = BrowseMedia(
+            media_class="album",
+            media_content_id="0/My Music/Albums/A",
+            media_content_type="object.container.album.musicAlbum",
+            title="Album A",
+            can_play=True,
+            can_expand=True,
+        )
+        self.raumfeld.async_browse_media = AsyncMock(side_effect=lambda object_id, browse_flag: [copy.copy(album)])
+        self.group.hass = MagicMock()
+        self.group.platform = MagicMock()
+
+        result = await self.group.async_browse_media(media_content_id="0/My Music/Albums")
+
+        self.raumfeld.record_browse_access.assert_called_once_with("0/My Music/Albums")
+        self.raumfeld.async_prefetch_children.assert_called_once_with(result.children)
+        self.group.platform.config_entry.async_create_background_task.assert_called_once()